@@ -0,0 +1,271 @@
+"""
+Time the league_season_data pulls of weekly rosters, team points and
+matchups decoded through the yfpy models (raw_decode=False) against
+raw_decode, each answered from the same Yahoo payload
+
+python benchmarks/raw_decode_bench.py [fixture_dir] [repeat]
+
+fixture_dir = folder recorded with YAHOO_FIXTURES=record, every recorded
+teams/roster, teams/stats and scoreboard response in it is decoded;
+Yahoo shaped payloads for a 12 team league are built when not given
+Frames are built but not written, run from where main.py runs
+"""
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, "scripts")
+import yahoo_query
+from yahoo_query import league_season_data
+
+TEAMS = 12
+POSITIONS = ["QB", "RB", "RB", "WR", "WR", "TE", "W/R/T", "K", "DEF"]
+POSITIONS += ["BN"] * 7
+
+
+def team_meta(t):
+    return [
+        {"team_key": f"406.l.1.t.{t}"},
+        {"team_id": str(t)},
+        {"name": f"Team {t}"},
+        [],
+        {"url": "https://football.fantasysports.yahoo.com/f1/1/1"},
+        {"team_logos": [{"team_logo": {"size": "large", "url": "x"}}]},
+        [],
+        {"waiver_priority": t},
+        {"number_of_moves": str(t * 2)},
+        {"number_of_trades": "1"},
+        {"managers": [{"manager": {"manager_id": str(t), "nickname": "--"}}]},
+    ]
+
+
+def points(t, week):
+    return {
+        "team_points": {
+            "coverage_type": "week",
+            "week": str(week),
+            "total": f"{100 + t}.50",
+        },
+        "team_projected_points": {
+            "coverage_type": "week",
+            "week": str(week),
+            "total": f"{90 + t}.25",
+        },
+    }
+
+
+def player(t, i, week):
+    pid = t * 100 + i
+    pos = POSITIONS[i]
+    return {
+        "player": [
+            [
+                {"player_key": f"406.p.{pid}"},
+                {"player_id": str(pid)},
+                {"name": {"full": f"Player {pid}", "last": str(pid)}},
+                {"editorial_player_key": f"nfl.p.{pid}"},
+                {"editorial_team_key": "nfl.t.9"},
+                {"editorial_team_abbr": "GB"},
+                {"uniform_number": "12"},
+                {"display_position": "WR" if pos in ("BN", "W/R/T") else pos},
+                {"headshot": {"url": "https://s.yimg.com/h.png", "size": "small"}},
+                {"is_undroppable": "0"},
+                {"position_type": "O"},
+                {"eligible_positions": [{"position": "WR"}, {"position": "W/R/T"}]},
+            ],
+            {
+                "selected_position": [
+                    {"coverage_type": "week"},
+                    {"week": str(week)},
+                    {"position": pos},
+                ]
+            },
+        ]
+    }
+
+
+def collection(name, items):
+    node = {str(i): {name: item} for i, item in enumerate(items)}
+    node["count"] = len(items)
+    return node
+
+
+def league(part):
+    return {"league": [{"league_key": "406.l.1", "league_id": "1"}, part]}
+
+
+def rosters(week):
+    teams = [
+        [
+            team_meta(t),
+            {
+                "roster": {
+                    "coverage_type": "week",
+                    "week": str(week),
+                    "0": {
+                        "players": {
+                            str(i): player(t, i, week) for i in range(len(POSITIONS))
+                        }
+                    },
+                }
+            },
+        ]
+        for t in range(1, TEAMS + 1)
+    ]
+    return league({"teams": collection("team", teams)})
+
+
+def team_stats(week):
+    teams = [[team_meta(t), points(t, week)] for t in range(1, TEAMS + 1)]
+    return league({"teams": collection("team", teams)})
+
+
+def scoreboard(weeks):
+    matchups = []
+    for week in weeks:
+        for a in range(1, TEAMS + 1, 2):
+            matchups.append(
+                {
+                    "week": str(week),
+                    "week_start": "2021-09-09",
+                    "week_end": "2021-09-13",
+                    "status": "postevent",
+                    "is_playoffs": "0",
+                    "is_consolation": "0",
+                    "is_tied": 0,
+                    "winner_team_key": f"406.l.1.t.{a}",
+                    "matchup_grades": [
+                        {"matchup_grade": {"team_key": f"406.l.1.t.{t}", "grade": "B"}}
+                        for t in (a, a + 1)
+                    ],
+                    "0": {
+                        "teams": collection(
+                            "team",
+                            [[team_meta(t)[:3], points(t, week)] for t in (a, a + 1)],
+                        )
+                    },
+                }
+            )
+    return league({"scoreboard": {"0": {"matchups": collection("matchup", matchups)}}})
+
+
+def recorded(fixture_dir):
+    """
+    Raw payloads of a recorded run, by endpoint
+    """
+    payloads = {"rosters": [], "points": [], "matchups": []}
+    for path in Path(fixture_dir).glob("**/*.json.gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            entry = json.load(file)
+        url = entry["url"]
+        content = entry["payload"]["fantasy_content"]
+        week = url.rsplit("=", 1)[1]
+        week = int(week) if week.isdigit() else week
+        if "/teams/roster;week=" in url:
+            payloads["rosters"].append((content, week))
+        elif "/teams/stats;type=week;week=" in url:
+            payloads["points"].append((content, week))
+        elif "/scoreboard;week=" in url:
+            payloads["matchups"].append((content, week))
+
+    return payloads
+
+
+class Response(object):
+    """
+    A Yahoo response answered from a payload
+    """
+
+    status_code = 200
+    url = "https://fantasysports.yahooapis.com"
+
+    def __init__(self, content):
+        self.content = content
+
+    def json(self):
+        return {"fantasy_content": self.content}
+
+    def raise_for_status(self):
+        pass
+
+
+def league_data(raw):
+    """
+    league_season_data whose requests are answered by the payload
+    set on it, decoding through the yfpy models when raw is False
+    """
+    league = league_season_data(
+        auth_dir=".",
+        league_id="1",
+        game_id="406",
+        offline=True,
+        consumer_key="k",
+        consumer_secret="s",
+        raw_decode=raw,
+    )
+    league.yahoo_query.get_league_key = lambda: "406.l.1"
+    # offline only stops yfpy from making requests, the payload answers them
+    league.yahoo_query.offline = False
+    return league
+
+
+METHODS = {
+    "rosters": "team_roster_by_week",
+    "points": "team_points_by_week",
+    "matchups": "matchups_by_week",
+}
+
+
+def pull(league, method, content, week):
+    league.yahoo_query.get_response = lambda url: Response(content)
+    frame = getattr(league, method)(nfl_week=week)
+    assert frame is not None, f"{method} failed, see logg.txt"
+    return frame
+
+
+def best_of(league, method, payloads, repeat):
+    times = []
+    for _ in range(repeat):
+        # yfpy unpacks in place, so every run gets its own copy
+        copies = [(json.loads(json.dumps(content)), week) for content, week in payloads]
+        start = time.perf_counter()
+        for content, week in copies:
+            pull(league, method, content, week)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    if fixture_dir:
+        payloads = recorded(fixture_dir)
+    else:
+        payloads = {
+            "rosters": [(rosters(week), week) for week in range(1, 5)],
+            "points": [(team_stats(week), week) for week in range(1, 5)],
+            "matchups": [(scoreboard([week]), week) for week in range(1, 5)],
+        }
+
+    # the frames are timed up to the write
+    yahoo_query.data_upload = lambda **kwargs: True
+    models, raw = league_data(False), league_data(True)
+
+    for endpoint, method in METHODS.items():
+        if not payloads[endpoint]:
+            continue
+
+        content, week = payloads[endpoint][0]
+        old = pull(models, method, json.loads(json.dumps(content)), week)
+        new = pull(raw, method, json.loads(json.dumps(content)), week)
+        assert old.astype(str).equals(new.astype(str)), endpoint
+
+        old_time = best_of(models, method, payloads[endpoint], repeat)
+        new_time = best_of(raw, method, payloads[endpoint], repeat)
+        print(f"{endpoint}: {len(payloads[endpoint])} responses")
+        print(f"  yfpy models: {old_time:.3f}s")
+        print(f"  raw_decode:  {new_time:.3f}s")
+        print(f"  speedup:     {old_time / new_time:.1f}x")
@@ -0,0 +1,84 @@
+"""
+Time building the player pool frame one row at a time
+(pd.json_normalize + pd.concat per player) against RecordAccumulator
+
+python benchmarks/record_accumulator_bench.py [players]
+"""
+import sys
+import time
+import pandas as pd
+
+sys.path.insert(0, "scripts")
+from record_accumulator import RecordAccumulator
+
+POSITIONS = ["QB", "RB", "WR", "TE", "K", "DEF"]
+
+
+def player(pid):
+    """
+    A flattened yfpy player, shaped like complex_json_handler output
+    """
+    pos = POSITIONS[pid % len(POSITIONS)]
+    record = {
+        "player_key": f"406.p.{pid}",
+        "player_id": str(pid),
+        "name": {
+            "full": f"Player {pid}",
+            "first": "Player",
+            "last": str(pid),
+            "ascii_first": "Player",
+            "ascii_last": str(pid),
+        },
+        "editorial_player_key": f"nfl.p.{pid}",
+        "editorial_team_key": f"nfl.t.{pid % 32 + 1}",
+        "editorial_team_full_name": "Team",
+        "editorial_team_abbr": "TM",
+        "uniform_number": str(pid % 99),
+        "display_position": pos,
+        "headshot": {"url": "https://s.yimg.com/headshot.png", "size": "small"},
+        "is_undroppable": "0",
+        "position_type": "O",
+        "eligible_positions": [pos],
+        "bye_weeks": {"week": str(pid % 14 + 1)},
+    }
+    if pid % 5 == 0:
+        record["status"] = "Q"
+        record["status_full"] = "Questionable"
+    return record
+
+
+def per_row(records):
+    players = pd.DataFrame()
+    for record in records:
+        players = pd.concat([players, pd.json_normalize(record)])
+    return players
+
+
+def accumulated(records):
+    return RecordAccumulator(records).frame()
+
+
+def best_of(func, records, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(records)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2500
+    records = [player(pid) for pid in range(1, count + 1)]
+
+    old = per_row(records).reset_index(drop=True)
+    new = accumulated(records)
+    assert list(old.columns) == list(new.columns)
+    assert old.astype(str).equals(new.astype(str))
+
+    old_time = best_of(per_row, records)
+    new_time = best_of(accumulated, records)
+    print(f"{count} players")
+    print(f"json_normalize + concat per row: {old_time:.3f}s")
+    print(f"RecordAccumulator:               {new_time:.3f}s")
+    print(f"speedup:                         {old_time / new_time:.1f}x")
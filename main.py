@@ -1,20 +1,38 @@
+import sys
 import numpy as np
 import yaml
-from time import sleep
 from pathlib import Path
 
 from scripts.utils import get_season, nfl_weeks_pull, game_keys_pull
 from scripts.output_txt import log_print
-from scripts.yahoo_query import league_season_data
+# STATS is the instance yahoo_query records into (scripts/ is imported both ways)
+from scripts.yahoo_query import league_season_data, STATS
+from scripts.fetch_planner import FetchPlanner
+from scripts.game_day_scheduler import GameDayScheduler
+from scripts.rate_limiter import RateLimiter
+from scripts.retry_policy import RetryPolicy
+from scripts.response_cache import ResponseCache
+from scripts.response_hashes import ResponseHashes
+from scripts.response_fixtures import fixtures_from_env
 
 PATH = list(Path().cwd().parent.glob("**/private.yaml"))[0]
+RATE_LIMITER = RateLimiter(rate=1.0, burst=4)
+RETRY_POLICY = RetryPolicy()
+RESPONSE_CACHE = ResponseCache(PATH.parent / "cache")
+# responses unchanged since the last run are not transformed or written again
+RESPONSE_HASHES = ResponseHashes(PATH)
+FIXTURES = fixtures_from_env(PATH.parent / "fixtures")
+# print the planned calls and estimated duration without pulling
+DRY_RUN = "--dry-run" in sys.argv
+# keep running, pulling each job when the NFL calendar says it is due
+DAEMON = "--daemon" in sys.argv
 
 try:
     with open(PATH) as file:
         CREDS = yaml.load(file, Loader=yaml.SafeLoader)
 
-    CONSUMER_KEY = CREDS["YFPY_CONSUMER_KEY"]
-    CONSUMER_SECRET = CREDS["YFPY_CONSUMER_SECRET"]
+    CONSUMER_KEY = CREDS.get("YFPY_CONSUMER_KEY")
+    CONSUMER_SECRET = CREDS.get("YFPY_CONSUMER_SECRET")
 
 except Exception as error:
     print(error)
@@ -24,9 +42,10 @@ try:
     TODAY = np.datetime64("today", "D")
     YEAR = TODAY.astype("datetime64[Y]").astype(int) + 1970
     NFL_WEEKS = nfl_weeks_pull()
+    RESPONSE_CACHE.nfl_weeks = NFL_WEEKS
     MAX_WEEK = NFL_WEEKS["week"].max()
     GAME_KEYS = game_keys_pull(first="no")
-    SEASON = get_season()
+    SEASON = get_season(TODAY)
     LEAGUE_ID = GAME_KEYS[GAME_KEYS["season"] == SEASON]["league_id"].values[0]
     GAME_ID = GAME_KEYS[GAME_KEYS["season"] == SEASON]["game_id"].values[0]
     try:
@@ -39,7 +58,7 @@ try:
 except Exception as e:
     log_print(
         error=e,
-        module_="main.py"
+        module_="main.py",
         today='Unknown',
         year='Unknown',
         max_week='Unknown',
@@ -58,52 +77,48 @@ except Exception as e:
         consumer_key=CONSUMER_KEY,
         consumer_secret=CONSUMER_SECRET,
         browser_callback=True,
+        rate_limiter=RATE_LIMITER,
+        retry_policy=RETRY_POLICY,
+        response_cache=RESPONSE_CACHE,
+        response_hashes=RESPONSE_HASHES,
+        fixtures=FIXTURES,
     )
     league.all_game_keys()
     league.all_nfl_weeks()
     
 else:
-    league = league_season_data(
+    # season boundaries and closed weeks are run when due, missed ones caught up
+    scheduler = GameDayScheduler(
+        rate=RATE_LIMITER.max_rate,
         auth_dir=PATH.parent,
-        league_id=LEAGUE_ID,
-        game_id=GAME_ID,
         game_code="nfl",
         offline=False,
         all_output_as_json=False,
         consumer_key=CONSUMER_KEY,
         consumer_secret=CONSUMER_SECRET,
         browser_callback=True,
+        rate_limiter=RATE_LIMITER,
+        retry_policy=RETRY_POLICY,
+        response_cache=RESPONSE_CACHE,
+        response_hashes=RESPONSE_HASHES,
+        fixtures=FIXTURES,
     )
+    if DRY_RUN:
+        scheduler.dry_run()
+        # the calls a week_close job for the season would make today
+        planner = FetchPlanner(
+            NFL_WEEKS,
+            GAME_KEYS[GAME_KEYS["season"] == SEASON],
+            rate=RATE_LIMITER.max_rate,
+        )
+        planner.dry_run(planner.plan(today=TODAY))
+    elif DAEMON:
+        scheduler.run_forever()
+    else:
+        scheduler.run_due()
 
-    if TODAY == np.datetime64(f"{YEAR}-08-31", "D"):
-        game_keys = league.all_game_keys()
-        sleep(5)
-        nfl_weeks = league.all_nfl_weeks()
-        sleep(5)
-        meta = league.metadata(first_time="no")
-        sleep(5)
-        settings, roster, stat_cat = league.set_roster_pos_stat_cat(first_time="no")
-        sleep(5)
-        # players = league.players_list(first_time="no")
-
-    if (
-        TODAY
-        == NFL_WEEKS["end"][
-            (NFL_WEEKS["week"] == MAX_WEEK) & (NFL_WEEKS["game_id"] == GAME_ID)
-        ].values[0]
-    ):
-        teams = league.teams_and_standings(first_time="no")
-
-    if (
-        TODAY
-        == NFL_WEEKS["end"][
-            (NFL_WEEKS["game_id"] == GAME_ID) & (NFL_WEEKS["week"] == 1)
-        ].values[0]
-    ):
-        draft = league.draft_results(first_time="no")
-
-    week_roster = league.team_roster_by_week(first_time="no", nfl_week=NFL_WEEK)
-    sleep(5)
-    matchups = league.matchups_by_week(first_time="no", nfl_week=NFL_WEEK)
-    sleep(5)
-    team_points = league.team_points_by_week(first_time="no", nfl_week=NFL_WEEK)
+STATS.log(
+    module_="main.py",
+    cache_hits=RESPONSE_CACHE.hits,
+    cache_misses=RESPONSE_CACHE.misses,
+)
@@ -0,0 +1,173 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.managers import BaseManager
+
+# from scripts.fetch_planner import FetchPlanner, execute_plan
+# from scripts.league_batch import LeagueBatch
+# from scripts.output_txt import log_print
+# from scripts.rate_limiter import RateLimiter
+# from scripts.run_stats import STATS
+
+from fetch_planner import FetchPlanner, execute_plan
+from league_batch import LeagueBatch
+from output_txt import log_print
+from rate_limiter import RateLimiter
+from run_stats import STATS
+
+
+class BudgetManager(BaseManager):
+    """
+    Serves one RateLimiter to every backfill process,
+    so all seasons share a single Yahoo request budget
+    """
+
+
+BudgetManager.register("RateLimiter", RateLimiter)
+
+
+def backfill_season(season, plan, first_time="no", **league_kwargs):
+    """
+    Run the planned calls for one season
+
+    season = season year, used for logging
+    plan = FetchPlanner plan rows for the season
+    league_kwargs = arguments for league_season_data
+    Writes only replace this season's rows, so seasons can run side by side
+    Returns (season, the steps that failed to pull or write)
+    """
+    failures = execute_plan(plan, first_time=first_time, **league_kwargs)
+
+    if failures:
+        log_print(
+            error="Backfilled season with failed steps",
+            module_="backfill.py",
+            func="backfill_season",
+            season=season,
+            steps=len(plan),
+            failures=failures,
+        )
+    else:
+        log_print(
+            success="Backfilled season",
+            module_="backfill.py",
+            func="backfill_season",
+            season=season,
+            steps=len(plan),
+            calls=int(plan["calls"].sum()),
+        )
+    # stats are per process, so each season's worker logs its own
+    STATS.log(
+        module_="backfill.py",
+        season=season,
+        cache_hits=getattr(league_kwargs.get("response_cache"), "hits", None),
+        cache_misses=getattr(league_kwargs.get("response_cache"), "misses", None),
+    )
+
+    return season, failures
+
+
+def run_backfill(
+    game_keys,
+    nfl_weeks,
+    processes=4,
+    rate=1.0,
+    burst=4,
+    first_time="no",
+    dry_run=False,
+    **league_kwargs,
+):
+    """
+    Backfill the seasons in game_keys across a process pool,
+    pulling only what the FetchPlanner finds missing
+
+    game_keys = dev.game_keys dataframe (season, game_id, league_id)
+    nfl_weeks = dev.nfl_weeks dataframe (game_id, week, start, end)
+    processes = seasons pulled at the same time
+    rate, burst = shared request budget for all processes
+    first_time = "yes" rebuilds every table from scratch, the season level
+    tables in one batch and the weekly tables with the first season,
+    before the other seasons start
+    dry_run = print the plan and its estimated duration without pulling
+    league_kwargs = remaining arguments for league_season_data
+    Returns (seasons pulled in full, {season: steps that failed}),
+    a season with failed steps is left out of the first
+    """
+    planner = FetchPlanner(nfl_weeks, game_keys, rate=rate)
+    plan = planner.plan(full=str(first_time).upper() == "YES")
+    if dry_run:
+        planner.dry_run(plan)
+        return [], {}
+
+    # season level tables for every season come from a few leagues batch requests
+    batched = plan["method"].isin(list(LeagueBatch.RESOURCES))
+    seasons = [
+        (season, steps)
+        for season, steps in plan[~batched].groupby("season", sort=True)
+    ]
+
+    done = []
+    failed = {}
+    with BudgetManager() as manager:
+        rate_limiter = manager.RateLimiter(rate=rate, burst=burst)
+
+        if batched.any():
+            games = plan.loc[batched, ["season", "game_id", "league_id"]]
+            batch = LeagueBatch(
+                games.drop_duplicates(), rate_limiter=rate_limiter, **league_kwargs
+            )
+            for method, steps in plan[batched].groupby("method", sort=False):
+                batch.pull(method, first_time=first_time, game_ids=steps["game_id"])
+            seasons_of = dict(zip(games["game_id"].astype(str), games["season"]))
+            for failure in batch.failures:
+                game_id = failure.split("/", 1)[0]
+                # a table that failed to write misses every season in the batch
+                for season in (
+                    [seasons_of[game_id]]
+                    if game_id in seasons_of
+                    else set(games["season"])
+                ):
+                    failed.setdefault(season, []).append(failure)
+            # seasons with nothing left to pull per week are done already
+            done.extend(set(games["season"]) - {season for season, _ in seasons})
+
+        if str(first_time).upper() == "YES" and seasons:
+            # tables are dropped and recreated here, before anything else writes
+            season, steps = seasons.pop(0)
+            season, failures = backfill_season(
+                season,
+                steps,
+                first_time="yes",
+                rate_limiter=rate_limiter,
+                **league_kwargs,
+            )
+            done.append(season)
+            if failures:
+                failed.setdefault(season, []).extend(failures)
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = {
+                executor.submit(
+                    backfill_season,
+                    season,
+                    steps,
+                    first_time="no",
+                    rate_limiter=rate_limiter,
+                    **league_kwargs,
+                ): season
+                for season, steps in seasons
+            }
+            for future in as_completed(futures):
+                try:
+                    season, failures = future.result()
+                    done.append(season)
+                    if failures:
+                        failed.setdefault(season, []).extend(failures)
+                except Exception as e:
+                    failed.setdefault(futures[future], []).append(str(e))
+                    log_print(
+                        error=e,
+                        module_="backfill.py",
+                        func="run_backfill",
+                        season=futures[future],
+                    )
+
+    return sorted(set(done) - set(failed)), failed
@@ -273,6 +273,219 @@ class DatabaseCursor(object):
             )
             # print(f"\n----ERROR db_psql_model.py: copy_table_to_postgres_new\n----{table}\n----{e}\n")
 
+    @staticmethod
+    def _where(partition):
+        """
+        WHERE clause matching a partition, {column: value or list of values}
+        """
+        return sql.SQL(" AND ").join(
+            sql.SQL("{column} IN ({values})").format(
+                column=sql.Identifier(column),
+                values=sql.SQL(", ").join(
+                    sql.Literal(str(v))
+                    for v in (value if isinstance(value, list) else [value])
+                ),
+            )
+            for column, value in partition.items()
+        )
+
+    @staticmethod
+    def _create(table, fields, key=None, first_time="NO"):
+        """
+        Statements creating a table (dropped first when first_time = "YES"),
+        adding the fields it is missing and indexing it on its key
+        """
+        statements = []
+        if "YES" == str(first_time).upper():
+            statements.append(
+                sql.SQL("DROP TABLE IF EXISTS {table};").format(
+                    table=sql.Identifier(table)
+                )
+            )
+        statements.append(
+            sql.SQL("CREATE TABLE IF NOT EXISTS {table} ({fields});").format(
+                table=sql.Identifier(table), fields=sql.SQL(", ").join(fields)
+            )
+        )
+        # columns new to the table (e.g. draft pick player details) are added
+        statements.extend(
+            sql.SQL("ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {field};").format(
+                table=sql.Identifier(table), field=field
+            )
+            for field in fields
+        )
+        if key:
+            statements.append(
+                sql.SQL(
+                    "CREATE INDEX IF NOT EXISTS {index} ON {table} ({key});"
+                ).format(
+                    index=sql.Identifier(f"{table}_key"),
+                    table=sql.Identifier(table),
+                    key=sql.SQL(", ").join(sql.Identifier(c) for c in key),
+                )
+            )
+
+        return statements
+
+    def replace_rows(
+        self, df, table, partition=None, types=None, key=None, first_time="NO"
+    ):
+        """
+        Replace one partition of a table with a pandas dataframe
+        in a single transaction, other partitions are left untouched
+
+        The table is created when missing, and dropped first when
+        first_time = "YES", with its columns typed and indexed on its key
+
+        table = "test"
+        df = pd.DataFrame()
+        partition = {"game_id": "406", "week": "1", "team_id": ["1", "2"]},
+        None only appends
+        types = {"game_id": "TEXT", "week": "INTEGER"}, TEXT when not given
+        key = ["game_id", "week"] columns to index
+        first_time = "NO"
+        Returns True once the transaction is committed
+        """
+
+        buffer = StringIO()
+        df.to_csv(buffer, index=False)
+        buffer.seek(0)
+
+        types = types or {}
+        fields = [
+            sql.SQL("{column} {type}").format(
+                column=sql.Identifier(column),
+                type=sql.SQL(types.get(column, "TEXT")),
+            )
+            for column in df.columns
+        ]
+        statements = self._create(table, fields, key, first_time)
+        if partition:
+            statements.append(
+                sql.SQL("DELETE FROM {table} WHERE {where};").format(
+                    table=sql.Identifier(table), where=self._where(partition)
+                )
+            )
+        copy_to = sql.SQL(
+            "COPY {table} ({columns}) FROM STDIN WITH (FORMAT CSV, HEADER TRUE);"
+        ).format(
+            table=sql.Identifier(table),
+            columns=sql.SQL(", ").join(sql.Identifier(c) for c in df.columns),
+        )
+
+        cursor = self.__enter__()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.copy_expert(copy_to, buffer)
+            self.__exit__(exc_result=True)
+            log_print(
+                success="DELETE and COPY EXPERT to MenOfMadison",
+                module_="db_psql_model.py",
+                func="replace_rows",
+                first_time=first_time,
+                schema=self.kwargs["option_schema"],
+                table=table,
+                partition=partition,
+            )
+            return True
+
+        except (Exception, psycopg2.DatabaseError) as e:
+            self.__exit__(exc_result=False)
+            log_print(
+                error=e,
+                module_="db_psql_model.py",
+                func="replace_rows",
+                first_time=first_time,
+                schema=self.kwargs["option_schema"],
+                table=table,
+                partition=partition,
+            )
+            return False
+
+    def replace_from(self, staging, table, partition, key=None, first_time="NO"):
+        """
+        Replace one partition of a table with the same partition of
+        a staging table in a single transaction, then clear it from staging
+
+        The table is created (or dropped first when first_time = "YES")
+        with the staging table's columns and types
+
+        staging = "test_staging", filled by replace_rows
+        table = "test"
+        partition = {"game_id": "406"}
+        key = ["game_id", "week"] columns to index
+        Returns True once the transaction is committed
+        """
+        cursor = self.__enter__()
+        try:
+            cursor.execute(
+                "SELECT attname, format_type(atttypid, atttypmod) "
+                "FROM pg_attribute WHERE attrelid = %s::regclass "
+                "AND attnum > 0 AND NOT attisdropped ORDER BY attnum",
+                (staging,),
+            )
+            columns = cursor.fetchall()
+            fields = [
+                sql.SQL("{column} {type}").format(
+                    column=sql.Identifier(column), type=sql.SQL(column_type)
+                )
+                for column, column_type in columns
+            ]
+            names = sql.SQL(", ").join(sql.Identifier(c) for c, _ in columns)
+            where = self._where(partition)
+
+            statements = self._create(table, fields, key, first_time)
+            statements.append(
+                sql.SQL("DELETE FROM {table} WHERE {where};").format(
+                    table=sql.Identifier(table), where=where
+                )
+            )
+            statements.append(
+                sql.SQL(
+                    "INSERT INTO {table} ({names}) "
+                    "SELECT {names} FROM {staging} WHERE {where};"
+                ).format(
+                    table=sql.Identifier(table),
+                    names=names,
+                    staging=sql.Identifier(staging),
+                    where=where,
+                )
+            )
+            statements.append(
+                sql.SQL("DELETE FROM {staging} WHERE {where};").format(
+                    staging=sql.Identifier(staging), where=where
+                )
+            )
+            for statement in statements:
+                cursor.execute(statement)
+            self.__exit__(exc_result=True)
+            log_print(
+                success="DELETE and INSERT from staging to MenOfMadison",
+                module_="db_psql_model.py",
+                func="replace_from",
+                first_time=first_time,
+                schema=self.kwargs["option_schema"],
+                staging=staging,
+                table=table,
+                partition=partition,
+            )
+            return True
+
+        except (Exception, psycopg2.DatabaseError) as e:
+            self.__exit__(exc_result=False)
+            log_print(
+                error=e,
+                module_="db_psql_model.py",
+                func="replace_from",
+                first_time=first_time,
+                schema=self.kwargs["option_schema"],
+                staging=staging,
+                table=table,
+                partition=partition,
+            )
+            return False
+
     def copy_data_from_postgres(self, query):
         """
         Copy data from Postgresql Query into
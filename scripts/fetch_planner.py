@@ -0,0 +1,398 @@
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# from scripts.db_psql_model import DatabaseCursor
+# from scripts.output_txt import log_print
+# from scripts.upload_writer import UploadWriter
+# from scripts.yahoo_query import league_season_data
+
+from db_psql_model import DatabaseCursor
+from output_txt import log_print
+from upload_writer import UploadWriter
+from yahoo_query import league_season_data
+
+PATH = list(Path().cwd().parent.glob("**/private.yaml"))[0]
+
+
+class FetchPlanner(object):
+    """
+    Compare dev.nfl_weeks and dev.game_keys against what the raw tables
+    already hold, and plan only the Yahoo calls still needed
+
+    A week is final once it ended more than recheck_days ago,
+    final weeks are only pulled for the teams missing from the raw tables
+    """
+
+    # table: (method, calls per season or week)
+    SEASON_TABLES = {
+        "league_metadata": ("metadata", 1),
+        "league_settings": ("set_roster_pos_stat_cat", 1),
+        "draft_results": ("draft_results", 1),
+        "league_teams": ("teams_and_standings", 1),
+    }
+    # standings change every week until the season is over
+    IN_SEASON_TABLES = ("league_teams",)
+    # one league request per week, rosters and points use the teams collection
+    WEEKLY_TABLES = {
+        "weekly_matchups": "matchups_by_week",
+        "weekly_team_roster": "team_roster_by_week",
+        "weekly_team_pts": "team_points_by_week",
+    }
+    # a season's matchups come from multi-week scoreboard requests instead
+    MULTI_WEEK_TABLES = {"weekly_matchups": "matchups_by_weeks"}
+    # player stats follow the weekly rosters, PLAYER_BATCH players per call
+    PLAYER_WEEK_TABLE = ("weekly_player_stats", "player_stats_by_weeks")
+    DEFAULT_TEAMS = 10
+    # rostered players per team assumed before a week's rosters are held
+    ROSTER_PLAYERS = 16
+
+    def __init__(self, nfl_weeks, game_keys, rate=1.0, recheck_days=3):
+        """
+        nfl_weeks = dev.nfl_weeks dataframe (game_id, week, start, end)
+        game_keys = dev.game_keys dataframe (season, game_id, league_id)
+        rate = requests per second, used for the duration estimate
+        recheck_days = days after a week ends before its data is final
+        """
+        self.nfl_weeks = nfl_weeks.copy()
+        self.nfl_weeks["game_id"] = self.nfl_weeks["game_id"].astype(str)
+        self.nfl_weeks["week"] = self.nfl_weeks["week"].astype(int)
+        self.nfl_weeks["start"] = pd.to_datetime(self.nfl_weeks["start"])
+        self.nfl_weeks["end"] = pd.to_datetime(self.nfl_weeks["end"])
+        self.game_keys = game_keys.copy()
+        self.game_keys["game_id"] = self.game_keys["game_id"].astype(str)
+        self.rate = rate
+        self.recheck_days = recheck_days
+
+    def _read(self, query):
+        """
+        Run a coverage query, an empty frame if the table does not exist yet
+        """
+        df = DatabaseCursor(PATH, option_schema="raw").copy_data_from_postgres(query)
+        if df is None:
+            return pd.DataFrame()
+        if "game_id" in df.columns:
+            df["game_id"] = df["game_id"].astype(str)
+
+        return df
+
+    def coverage(self):
+        """
+        Pull what the raw tables already hold
+
+        Returns max_teams per game_id, game_ids per season table,
+        the team_ids held per (game_id, week) for each weekly table
+        and the rostered players per (game_id, week)
+        """
+        settings = self._read("SELECT DISTINCT game_id, max_teams FROM raw.league_settings")
+        max_teams = (
+            {}
+            if settings.empty
+            else dict(zip(settings["game_id"], settings["max_teams"].astype(int)))
+        )
+
+        seasons = {}
+        for table in self.SEASON_TABLES:
+            held = self._read(f"SELECT DISTINCT game_id FROM raw.{table}")
+            seasons[table] = set(held["game_id"]) if not held.empty else set()
+
+        weeks = {}
+        for table in ("weekly_team_roster", "weekly_team_pts"):
+            held = self._read(
+                f"SELECT DISTINCT game_id, week, team_id FROM raw.{table}"
+            )
+            weeks[table] = self._teams_by_week(held)
+
+        held = self._read(
+            "SELECT DISTINCT game_id, week, team_a_team_key, team_b_team_key "
+            "FROM raw.weekly_matchups"
+        )
+        if not held.empty:
+            held = pd.concat(
+                [
+                    held[["game_id", "week", key]].rename(columns={key: "team_key"})
+                    for key in ("team_a_team_key", "team_b_team_key")
+                ]
+            )
+            held["team_id"] = held["team_key"].astype(str).str.split(".t.").str[-1]
+        weeks["weekly_matchups"] = self._teams_by_week(held)
+
+        held = self._read(
+            "SELECT game_id, week, COUNT(DISTINCT player_key) AS players "
+            "FROM raw.weekly_team_roster GROUP BY game_id, week"
+        )
+        rostered = (
+            {}
+            if held.empty
+            else {
+                (game_id, int(week)): int(players)
+                for game_id, week, players in zip(
+                    held["game_id"], held["week"], held["players"]
+                )
+            }
+        )
+
+        table, _ = self.PLAYER_WEEK_TABLE
+        held = self._read(f"SELECT DISTINCT game_id, week FROM raw.{table}")
+        weeks[table] = (
+            {}
+            if held.empty
+            else {
+                (game_id, int(week)): set()
+                for game_id, week in zip(held["game_id"], held["week"])
+            }
+        )
+
+        return max_teams, seasons, weeks, rostered
+
+    @staticmethod
+    def _teams_by_week(held):
+        """
+        {(game_id, week): {team_id, ...}} from a frame of held rows
+        """
+        if held.empty:
+            return {}
+
+        held = held.dropna(subset=["team_id"])
+        return {
+            (game_id, int(week)): set(group["team_id"].astype(int))
+            for (game_id, week), group in held.groupby(["game_id", "week"])
+        }
+
+    def plan(self, today=None, full=False):
+        """
+        Build the list of calls still needed, one row per method call
+
+        today = date the plan is built for, weeks that have not started are skipped
+        full = ignore the raw tables and plan every season and week
+        Returns a dataframe of season, game_id, league_id, method, week, weeks, teams, calls
+        """
+        today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+        if full:
+            max_teams, seasons, weeks, rostered = {}, {}, {}, {}
+        else:
+            max_teams, seasons, weeks, rostered = self.coverage()
+
+        steps = []
+        for game in self.game_keys.sort_values("season").itertuples():
+            game_weeks = self.nfl_weeks[
+                self.nfl_weeks["game_id"] == game.game_id
+            ].sort_values("week")
+            season_final = self._final(game_weeks["end"].max(), today)
+            game_weeks = game_weeks[game_weeks["start"] <= today]
+            if game_weeks.empty:
+                continue
+
+            teams = max_teams.get(game.game_id)
+            all_teams = set(range(1, (teams or self.DEFAULT_TEAMS) + 1))
+
+            def step(method, calls, week=None, missing=None, weeks=None):
+                steps.append(
+                    {
+                        "season": game.season,
+                        "game_id": game.game_id,
+                        "league_id": game.league_id,
+                        "method": method,
+                        "week": week,
+                        "weeks": weeks,
+                        "teams": missing,
+                        "calls": calls,
+                    }
+                )
+
+            # season level steps of a game share one league;out=... request
+            shared = 0
+            for table, (method, calls) in self.SEASON_TABLES.items():
+                held = game.game_id in seasons.get(table, set())
+                if not held or (table in self.IN_SEASON_TABLES and not season_final):
+                    step(method, calls if not shared else 0)
+                    shared += 1
+
+            multi_weeks = {table: [] for table in self.MULTI_WEEK_TABLES}
+            player_weeks = []
+            for week in game_weeks.itertuples():
+                final = teams is not None and self._final(week.end, today)
+                table, _ = self.PLAYER_WEEK_TABLE
+                if not final or (game.game_id, week.week) not in weeks.get(table, {}):
+                    player_weeks.append(week.week)
+                for table, method in self.WEEKLY_TABLES.items():
+                    held = weeks.get(table, {}).get((game.game_id, week.week), set())
+                    missing = all_teams if not final else all_teams - held
+                    if not missing:
+                        continue
+
+                    if table in multi_weeks:
+                        multi_weeks[table].append(week.week)
+                    elif missing == all_teams:
+                        step(method, 1, week.week)
+                    else:
+                        step(method, 1, week.week, sorted(missing))
+
+            for table, method in self.MULTI_WEEK_TABLES.items():
+                if multi_weeks[table]:
+                    batch = league_season_data.SCOREBOARD_BATCH
+                    calls = -(-len(multi_weeks[table]) // batch)
+                    step(method, calls, weeks=multi_weeks[table])
+
+            # read from the rosters written above, unsettled weeks are pulled again
+            if player_weeks:
+                batch = league_season_data.PLAYER_BATCH
+                players = (teams or self.DEFAULT_TEAMS) * self.ROSTER_PLAYERS
+                calls = sum(
+                    -(-rostered.get((game.game_id, week), players) // batch)
+                    for week in player_weeks
+                )
+                step(self.PLAYER_WEEK_TABLE[1], calls, weeks=player_weeks)
+
+        plan = pd.DataFrame(
+            steps,
+            columns=[
+                "season",
+                "game_id",
+                "league_id",
+                "method",
+                "week",
+                "weeks",
+                "teams",
+                "calls",
+            ],
+        )
+        plan["week"] = plan["week"].astype("Int64")
+
+        return plan
+
+    def _final(self, end, today):
+        """
+        Check if data for a week (or season) ending on end can no longer change
+        """
+        return end + pd.Timedelta(days=self.recheck_days) < today
+
+    def dry_run(self, plan):
+        """
+        Print the calls a plan would make and how long it should take
+        """
+        calls = int(plan["calls"].sum()) if not plan.empty else 0
+        seconds = calls / self.rate
+
+        if not plan.empty:
+            summary = (
+                plan.groupby(["season", "method"])
+                .agg(steps=("calls", "size"), calls=("calls", "sum"))
+                .reset_index()
+            )
+            print(summary.to_string(index=False))
+        print(
+            f"\n{calls} Yahoo calls, about {pd.Timedelta(seconds=round(seconds))} "
+            f"at {self.rate:g} requests per second\n"
+        )
+
+        log_print(
+            success="Fetch plan dry run",
+            module_="fetch_planner.py",
+            func="dry_run",
+            steps=len(plan),
+            calls=calls,
+            seconds=round(seconds),
+        )
+
+        return calls, seconds
+
+
+def execute_plan(plan, first_time="no", workers=4, queue_size=8, **league_kwargs):
+    """
+    Run every step of a plan, one league_season_data per game_id
+
+    A game's weekly steps are fetched and transformed by workers threads
+    at once, while a single UploadWriter writes their frames in the
+    background, so the transforms and COPYs hide behind Yahoo's latency
+
+    first_time = "yes" recreates each table on the first step that writes it
+    workers = steps of a game in flight at once
+    queue_size = uploads waiting for the writer before the workers block
+    league_kwargs = remaining arguments for league_season_data
+    Returns the steps that failed to pull or write, as "game_id/method"
+    """
+    # league;out= sub-resource of each season level method
+    out = {
+        method: resource
+        for resource, (method, _) in league_season_data.SEASON_OUT.items()
+        if resource != "scoreboard"
+    }
+    player_stats = FetchPlanner.PLAYER_WEEK_TABLE[1]
+
+    created = set()
+    failures = []
+    with UploadWriter(queue_size) as writer:
+        for (game_id, league_id), steps in plan.groupby(
+            ["game_id", "league_id"], sort=False
+        ):
+            league = league_season_data(
+                league_id=league_id,
+                game_id=game_id,
+                upload_writer=writer,
+                **league_kwargs,
+            )
+
+            season = steps[steps["method"].isin(["metadata", *out])]
+            if len(season) > 1:
+                methods = list(season["method"])
+                step_first_time = (
+                    first_time if any(m not in created for m in methods) else "no"
+                )
+                created.update(methods)
+                # only the tables the plan asked for, settled ones cost nothing
+                league.season_resources(
+                    step_first_time,
+                    out=[out[m] for m in methods if m in out],
+                    metadata="metadata" in methods,
+                )
+                steps = steps.drop(season.index)
+
+            # steps recreating their table are queued before anything else
+            # writes it, player stats are read from the rosters written here
+            recreate, concurrent, later = [], [], []
+            for step in steps.itertuples():
+                step_first_time = first_time if step.method not in created else "no"
+                created.add(step.method)
+
+                kwargs = {"first_time": step_first_time}
+                if not pd.isna(step.week):
+                    kwargs["nfl_week"] = int(step.week)
+                if isinstance(step.weeks, list):
+                    kwargs["weeks"] = step.weeks
+                if isinstance(step.teams, list):
+                    kwargs["teams"] = step.teams
+
+                if step.method == player_stats:
+                    later.append((step.method, kwargs))
+                elif str(step_first_time).upper() == "YES":
+                    recreate.append((step.method, kwargs))
+                else:
+                    concurrent.append((step.method, kwargs))
+
+            def run(call):
+                method, kwargs = call
+                return getattr(league, method)(**kwargs)
+
+            for call in recreate:
+                run(call)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(run, concurrent))
+
+            writer.flush()
+            for call in later:
+                run(call)
+            failures.extend(f"{game_id}/{method}" for method in league.failures)
+    # the writer is closed, every upload has run
+    failures.extend(f"write/{table}" for table in writer.failed)
+
+    log_print(
+        success="Executed fetch plan",
+        module_="fetch_planner.py",
+        func="execute_plan",
+        steps=len(plan),
+        calls=int(plan["calls"].sum()) if not plan.empty else 0,
+        failures=failures,
+    )
+
+    return failures
@@ -0,0 +1,350 @@
+import time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# from scripts.db_psql_model import DatabaseCursor
+# from scripts.fetch_planner import FetchPlanner, execute_plan
+# from scripts.output_txt import log_print
+# from scripts.run_stats import STATS
+# from scripts.utils import data_upload, game_keys_pull, nfl_weeks_pull
+# from scripts.yahoo_query import league_season_data
+
+from db_psql_model import DatabaseCursor
+from fetch_planner import FetchPlanner, execute_plan
+from output_txt import log_print
+from run_stats import STATS
+from utils import data_upload, game_keys_pull, nfl_weeks_pull
+from yahoo_query import league_season_data
+
+PATH = list(Path().cwd().parent.glob("**/private.yaml"))[0]
+
+
+class GameDayScheduler(object):
+    """
+    Run the pulls tied to the NFL calendar when they fall due,
+    reading the calendar from dev.nfl_weeks and dev.game_keys
+
+    preseason = Aug 31, refresh dev.game_keys and dev.nfl_weeks
+    season_start = day before week 1, player pool and season level tables
+    week_close = day after a week ends, what the FetchPlanner finds
+    missing for the game and the new transactions
+    week_settle = recheck_days after the last week ends, the same pull once
+    that week is final, no later week_close re-pulls it
+    season_end = day after the last regular season week, final standings
+
+    Finished jobs are kept in raw.scheduled_jobs, so a run that was missed
+    is caught up on the next one, for jobs due in the last catchup_days
+    """
+
+    TABLE = "scheduled_jobs"
+    PRESEASON = "08-31"
+
+    def __init__(
+        self,
+        rate=1.0,
+        max_jobs=2,
+        catchup_days=28,
+        close_days=1,
+        recheck_days=3,
+        at_hour=6,
+        **league_kwargs,
+    ):
+        """
+        rate = requests per second, passed on to the FetchPlanner
+        max_jobs = games pulled at the same time, a game's jobs run in order
+        catchup_days = how far back missed jobs are still run,
+        older seasons are left to history_data_pull.py
+        close_days = days after a week ends before it is pulled
+        recheck_days = days after a week ends before its data is final,
+        passed on to the FetchPlanner
+        at_hour = hour of the day jobs fall due, after the late games' stats
+        league_kwargs = arguments for league_season_data
+        """
+        self.rate = rate
+        self.max_jobs = max_jobs
+        self.catchup = pd.Timedelta(days=catchup_days)
+        self.close = pd.Timedelta(days=close_days, hours=at_hour)
+        self.recheck_days = recheck_days
+        self.at_hour = pd.Timedelta(hours=at_hour)
+        self.league_kwargs = league_kwargs
+        self._calendar()
+
+    def _calendar(self):
+        """
+        Read dev.nfl_weeks and dev.game_keys, again after a preseason refresh
+        """
+        self.nfl_weeks = nfl_weeks_pull()
+        self.nfl_weeks["game_id"] = self.nfl_weeks["game_id"].astype(str)
+        self.nfl_weeks["week"] = self.nfl_weeks["week"].astype(int)
+        self.game_keys = game_keys_pull(first="no")
+        self.game_keys["game_id"] = self.game_keys["game_id"].astype(str)
+        # the cache decides which weeks are final from the same calendar
+        response_cache = self.league_kwargs.get("response_cache")
+        if response_cache is not None:
+            response_cache.nfl_weeks = self.nfl_weeks
+
+    def jobs(self, now):
+        """
+        Every job falling due from catchup_days before now on, in due order
+
+        Returns a dataframe of job, kind, game_id, league_id, week, due
+        """
+        jobs = []
+
+        def job(kind, game, due, week=None, name=None):
+            jobs.append(
+                {
+                    "job": name
+                    or "/".join(
+                        str(part)
+                        for part in (kind, game.game_id, week)
+                        if part is not None
+                    ),
+                    "kind": kind,
+                    "game_id": game.game_id,
+                    "league_id": game.league_id,
+                    "week": week,
+                    "due": due,
+                }
+            )
+
+        games = self.game_keys.dropna(subset=["league_id"]).sort_values("season")
+        # refreshing the calendar is not tied to a game, the latest one runs it
+        latest = next(games.tail(1).itertuples(), None)
+        for year in (now.year - 1, now.year) if latest is not None else ():
+            due = pd.Timestamp(f"{year}-{self.PRESEASON}") + self.at_hour
+            job("preseason", latest, due, name=f"preseason/{year}")
+
+        for game in games.itertuples():
+            weeks = self.nfl_weeks[
+                self.nfl_weeks["game_id"] == game.game_id
+            ].sort_values("week")
+            if weeks.empty:
+                continue
+
+            job(
+                "season_start",
+                game,
+                weeks["start"].iloc[0] - pd.Timedelta(days=1) + self.at_hour,
+            )
+            for week in weeks.itertuples():
+                job("week_close", game, week.end + self.close, week.week)
+            # a week closed is re-pulled by the next close until it is final
+            job(
+                "week_settle",
+                game,
+                weeks["end"].iloc[-1]
+                + pd.Timedelta(days=self.recheck_days)
+                + self.at_hour,
+                weeks["week"].iloc[-1],
+            )
+            # the last week in dev.nfl_weeks is past the fantasy season
+            last = weeks["end"].iloc[-2] if len(weeks) > 1 else weeks["end"].iloc[-1]
+            job("season_end", game, last + self.close)
+
+        jobs = pd.DataFrame(
+            jobs, columns=["job", "kind", "game_id", "league_id", "week", "due"]
+        )
+        jobs["week"] = jobs["week"].astype("Int64")
+        jobs = jobs[jobs["due"] >= now - self.catchup]
+
+        return jobs.sort_values("due", kind="stable", ignore_index=True)
+
+    def _finished(self):
+        """
+        Jobs already run, none when raw.scheduled_jobs does not exist yet
+        """
+        finished = DatabaseCursor(PATH, option_schema="raw").copy_data_from_postgres(
+            f"SELECT job FROM raw.{self.TABLE}"
+        )
+        return set() if finished is None else set(finished["job"])
+
+    def due(self, now=None):
+        """
+        Jobs due by now that have not run yet, missed ones included
+        """
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+        jobs = self.jobs(now)
+        jobs = jobs[jobs["due"] <= now]
+
+        return jobs[~jobs["job"].isin(self._finished())].reset_index(drop=True)
+
+    def next_due(self, now=None):
+        """
+        When the next job falls due, None if dev.nfl_weeks has nothing left
+        """
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+        jobs = self.jobs(now)
+        upcoming = jobs.loc[jobs["due"] > now, "due"]
+
+        return upcoming.min() if not upcoming.empty else None
+
+    def run_due(self, now=None):
+        """
+        Run every job due by now, max_jobs games at a time
+
+        Returns the number of jobs run
+        """
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+        due = self.due(now)
+
+        # the other jobs are read from the calendar this refreshes
+        preseason = due[due["kind"] == "preseason"]
+        for job in preseason.itertuples():
+            self._run([job], now)
+        if not preseason.empty:
+            self._calendar()
+            due = self.due(now)
+        due = due[due["kind"] != "preseason"]
+
+        with ThreadPoolExecutor(max_workers=self.max_jobs) as executor:
+            list(
+                executor.map(
+                    lambda jobs: self._run_game(jobs, now),
+                    [jobs for _, jobs in due.groupby("game_id", sort=False)],
+                )
+            )
+
+        log_print(
+            success="Ran scheduled jobs",
+            module_="game_day_scheduler.py",
+            func="run_due",
+            now=now,
+            jobs=list(preseason["job"]) + list(due["job"]),
+        )
+
+        return len(preseason) + len(due)
+
+    def run_forever(self, poll_hours=6):
+        """
+        Run due jobs, then sleep until the next one falls due,
+        waking every poll_hours to pick up calendar changes
+        """
+        poll = pd.Timedelta(hours=poll_hours)
+        while True:
+            self.run_due()
+            STATS.log(module_="game_day_scheduler.py")
+
+            now = pd.Timestamp.now()
+            wake = min(self.next_due(now) or now + poll, now + poll)
+            time.sleep(max((wake - now).total_seconds(), 0))
+
+    def dry_run(self, now=None):
+        """
+        Print the jobs a run would start
+        """
+        due = self.due(now)
+        print(due.to_string(index=False) if not due.empty else "No jobs due")
+
+        return due
+
+    def _run_game(self, jobs, now):
+        """
+        Run a game's due jobs in order, the weeks closed since the
+        last run in one pass
+        """
+        batches = []
+        for job in jobs.itertuples():
+            if batches and job.kind == batches[-1][-1].kind == "week_close":
+                batches[-1].append(job)
+            else:
+                batches.append([job])
+
+        for batch in batches:
+            self._run(batch, now)
+
+    def _run(self, jobs, now):
+        """
+        Run the last of a batch of jobs of one kind and record them all
+        as finished, a job that failed is left due for the next run
+        """
+        job = jobs[-1]
+        try:
+            start = time.perf_counter()
+            getattr(self, f"_{job.kind}")(job, now)
+
+            data_upload(
+                df=pd.DataFrame(
+                    {
+                        "job": [j.job for j in jobs],
+                        "kind": [j.kind for j in jobs],
+                        "game_id": [j.game_id for j in jobs],
+                        "week": [j.week for j in jobs],
+                        "due": [j.due for j in jobs],
+                        "finished": pd.Timestamp.now(),
+                    }
+                ),
+                first_time="no",
+                table_name=self.TABLE,
+                path=PATH,
+                option_schema="raw",
+                partition={"job": [j.job for j in jobs]},
+            )
+            STATS.add("scheduled_jobs", len(jobs))
+            log_print(
+                success="Ran scheduled job",
+                module_="game_day_scheduler.py",
+                func="_run",
+                jobs=[j.job for j in jobs],
+                due=job.due,
+                seconds=round(time.perf_counter() - start),
+            )
+
+        except Exception as e:
+            log_print(
+                error=e,
+                module_="game_day_scheduler.py",
+                func="_run",
+                jobs=[j.job for j in jobs],
+                due=job.due,
+            )
+
+    def _league(self, job):
+        return league_season_data(
+            league_id=job.league_id, game_id=job.game_id, **self.league_kwargs
+        )
+
+    @staticmethod
+    def _check(job, failures):
+        """
+        Fail the job when a pull or write failed, the league methods
+        only log their errors, so it is run again next time
+        """
+        if failures:
+            raise Exception(f"{job.job} failed: {', '.join(failures)}")
+
+    def _preseason(self, job, now):
+        league = self._league(job)
+        league.all_game_keys()
+        league.all_nfl_weeks()
+        self._check(job, league.failures)
+
+    def _season_start(self, job, now):
+        league = self._league(job)
+        league.players_list(first_time="no")
+        # metadata, settings, standings and draft results in one request
+        league.season_resources(first_time="no")
+        self._check(job, league.failures)
+
+    def _week_close(self, job, now):
+        # everything still missing for the game, missed weeks included
+        plan = FetchPlanner(
+            self.nfl_weeks,
+            self.game_keys[self.game_keys["game_id"] == job.game_id],
+            rate=self.rate,
+            recheck_days=self.recheck_days,
+        ).plan(today=now)
+        failures = execute_plan(plan, first_time="no", **self.league_kwargs)
+        # only the pages newer than the last stored transaction
+        league = self._league(job)
+        league.transactions(first_time="no")
+        self._check(job, failures + league.failures)
+
+    def _week_settle(self, job, now):
+        self._week_close(job, now)
+
+    def _season_end(self, job, now):
+        league = self._league(job)
+        league.teams_and_standings(first_time="no")
+        self._check(job, league.failures)
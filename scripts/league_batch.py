@@ -0,0 +1,167 @@
+import pandas as pd
+from pathlib import Path
+
+# from scripts.output_txt import log_print
+# from scripts.utils import data_upload
+# from scripts.yahoo_query import league_season_data
+
+from output_txt import log_print
+from utils import data_upload
+from yahoo_query import league_season_data
+
+PATH = list(Path().cwd().parent.glob("**/private.yaml"))[0]
+
+
+class LeagueBatch(object):
+    """
+    Pull season level resources for many seasons at once
+
+    Every season is its own league key, so instead of one request per
+    season each resource is requested for up to BATCH league keys through
+    Yahoo's leagues;league_keys=... collection, and each table is written
+    once for all of them
+    """
+
+    # method: (leagues sub-resource, League attribute passed on, tables written)
+    RESOURCES = {
+        "metadata": ("", None, ("league_metadata",)),
+        "set_roster_pos_stat_cat": (
+            "settings",
+            "settings",
+            ("league_settings", "roster_positions", "stat_categories"),
+        ),
+        "draft_results": (
+            "draftresults/players",
+            "draft_results",
+            ("draft_results",),
+        ),
+        "teams_and_standings": ("standings", "standings", ("league_teams",)),
+    }
+    BATCH = 25
+
+    def __init__(self, game_keys, batch=BATCH, **league_kwargs):
+        """
+        game_keys = dev.game_keys dataframe (season, game_id, league_id)
+        batch = league keys per request
+        league_kwargs = remaining arguments for league_season_data
+        """
+        self.batch = batch
+        self.requests = 0
+        # "game_id/method" of pulls and "write/table" of writes that failed
+        self.failures = []
+        # newest season first, a response is cached by its first league key
+        self.leagues = [
+            league_season_data(
+                league_id=game.league_id, game_id=game.game_id, **league_kwargs
+            )
+            for game in game_keys.sort_values("season", ascending=False).itertuples()
+        ]
+
+    def pull(self, method, first_time="no", game_ids=None):
+        """
+        Run one season level method for every league, with one upload per table,
+        the pulls and writes that failed are added to failures
+
+        method = a key of RESOURCES
+        game_ids = games to pull, every game in game_keys when None
+        Returns {table: dataframe}
+        """
+        resource, attribute, tables = self.RESOURCES[method]
+        game_ids = None if game_ids is None else set(map(str, game_ids))
+        leagues = [
+            league
+            for league in self.leagues
+            if game_ids is None or league.game_id in game_ids
+        ]
+
+        frames = {table: [] for table in tables}
+        for i in range(0, len(leagues), self.batch):
+            batch = leagues[i : i + self.batch]
+            responses = self._leagues(batch, resource)
+
+            for league in batch:
+                response = responses.get(league.yahoo_query.league_key)
+                if response is not None and attribute is not None:
+                    response = getattr(response, attribute)
+                # leagues missing from the batch response are pulled on their own
+                failed = len(league.failures)
+                result = getattr(league, method)(
+                    response=response or None, upload=False
+                )
+                self.failures.extend(
+                    f"{league.game_id}/{failure}"
+                    for failure in league.failures[failed:]
+                )
+                if result is None:
+                    continue
+
+                for table, frame in zip(
+                    tables, result if isinstance(result, tuple) else (result,)
+                ):
+                    frames[table].append(frame)
+
+        # the stored hashes of recreated tables no longer match what they hold
+        hashes = leagues[0].response_hashes if leagues else None
+        if hashes is not None and str(first_time).upper() == "YES":
+            for table in tables:
+                hashes.forget(table)
+
+        pulled = {}
+        for table, table_frames in frames.items():
+            if not table_frames:
+                continue
+            pulled[table] = pd.concat(table_frames, ignore_index=True)
+            if not data_upload(
+                df=pulled[table],
+                first_time=first_time,
+                table_name=table,
+                path=PATH,
+                option_schema="raw",
+                partition={"game_id": sorted(set(pulled[table]["game_id"]))},
+            ):
+                self.failures.append(f"write/{table}")
+
+        log_print(
+            success="Pulled league batch",
+            module_="league_batch.py",
+            func="pull",
+            method=method,
+            leagues=len(leagues),
+            batch_requests=self.requests,
+            failures=self.failures,
+        )
+
+        return pulled
+
+    def _leagues(self, batch, resource):
+        """
+        One leagues collection request for a batch of leagues
+
+        Returns {league_key: yfpy League}, empty if the request failed
+        """
+        league_keys = ",".join(league.yahoo_query.league_key for league in batch)
+        url = (
+            "https://fantasysports.yahooapis.com/fantasy/v2/"
+            f"leagues;league_keys={league_keys}"
+            + (f"/{resource}" if resource else "")
+        )
+
+        try:
+            self.requests += 1
+            response = batch[0]._fetch(
+                lambda: batch[0].yahoo_query.query(url, ["leagues"])
+            )
+        except Exception as e:
+            log_print(
+                error=e,
+                module_="league_batch.py",
+                func="_leagues",
+                url=url,
+            )
+            return {}
+        if response is None:
+            return {}
+        if isinstance(response, dict):
+            response = [response]
+
+        return {r["league"].league_key: r["league"] for r in response}
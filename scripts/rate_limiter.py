@@ -0,0 +1,88 @@
+import threading
+import time
+
+
+class RateLimiter(object):
+    """
+    Token bucket every Yahoo request has to pass through
+
+    Slows down when Yahoo throttles and speeds back up
+    after a run of successful requests
+    """
+
+    def __init__(
+        self,
+        rate=1.0,
+        burst=4,
+        min_rate=0.05,
+        slow_down=0.5,
+        speed_up=1.25,
+        recover_after=20,
+    ):
+        """
+        rate = requests per second when Yahoo is not throttling
+        burst = requests allowed back to back before the rate applies
+        min_rate = slowest rate throttling can push the limiter down to
+        slow_down = rate multiplier applied on every throttled response
+        speed_up = rate multiplier applied after recover_after successes
+        recover_after = successful requests in a row before speeding up
+        """
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.min_rate = float(min_rate)
+        self.slow_down = slow_down
+        self.speed_up = speed_up
+        self.recover_after = recover_after
+
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a request token is free
+        Returns the seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._last) * self.rate
+                )
+                self._last = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+    def success(self):
+        """
+        Record a successful request, stepping the rate back up
+        toward the configured rate after a run of successes
+        """
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.recover_after and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate * self.speed_up)
+                self._successes = 0
+
+    def throttled(self):
+        """
+        Record a throttled request, cutting the rate and
+        emptying the bucket so the next request waits
+        Returns the new rate
+        """
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.slow_down)
+            self._tokens = 0.0
+            self._successes = 0
+
+            return self.rate
@@ -0,0 +1,208 @@
+from yfpy.utils import convert_strings_to_numeric_equivalents as number
+
+
+def merge(items):
+    """
+    Merge one of Yahoo's lists of single key dicts (with nested lists
+    and empty [] placeholders) into a single dict
+    """
+    merged = {}
+    for item in items:
+        if isinstance(item, list):
+            merged.update(merge(item))
+        elif isinstance(item, dict):
+            merged.update(item)
+
+    return merged
+
+
+def collection(node, name):
+    """
+    The name entries of a Yahoo collection {"0": {name: ...}, ..., "count": n}
+    """
+    if not isinstance(node, dict):
+        return []
+
+    return [
+        node[key][name]
+        for key in sorted((k for k in node if k.isdigit()), key=int)
+        if name in node[key]
+    ]
+
+
+class MatchupTeam(object):
+    """
+    One side of a matchup
+    """
+
+    __slots__ = ("team_key", "points", "projected_points", "grade")
+
+    def __init__(self, team_key, points, projected_points, grade):
+        self.team_key = team_key
+        self.points = points
+        self.projected_points = projected_points
+        self.grade = grade
+
+
+class Matchup(object):
+    """
+    One scoreboard matchup with its two sides
+    """
+
+    __slots__ = (
+        "week",
+        "week_start",
+        "week_end",
+        "is_playoffs",
+        "is_consolation",
+        "is_tied",
+        "winner_team_key",
+        "team_a",
+        "team_b",
+    )
+
+    def __init__(self, matchup):
+        for field in self.__slots__[:-2]:
+            setattr(self, field, number(matchup.get(field)))
+
+        teams = [merge(team) for team in collection(matchup["0"]["teams"], "team")]
+        grades = {
+            grade["matchup_grade"]["team_key"]: grade["matchup_grade"]["grade"]
+            for grade in matchup.get("matchup_grades") or []
+        }
+        self.team_a, self.team_b = (
+            MatchupTeam(
+                team["team_key"],
+                number(team["team_points"]["total"]),
+                number(team["team_projected_points"]["total"]),
+                # matchups without grades (e.g. not played yet) keep an empty grade
+                grades.get(team["team_key"], ""),
+            )
+            for team in teams
+        )
+
+
+class RosterPlayer(object):
+    """
+    One player on a team's weekly roster
+    """
+
+    __slots__ = (
+        "team_id",
+        "week",
+        "selected_position",
+        "player_id",
+        "player_key",
+        "display_position",
+        "eligible_positions",
+        "position_type",
+    )
+
+    def __init__(self, player, team_id, week):
+        self.team_id = team_id
+        self.week = week
+        self.selected_position = merge(player.get("selected_position", [])).get(
+            "position"
+        )
+        self.player_id = number(player.get("player_id"))
+        self.player_key = player.get("player_key")
+        self.display_position = player.get("display_position")
+        self.eligible_positions = [
+            p["position"] for p in player.get("eligible_positions") or []
+        ]
+        self.position_type = player.get("position_type")
+
+
+class TeamPoints(object):
+    """
+    A team's final and projected points for a week
+    """
+
+    __slots__ = ("team_id", "week", "final_points", "projected_points")
+
+    def __init__(self, team):
+        self.team_id = int(team["team_id"])
+        self.week = number(team["team_points"]["week"])
+        self.final_points = number(team["team_points"]["total"])
+        self.projected_points = number(team["team_projected_points"]["total"])
+
+
+def league_part(content, name):
+    """
+    A league sub-resource (e.g. "teams", "scoreboard") of a raw response
+    """
+    return merge(content["league"]).get(name)
+
+
+def decode_matchups(content):
+    """
+    Matchups of a raw league scoreboard response
+    """
+    scoreboard = (league_part(content, "scoreboard") or {}).get("0") or {}
+    return [
+        Matchup(matchup)
+        for matchup in collection(scoreboard.get("matchups"), "matchup")
+    ]
+
+
+def decode_rosters(content, week, teams=None):
+    """
+    Players of a raw league teams/roster response, in team order
+
+    teams = team_ids to keep, every team when None
+    """
+    players = []
+    for team in league_teams(content, teams):
+        roster = team.get("roster") or {}
+        players.extend(
+            RosterPlayer(merge(player), int(team["team_id"]), week)
+            for player in collection((roster.get("0") or {}).get("players"), "player")
+        )
+
+    return players
+
+
+def decode_team_points(content, teams=None):
+    """
+    Weekly points of a raw league teams/stats response, in team order
+
+    teams = team_ids to keep, every team when None
+    """
+    return [TeamPoints(team) for team in league_teams(content, teams)]
+
+
+def league_teams(content, teams=None):
+    """
+    Merged teams of a raw league teams response, sorted by team_id
+    """
+    league_teams = sorted(
+        (merge(team) for team in collection(league_part(content, "teams"), "team")),
+        key=lambda team: int(team["team_id"]),
+    )
+    if teams is not None:
+        keep = set(map(int, teams))
+        league_teams = [team for team in league_teams if int(team["team_id"]) in keep]
+
+    return league_teams
+
+
+def columns(structs, names=None):
+    """
+    Write the fields of slotted structs straight into column lists
+
+    names = {column: field}, a dotted field reads a nested struct
+    (e.g. "team_a.points"), every slot under its own name when None
+    """
+    if names is None:
+        slots = type(structs[0]).__slots__ if structs else ()
+        names = {field: field for field in slots}
+
+    data = {column: [] for column in names}
+    for struct in structs:
+        for column, field in names.items():
+            value = struct
+            for part in field.split("."):
+                value = getattr(value, part)
+            data[column].append(value)
+
+    return data
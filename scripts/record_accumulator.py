@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+
+class RecordAccumulator(object):
+    """
+    Collect flattened Yahoo records into column lists
+    and build a single DataFrame at the end
+
+    Records are flattened the same way pd.json_normalize does,
+    so columns come out as they did with a one-row frame per record
+    """
+
+    def __init__(self, records=None, sep="."):
+        """
+        records = optional iterable of records to start with
+        sep = separator for nested column names
+        """
+        self.sep = sep
+        self._columns = {}
+        self._rows = 0
+
+        for record in records or []:
+            self.append(record)
+
+    def __len__(self):
+        return self._rows
+
+    @classmethod
+    def flatten(cls, record, sep="."):
+        """
+        Flatten nested dicts into dotted keys, top level values first
+        Lists and other values are kept as they are
+        """
+        flat = {k: v for k, v in record.items() if not isinstance(v, dict)}
+        for key, value in record.items():
+            if isinstance(value, dict):
+                cls._flatten_into(value, str(key), flat, sep)
+
+        return flat
+
+    @classmethod
+    def _flatten_into(cls, value, prefix, flat, sep):
+        if isinstance(value, dict):
+            for key, nested in value.items():
+                cls._flatten_into(nested, f"{prefix}{sep}{key}", flat, sep)
+        else:
+            flat[prefix] = value
+
+    def append(self, record, **extra):
+        """
+        Add one record, extra = columns set on this row only
+        """
+        flat = self.flatten(record, self.sep)
+        flat.update(extra)
+
+        for column, values in self._columns.items():
+            values.append(flat.pop(column, np.nan))
+
+        # columns first seen on this row are back filled for earlier rows
+        for column, value in flat.items():
+            self._columns[column] = [np.nan] * self._rows + [value]
+
+        self._rows += 1
+
+    def extend(self, records, **extra):
+        """
+        Add every record in an iterable
+        """
+        for record in records:
+            self.append(record, **extra)
+
+    def frame(self, columns=None):
+        """
+        Build the DataFrame, reindexed to columns when given
+        """
+        df = pd.DataFrame(self._columns, index=range(self._rows))
+        if columns is not None:
+            df = df.reindex(columns=columns)
+
+        return df
@@ -0,0 +1,154 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import pandas as pd
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+class CachedResponse(object):
+    """
+    Stand-in for a requests Response, holding a stored Yahoo payload
+    """
+
+    def __init__(self, url, payload, status_code=200):
+        self.url = url
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+class ResponseCache(object):
+    """
+    Compressed on-disk cache of raw Yahoo responses
+
+    Entries fetched after their week (or season) ended never expire,
+    everything else is refetched once it is older than ttl seconds
+    """
+
+    SETTLE_DAYS = 1
+
+    def __init__(self, cache_dir, nfl_weeks=None, ttl=900):
+        """
+        cache_dir = folder the compressed payloads are written to
+        nfl_weeks = dev.nfl_weeks dataframe (game_id, week, start, end)
+        ttl = seconds an entry for an unfinished week or season stays fresh
+        """
+        self.cache_dir = Path(cache_dir)
+        self.nfl_weeks = nfl_weeks
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(url):
+        """
+        Break a Yahoo url into endpoint, game_id, league_id, week and team
+        """
+        path = urlsplit(url).path.split("/fantasy/v2/")[-1]
+        resources = []
+        for segment in path.split("/"):
+            name = segment.split(";")[0]
+            if name and not re.fullmatch(r"[\d.lpt]+", name):
+                resources.append(name)
+
+        game_id = re.search(r"(?:^|/|=)(\d+)(?:\.[lp]\.|/|$)", path)
+        league_id = re.search(r"\.l\.(\d+)", path)
+        # a multi-week scoreboard settles with its last week
+        week = re.search(r"week=([\d,]+)", path)
+        team = re.search(r"\.t\.(\d+)", path)
+
+        return {
+            "endpoint": "_".join(resources) or "root",
+            "game_id": game_id.group(1) if game_id else None,
+            "league_id": league_id.group(1) if league_id else None,
+            "week": max(map(int, week.group(1).split(","))) if week else None,
+            "team": int(team.group(1)) if team else None,
+            "url_hash": hashlib.sha1(url.encode("utf-8")).hexdigest()[:16],
+        }
+
+    def path(self, url):
+        """
+        Location of the cached payload for a url
+        """
+        key = self.key(url)
+        return (
+            self.cache_dir
+            / str(key["game_id"] or "all")
+            / str(key["league_id"] or "all")
+            / key["endpoint"]
+            / f"w{key['week'] or 0}_t{key['team'] or 0}_{key['url_hash']}.json.gz"
+        )
+
+    def settled_after(self, game_id, week=None):
+        """
+        Timestamp after which data for the week (or the whole season
+        when week is None) can no longer change, None if unknown
+        """
+        if self.nfl_weeks is None or game_id is None:
+            return None
+
+        weeks = self.nfl_weeks[
+            self.nfl_weeks["game_id"].astype(str) == str(game_id)
+        ]
+        if week is not None:
+            weeks = weeks[weeks["week"].astype(int) == int(week)]
+        if weeks.empty:
+            return None
+
+        end = pd.to_datetime(weeks["end"]).max() + pd.Timedelta(
+            days=self.SETTLE_DAYS + 1
+        )
+        return end.timestamp()
+
+    def is_fresh(self, url, fetched):
+        """
+        Check if an entry fetched at the given time can still be served
+        """
+        key = self.key(url)
+        settled = self.settled_after(key["game_id"], key["week"])
+        if settled is not None and fetched >= settled:
+            return True
+
+        return time.time() - fetched < self.ttl
+
+    def get(self, url):
+        """
+        Return a CachedResponse for the url, None on a miss or stale entry
+        """
+        path = self.path(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if not self.is_fresh(url, entry["fetched"]):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return CachedResponse(entry["url"], entry["payload"])
+
+    def put(self, url, response):
+        """
+        Store the raw payload of a successful response
+        """
+        path = self.path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"url": url, "fetched": time.time(), "payload": response.json()}
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(tmp, path)
@@ -0,0 +1,81 @@
+import os
+import random
+import time
+
+# from scripts.response_cache import ResponseCache
+from response_cache import ResponseCache
+
+
+class FixtureMissing(Exception):
+    """
+    Raised in replay mode for a request that was never recorded
+    """
+
+
+class ResponseFixtures(ResponseCache):
+    """
+    Record every Yahoo response of a run to a fixture folder,
+    or replay a recorded run without network or credentials
+
+    mode = "record" or "replay"
+    latency = seconds added to every replayed response
+    jitter = extra random seconds (0 to jitter) added on top of latency
+    """
+
+    def __init__(self, fixture_dir, mode="replay", latency=0.0, jitter=0.0):
+        super().__init__(fixture_dir)
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def is_fresh(self, url, fetched):
+        """
+        Recorded responses never expire
+        """
+        return True
+
+    def replay(self, url):
+        """
+        Serve the recorded response for a url, after the injected latency
+        """
+        response = self.get(url)
+        if response is None:
+            raise FixtureMissing(f"No recorded response for {url}")
+
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        return response
+
+    def record(self, url, response):
+        """
+        Write a response to the fixture folder when recording
+        """
+        if self.mode == "record":
+            self.put(url, response)
+
+
+def fixtures_from_env(default_dir):
+    """
+    Build ResponseFixtures from the environment, None if not requested
+
+    YAHOO_FIXTURES = "record" or "replay"
+    YAHOO_FIXTURE_DIR = fixture folder, defaults to default_dir
+    YAHOO_REPLAY_LATENCY = seconds added to every replayed response
+    YAHOO_REPLAY_JITTER = extra random seconds added to every replayed response
+    """
+    mode = os.environ.get("YAHOO_FIXTURES", "").lower()
+    if mode not in ("record", "replay"):
+        return None
+
+    return ResponseFixtures(
+        os.environ.get("YAHOO_FIXTURE_DIR", default_dir),
+        mode=mode,
+        latency=float(os.environ.get("YAHOO_REPLAY_LATENCY", 0)),
+        jitter=float(os.environ.get("YAHOO_REPLAY_JITTER", 0)),
+    )
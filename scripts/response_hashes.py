@@ -0,0 +1,126 @@
+import hashlib
+import json
+import threading
+import pandas as pd
+from yfpy.utils import complex_json_handler
+
+# from scripts.db_psql_model import DatabaseCursor
+# from scripts.utils import data_upload
+
+from db_psql_model import DatabaseCursor
+from utils import data_upload
+
+
+class ResponseHashes(object):
+    """
+    Content hashes of the Yahoo responses each raw table was last
+    successfully written from, kept in raw.response_hashes
+
+    A response hashing the same as last run needs no transform or write
+    """
+
+    TABLE = "response_hashes"
+    # fantasy_content keys Yahoo sets on every request, not part of the data
+    VOLATILE = ("time", "copyright", "refresh_rate")
+
+    def __init__(self, path, option_schema="raw"):
+        """
+        path = path to private yaml file
+        option_schema = schema of the hash table
+        """
+        self.path = path
+        self.option_schema = option_schema
+        self._hashes = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def digest(cls, response):
+        """
+        sha1 of a raw payload or yfpy response, models are hashed
+        through their serialized form and a raw fantasy_content
+        without its VOLATILE keys
+        """
+        if isinstance(response, dict):
+            response = {
+                key: value for key, value in response.items() if key not in cls.VOLATILE
+            }
+        payload = json.dumps(
+            response,
+            sort_keys=True,
+            separators=(",", ":"),
+            default=complex_json_handler,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _stored(self):
+        """
+        {resource: hash} of the last run, read once
+        """
+        with self._lock:
+            if self._hashes is None:
+                stored = DatabaseCursor(
+                    self.path, option_schema=self.option_schema
+                ).copy_data_from_postgres(
+                    f"SELECT resource, hash FROM {self.option_schema}.{self.TABLE}"
+                )
+                # no table yet, nothing has been stored
+                self._hashes = (
+                    {}
+                    if stored is None
+                    else dict(zip(stored["resource"], stored["hash"]))
+                )
+
+            return self._hashes
+
+    def unchanged(self, resource, digest):
+        """
+        Check a response's hash against the one stored for its resource
+
+        resource = table and the part of it the response fills,
+        e.g. "weekly_team_roster/406/3", the table first
+        """
+        return self._stored().get(resource) == digest
+
+    def store(self, resource, digest):
+        """
+        Keep a response's hash once everything built from it was written
+        """
+        stored = self._stored()
+        written = data_upload(
+            df=pd.DataFrame(
+                {
+                    "resource": [resource],
+                    "table_name": [resource.split("/", 1)[0]],
+                    "hash": [digest],
+                    "stored": [pd.Timestamp.now()],
+                }
+            ),
+            first_time="no",
+            table_name=self.TABLE,
+            path=self.path,
+            option_schema=self.option_schema,
+            partition={"resource": resource},
+        )
+        if written:
+            with self._lock:
+                stored[resource] = digest
+
+    def forget(self, table):
+        """
+        Drop the hashes of a table being recreated, what they were
+        written into is gone with it
+        """
+        stored = self._stored()
+        with self._lock:
+            forgotten = [r for r in stored if r.split("/", 1)[0] == table]
+            for resource in forgotten:
+                del stored[resource]
+        if forgotten:
+            data_upload(
+                df=pd.DataFrame(columns=["resource", "table_name", "hash", "stored"]),
+                first_time="no",
+                table_name=self.TABLE,
+                path=self.path,
+                option_schema=self.option_schema,
+                partition={"table_name": table},
+            )
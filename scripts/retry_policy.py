@@ -0,0 +1,191 @@
+import random
+import re
+import threading
+import time
+
+# from scripts.output_txt import log_print
+
+from output_txt import log_print
+
+
+class CircuitOpen(Exception):
+    """
+    Raised without calling Yahoo while an endpoint's circuit is open
+    """
+
+
+class RetryPolicy(object):
+    """
+    One retry policy for every Yahoo request
+
+    Errors are sorted into classes, each with its own retry count and
+    exponential backoff (full jitter, capped). An endpoint that keeps
+    failing opens its circuit for cooldown seconds, so calls to it fail
+    fast while other endpoints and seasons keep running.
+    Backoff only sleeps the thread that made the request.
+    """
+
+    # class: retries, first backoff (seconds), longest backoff (seconds)
+    POLICIES = {
+        "invalid": {"retries": 0, "base": 0, "cap": 0},
+        "fixture": {"retries": 0, "base": 0, "cap": 0},
+        "circuit": {"retries": 0, "base": 0, "cap": 0},
+        "auth": {"retries": 2, "base": 0, "cap": 0},
+        "throttle": {"retries": 5, "base": 2, "cap": 120},
+        "network": {"retries": 6, "base": 5, "cap": 300},
+        "server": {"retries": 4, "base": 2, "cap": 60},
+        "other": {"retries": 2, "base": 5, "cap": 60},
+    }
+    # checked in order, the first class with a matching message wins
+    ERROR_CLASSES = [
+        # FixtureMissing, matched by message as scripts/ is imported two ways
+        ("fixture", ("No recorded response",)),
+        ("auth", ("token_expired", "token_rejected", "401 Client Error")),
+        ("throttle", ("rate limit", "Too Many Requests", "Request denied")),
+        (
+            "network",
+            (
+                "Network is unreachable",
+                "Connection",
+                "timed out",
+                "Max retries exceeded",
+                "Temporary failure in name resolution",
+            ),
+        ),
+        ("server", (re.compile(r"\b5\d\d Server Error"),)),
+        ("invalid", ("Invalid week", "No data found", "does not exist")),
+    ]
+    # classes that count toward opening an endpoint's circuit
+    BREAKER_CLASSES = ("network", "server", "other")
+
+    def __init__(
+        self,
+        policies=None,
+        max_retries=500,
+        failure_threshold=5,
+        cooldown=300,
+    ):
+        """
+        policies = {class: {"retries", "base", "cap"}} overrides for POLICIES
+        max_retries = retries allowed over the whole run, after that
+        every error is raised straight away
+        failure_threshold = requests in a row failing after all their retries
+        that open an endpoint's circuit
+        cooldown = seconds a circuit stays open before one trial request
+        """
+        self.policies = dict(self.POLICIES, **(policies or {}))
+        self.max_retries = max_retries
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.retries = 0
+        self._failures = {}
+        self._opened = {}
+        self._lock = threading.Lock()
+
+    def classify(self, error):
+        """
+        Error class of an exception, see ERROR_CLASSES
+        """
+        if isinstance(error, CircuitOpen):
+            return "circuit"
+
+        message = str(error)
+        for name, patterns in self.ERROR_CLASSES:
+            for pattern in patterns:
+                if isinstance(pattern, str) and pattern in message:
+                    return name
+                if not isinstance(pattern, str) and pattern.search(message):
+                    return name
+
+        return "other"
+
+    def backoff(self, name, attempt):
+        """
+        Seconds to wait before retry number attempt (0 based)
+        """
+        policy = self.policies[name]
+        return random.uniform(0, min(policy["cap"], policy["base"] * 2**attempt))
+
+    def _check_circuit(self, endpoint):
+        with self._lock:
+            opened = self._opened.get(endpoint)
+            if opened is None:
+                return
+            if time.monotonic() - opened < self.cooldown:
+                raise CircuitOpen(
+                    f"{endpoint} failed {self.failure_threshold} times in a row, "
+                    f"paused for {self.cooldown} seconds"
+                )
+            # half open, let this request through as the trial
+            del self._opened[endpoint]
+            self._failures[endpoint] = self.failure_threshold - 1
+
+    def _record(self, endpoint, name=None):
+        """
+        Record a success (name=None) or a failure of the given class
+        """
+        with self._lock:
+            if name is None:
+                self._failures.pop(endpoint, None)
+                return
+            if name not in self.BREAKER_CLASSES:
+                return
+
+            self._failures[endpoint] = self._failures.get(endpoint, 0) + 1
+            if self._failures[endpoint] >= self.failure_threshold:
+                self._opened[endpoint] = time.monotonic()
+
+    def _take_retry(self):
+        with self._lock:
+            if self.retries >= self.max_retries:
+                return False
+            self.retries += 1
+            return True
+
+    def call(self, endpoint, request, on_auth=None, on_throttle=None, **kwargs):
+        """
+        Run request(), retrying by the class of each error
+
+        endpoint = circuit breaker key
+        on_auth = called before retrying an expired token
+        on_throttle = called before retrying a throttled request,
+        returns the new request rate
+        kwargs = extra fields for the retry log
+        """
+        attempts = {}
+        while True:
+            self._check_circuit(endpoint)
+            try:
+                response = request()
+
+            except Exception as e:
+                name = self.classify(e)
+                attempt = attempts.get(name, 0)
+                if attempt >= self.policies[name]["retries"] or not self._take_retry():
+                    # the circuit counts requests that failed, not their retries
+                    self._record(endpoint, name)
+                    raise
+                attempts[name] = attempt + 1
+
+                if name == "auth" and on_auth is not None:
+                    on_auth()
+                if name == "throttle" and on_throttle is not None:
+                    kwargs["rate"] = f"{on_throttle():.3f} requests per second"
+
+                wait = self.backoff(name, attempt)
+                log_print(
+                    error=e,
+                    module_="retry_policy.py",
+                    func="call",
+                    endpoint=endpoint,
+                    error_class=name,
+                    attempt=attempt + 1,
+                    sleep=f"{wait:.1f} seconds before retrying",
+                    **kwargs,
+                )
+                time.sleep(wait)
+
+            else:
+                self._record(endpoint)
+                return response
@@ -0,0 +1,41 @@
+import threading
+
+# from scripts.output_txt import log_print
+
+from output_txt import log_print
+
+
+class RunStats(object):
+    """
+    Thread safe counters for one run, written to the log at the end
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def get(self, name, default=0):
+        with self._lock:
+            return self._counters.get(name, default)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def log(self, module_, **kwargs):
+        """
+        Write every counter (plus kwargs) to the log
+        """
+        stats = {
+            name: round(value, 3) if isinstance(value, float) else value
+            for name, value in sorted(self.snapshot().items())
+        }
+        log_print(success="Run stats", module_=module_, **stats, **kwargs)
+
+
+# counters for the whole process
+STATS = RunStats()
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# from scripts.run_stats import STATS
+
+from run_stats import STATS
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """
+    HTTPS connection that counts its TCP + TLS setup time in the run stats
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        STATS.add("connections")
+        STATS.add("connect_seconds", time.perf_counter() - start)
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """
+    requests adapter that keeps connections open for reuse
+    and times every new one
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": HTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class SessionPool(object):
+    """
+    Authenticated Yahoo OAuth sessions keyed by consumer credentials
+
+    The first league_season_data for a set of credentials authenticates,
+    every later one reuses its OAuth session and open connections,
+    so the setup cost is paid once per process instead of once per season
+    """
+
+    _sessions = {}
+    _lock = threading.Lock()
+
+    def __init__(self, pool_maxsize=16):
+        """
+        pool_maxsize = connections kept open per host, at least the
+        number of threads making requests at once
+        """
+        self.pool_maxsize = pool_maxsize
+
+    @staticmethod
+    def _key(consumer_key, consumer_secret):
+        # sessions do not survive a fork, so each process keeps its own
+        return (os.getpid(), str(consumer_key), str(consumer_secret))
+
+    def get(self, consumer_key, consumer_secret):
+        """
+        The pooled OAuth object for the credentials, None if there is none yet
+        """
+        with self._lock:
+            oauth = self._sessions.get(self._key(consumer_key, consumer_secret))
+
+        if oauth is not None:
+            STATS.add("sessions_reused")
+        return oauth
+
+    def add(self, consumer_key, consumer_secret, oauth):
+        """
+        Pool an authenticated OAuth object, mounting the keep-alive adapter
+        """
+        adapter = KeepAliveAdapter(
+            pool_connections=4, pool_maxsize=self.pool_maxsize
+        )
+        oauth.session.mount("https://", adapter)
+        oauth.session.mount("http://", adapter)
+
+        with self._lock:
+            self._sessions.setdefault(self._key(consumer_key, consumer_secret), oauth)
+
+
+# shared by every league_season_data in the process
+SESSION_POOL = SessionPool()
@@ -0,0 +1,463 @@
+import pandas as pd
+
+
+def _text(values, decimals):
+    return values
+
+
+def _integer(values, decimals):
+    # nullable, so missing values are written as NULL instead of 1.0 floats
+    return pd.to_numeric(values, errors="coerce").round().astype("Int64")
+
+
+def _number(values, decimals):
+    values = pd.to_numeric(values, errors="coerce")
+    return values if decimals is None else values.round(decimals)
+
+
+def _date(values, decimals):
+    return pd.to_datetime(values, errors="coerce")
+
+
+def _joined(values, decimals):
+    return values.map(lambda l: ", ".join(map(str, l)) if isinstance(l, list) else l)
+
+
+# column dtype: (postgres type, cast of a column's values)
+DTYPES = {
+    "text": ("TEXT", _text),
+    "int": ("INTEGER", _integer),
+    "bigint": ("BIGINT", _integer),
+    "float": ("NUMERIC", _number),
+    "date": ("DATE", _date),
+    "timestamp": ("TIMESTAMP", _date),
+    "list": ("TEXT", _joined),
+}
+
+
+class Column(object):
+    """
+    One column of a raw table
+    """
+
+    __slots__ = ("name", "sources", "dtype", "decimals", "default", "extract")
+
+    def __init__(self, name, source=None, dtype="text", decimals=None, default=None):
+        """
+        name = column name in postgres
+        source = flattened JSON path(s) the value is read from, the first
+        one holding a value wins, name when None
+        dtype = key of DTYPES
+        decimals = rounding of float columns
+        default = value of rows (or frames) without one
+        """
+        self.name = name
+        self.sources = (
+            (name,)
+            if source is None
+            else (source,) if isinstance(source, str) else tuple(source)
+        )
+        self.dtype = dtype
+        self.decimals = decimals
+        self.default = default
+        self.extract = self._compile()
+
+    def _compile(self):
+        """
+        Build the function reading this column out of a flattened frame
+        """
+        sources, default, decimals = self.sources, self.default, self.decimals
+        cast = DTYPES[self.dtype][1]
+
+        def extract(df):
+            values = None
+            for source in sources:
+                if source not in df.columns:
+                    continue
+                values = (
+                    df[source] if values is None else values.fillna(df[source])
+                )
+            if values is None:
+                values = pd.Series(default, index=df.index, dtype=object)
+            elif default is not None:
+                values = values.fillna(default)
+
+            return cast(values, decimals)
+
+        return extract
+
+
+class TableSchema(object):
+    """
+    Columns, postgres types and natural key of one raw table
+    """
+
+    def __init__(self, table, columns, key, extra=None, extra_dtype="text"):
+        """
+        table = postgres table name
+        columns = list of Column in table order
+        key = columns identifying a row, frames are deduplicated on them
+        extra = prefix of columns kept beyond the listed ones
+        (e.g. "stat." for one column per stat), numbered after it
+        extra_dtype = dtype of the extra columns
+        """
+        self.table = table
+        self.columns = columns
+        self.key = key
+        self.extra = extra
+        self.extra_dtype = extra_dtype
+        self.names = [column.name for column in columns]
+        self.sources = {source for column in columns for source in column.sources}
+        self._types = {column.name: DTYPES[column.dtype][0] for column in columns}
+        self._extra_cast = DTYPES[extra_dtype][1]
+
+    def frame(self, df, **constants):
+        """
+        Select, clean and type the table's columns out of a flattened frame
+
+        constants = columns set on every row, e.g. game_id=self.game_id
+        """
+        df = df.assign(**constants) if constants else df
+        data = {column.name: column.extract(df) for column in self.columns}
+        for name in self.extra_columns(df.columns):
+            data[name] = self._extra_cast(df[name], None)
+
+        table = pd.DataFrame(data, index=df.index)
+        return table.drop_duplicates(subset=self.key, ignore_index=True)
+
+    def extra_columns(self, columns):
+        """
+        Columns beyond the listed ones the table keeps, in number order
+        """
+        if self.extra is None:
+            return []
+
+        return sorted(
+            (c for c in columns if c.startswith(self.extra) and c not in self._types),
+            key=lambda c: int(c[len(self.extra) :]),
+        )
+
+    def types(self, columns):
+        """
+        {column: postgres type} for the columns of a frame being written
+        """
+        extra = DTYPES[self.extra_dtype][0]
+        return {column: self._types.get(column, extra) for column in columns}
+
+
+# suffix of the tables a write is gathered in before it replaces the real one
+STAGING = "_staging"
+
+
+def text_schema(table, columns):
+    """
+    Schema of a table not in SCHEMAS, every column TEXT
+    """
+    return TableSchema(table, [Column(c) for c in columns], key=None)
+
+
+def schema_for(table, columns):
+    """
+    The registered schema of a table, all TEXT when it has none,
+    a staging table is typed like the table it fills
+    """
+    if table.endswith(STAGING):
+        table = table[: -len(STAGING)]
+    return SCHEMAS.get(table) or text_schema(table, columns)
+
+
+IDS = [Column("game_id"), Column("league_id")]
+
+SCHEMAS = {
+    schema.table: schema
+    for schema in [
+        TableSchema(
+            "league_metadata",
+            IDS
+            + [
+                Column("name"),
+                Column("num_teams", dtype="int"),
+                Column("season", dtype="int"),
+                Column("start_date", dtype="date"),
+                Column("start_week", dtype="int"),
+                Column("end_date", dtype="date"),
+                Column("end_week", dtype="int"),
+            ],
+            key=["game_id", "league_id"],
+        ),
+        TableSchema(
+            "league_settings",
+            IDS
+            + [
+                Column("has_multiweek_championship", dtype="int", default=0),
+                Column("max_teams", dtype="int"),
+                Column("num_playoff_teams", dtype="int"),
+                Column("has_playoff_consolation_games", dtype="int", default=0),
+                Column("num_playoff_consolation_teams", dtype="int"),
+                Column("playoff_start_week", dtype="int"),
+                Column("trade_end_date", dtype="date"),
+            ],
+            key=["game_id", "league_id"],
+        ),
+        TableSchema(
+            "roster_positions",
+            IDS
+            + [
+                Column("position_type"),
+                Column("position"),
+                Column("count", dtype="int"),
+            ],
+            key=["game_id", "league_id", "position"],
+        ),
+        TableSchema(
+            "stat_categories",
+            IDS
+            + [
+                Column("stat_id", dtype="int"),
+                Column("name"),
+                Column("display_name"),
+                Column(
+                    "is_only_display_stat",
+                    "stat_position_types.stat_position_type.is_only_display_stat",
+                    dtype="int",
+                    default=0,
+                ),
+                Column(
+                    "position_type",
+                    [
+                        "stat_position_types.stat_position_type.position_type",
+                        "position_type",
+                    ],
+                ),
+                Column("stat_modifier", dtype="float", decimals=2),
+            ],
+            key=["game_id", "league_id", "stat_id"],
+        ),
+        TableSchema(
+            "player_list",
+            IDS
+            + [
+                Column("player_id", dtype="int"),
+                Column("player_key"),
+                Column("position_type"),
+                Column("display_position"),
+                Column("eligible_positions", dtype="list"),
+                Column("name.ascii_first"),
+                Column("name.ascii_last"),
+                Column("name.first"),
+                Column("name.last"),
+                Column("name.full"),
+                Column("uniform_number", dtype="int"),
+                Column("bye_weeks.week", dtype="int"),
+                Column("draft_analysis.average_round", dtype="float", decimals=2),
+                Column("draft_analysis.average_pick", dtype="float", decimals=2),
+                Column("draft_analysis.average_cost", dtype="float", decimals=2),
+                Column("draft_analysis.percent_drafted", dtype="float", decimals=4),
+                Column("editorial_team_key"),
+                Column("editorial_team_full_name"),
+                Column("editorial_team_abbr"),
+            ],
+            key=["game_id", "league_id", "player_key"],
+        ),
+        TableSchema(
+            "draft_results",
+            IDS
+            + [
+                Column("round", dtype="int"),
+                Column("pick", dtype="int"),
+                Column("player_key"),
+                Column("team_key"),
+                # player details, empty when pulled without draftresults/players
+                Column("player_id", dtype="int"),
+                Column("position_type"),
+                Column("display_position"),
+                Column("eligible_positions", dtype="list"),
+                Column("name.first"),
+                Column("name.last"),
+                Column("name.full"),
+                Column("bye_weeks.week", dtype="int"),
+                Column("editorial_team_key"),
+                Column("editorial_team_full_name"),
+                Column("editorial_team_abbr"),
+            ],
+            key=["game_id", "league_id", "pick"],
+        ),
+        TableSchema(
+            "transactions",
+            IDS
+            + [
+                Column("transaction_key"),
+                Column("transaction_id", dtype="int"),
+                Column("type"),
+                Column("status"),
+                Column("timestamp", dtype="bigint"),
+                Column("faab_bid", dtype="int"),
+                Column("trader_team_key"),
+                Column("tradee_team_key"),
+                Column("player_key"),
+                Column("player_id", dtype="int"),
+                Column("name.full"),
+                Column("display_position"),
+                Column("editorial_team_abbr"),
+                Column("transaction_data.type"),
+                Column("transaction_data.source_type"),
+                Column("transaction_data.source_team_key"),
+                Column("transaction_data.destination_type"),
+                Column("transaction_data.destination_team_key"),
+            ],
+            # one row per player moved
+            key=["game_id", "transaction_key", "player_key"],
+        ),
+        TableSchema(
+            "weekly_matchups",
+            [
+                Column("game_id"),
+                Column("is_consolation", dtype="int", default=0),
+                Column("is_playoffs", dtype="int", default=0),
+                Column("is_tied", dtype="int", default=0),
+                Column("league_id"),
+                Column("team_a_grade"),
+                Column("team_a_points", dtype="float", decimals=2),
+                Column("team_a_projected_points", dtype="float", decimals=2),
+                Column("team_a_team_key"),
+                Column("team_b_grade"),
+                Column("team_b_points", dtype="float", decimals=2),
+                Column("team_b_projected_points", dtype="float", decimals=2),
+                Column("team_b_team_key"),
+                Column("week", dtype="int"),
+                Column("week_start", dtype="date"),
+                Column("week_end", dtype="date"),
+                Column("winner_team_key"),
+            ],
+            key=["game_id", "week", "team_a_team_key"],
+        ),
+        TableSchema(
+            "league_teams",
+            IDS
+            + [
+                Column("team_id", dtype="int"),
+                Column("team_key"),
+                Column("manager_id", dtype="int"),
+                Column("clinched_playoffs", dtype="int", default=0),
+                # leagues without draft grades or FAAB
+                Column("draft_grade", default="Z"),
+                Column("faab_balance", dtype="int", default=0),
+                Column("name"),
+                Column("nickname"),
+                Column("number_of_moves", dtype="int"),
+                Column("number_of_trades", dtype="int"),
+                Column("team_standings.playoff_seed", dtype="int"),
+                Column("team_standings.rank", dtype="int"),
+                Column("team_standings.outcome_totals.wins", dtype="int"),
+                Column("team_standings.outcome_totals.losses", dtype="int"),
+                Column("team_standings.outcome_totals.ties", dtype="int"),
+                Column(
+                    "team_standings.outcome_totals.percentage",
+                    dtype="float",
+                    decimals=4,
+                ),
+                Column("team_standings.points_for", dtype="float", decimals=2),
+                Column("team_standings.points_against", dtype="float", decimals=2),
+            ],
+            key=["game_id", "league_id", "team_key"],
+        ),
+        TableSchema(
+            "weekly_team_roster",
+            IDS
+            + [
+                Column("week", dtype="int"),
+                Column("team_id", dtype="int"),
+                Column("selected_position.position"),
+                Column("player_id", dtype="int"),
+                Column("player_key"),
+                Column("display_position"),
+                Column("eligible_positions", dtype="list"),
+                Column("position_type"),
+            ],
+            key=["game_id", "week", "team_id", "player_key"],
+        ),
+        TableSchema(
+            "weekly_team_pts",
+            IDS
+            + [
+                Column("team_id", dtype="int"),
+                Column("team_key"),
+                Column("week", dtype="int"),
+                Column("final_points", dtype="float", decimals=2),
+                Column("projected_points", dtype="float", decimals=2),
+            ],
+            key=["game_id", "week", "team_id"],
+        ),
+        TableSchema(
+            "weekly_player_stats",
+            IDS
+            + [
+                Column("week", dtype="int"),
+                Column("player_id", dtype="int"),
+                Column("player_key"),
+                Column("name.full"),
+                Column("display_position"),
+                Column("position_type"),
+                Column("editorial_team_abbr"),
+                Column("player_points.total", dtype="float", decimals=2),
+            ],
+            key=["game_id", "week", "player_key"],
+            extra="stat.",
+            extra_dtype="float",
+        ),
+        TableSchema(
+            "game_keys",
+            IDS
+            + [
+                Column("season", dtype="int"),
+                Column("is_game_over", dtype="int"),
+                Column("is_offseason", dtype="int"),
+            ],
+            key=["game_id"],
+        ),
+        TableSchema(
+            "nfl_weeks",
+            [
+                Column("week", dtype="int"),
+                Column("start", dtype="date"),
+                Column("end", dtype="date"),
+                Column("game_id"),
+            ],
+            key=["game_id", "week"],
+        ),
+        # see GameDayScheduler
+        TableSchema(
+            "scheduled_jobs",
+            [
+                Column("job"),
+                Column("kind"),
+                Column("game_id"),
+                Column("week", dtype="int"),
+                Column("due", dtype="timestamp"),
+                Column("finished", dtype="timestamp"),
+            ],
+            key=["job"],
+        ),
+        # see league_season_data.transactions
+        TableSchema(
+            "transaction_cursors",
+            [
+                Column("game_id"),
+                Column("newest", dtype="bigint"),
+                Column("stored", dtype="timestamp"),
+            ],
+            key=["game_id"],
+        ),
+        # see ResponseHashes
+        TableSchema(
+            "response_hashes",
+            [
+                Column("resource"),
+                Column("table_name"),
+                Column("hash"),
+                Column("stored", dtype="timestamp"),
+            ],
+            key=["resource"],
+        ),
+    ]
+}
@@ -0,0 +1,198 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # windows, token refreshes are only shared inside the process
+    fcntl = None
+
+# from scripts.output_txt import log_print
+
+from output_txt import log_print
+
+
+class TokenManager(object):
+    """
+    Refresh the Yahoo OAuth token in the background before it expires
+
+    One manager is shared by every league_season_data in a process
+    (see shared), and processes share the token through auth_dir/token.json,
+    guarded by a file lock so only one of them refreshes it
+    """
+
+    EXPIRES_IN = 3600
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, auth_dir, refresh_margin=300, retry_every=30):
+        """
+        auth_dir = folder holding token.json
+        refresh_margin = seconds before expiry the token is refreshed
+        retry_every = seconds between attempts when a refresh fails
+        """
+        self.token_file = Path(auth_dir) / "token.json"
+        self.lock_file = Path(auth_dir) / "token.json.lock"
+        self.refresh_margin = refresh_margin
+        self.retry_every = retry_every
+        self.refreshes = 0
+
+        self.token = {}
+        self._queries = weakref.WeakSet()
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def shared(cls, auth_dir, **kwargs):
+        """
+        The manager for auth_dir in this process, created on first use
+        """
+        key = (os.getpid(), str(Path(auth_dir).resolve()))
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(auth_dir, **kwargs)
+            return cls._shared[key]
+
+    @property
+    def expires_at(self):
+        return self.token.get("token_time", 0) + self.EXPIRES_IN
+
+    def attach(self, query):
+        """
+        Keep an authenticated YahooFantasySportsQuery on the shared token
+        and start the background refresh
+        """
+        with self._lock:
+            self._queries.add(query)
+            if not self.token:
+                self.token = self._read() or {}
+                self.token.setdefault("token_time", query.oauth.token_time)
+            self._apply(query)
+
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="yahoo-token-refresh", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def ensure_fresh(self):
+        """
+        Refresh now if the token is inside the refresh margin,
+        a cheap check to run before each request
+        """
+        if time.time() >= self.expires_at - self.refresh_margin:
+            self.refresh()
+
+    def refresh(self, force=False):
+        """
+        Refresh the token, or pick up the one another process just refreshed
+
+        force = refresh even if the token has not reached the margin yet,
+        used when Yahoo rejects the current token
+        """
+        with self._lock, self._file_lock():
+            stored = self._read()
+            stored_time = (stored or {}).get("token_time", 0)
+            if stored_time > self.token.get("token_time", 0):
+                # another process got here first
+                self.token = stored
+                self._apply_all()
+                return
+
+            if not force and time.time() < self.expires_at - self.refresh_margin:
+                return
+
+            query = next(iter(self._queries), None)
+            if query is None:
+                return
+            self.token = dict(stored or {}, **query.oauth.refresh_access_token())
+            self._write(self.token)
+            self.refreshes += 1
+            self._apply_all()
+
+            log_print(
+                success="Refreshed Yahoo token",
+                module_="token_manager.py",
+                func="refresh",
+                force=force,
+                expires=time.ctime(self.expires_at),
+            )
+
+    def _run(self):
+        wait = self._seconds_until_refresh()
+        while not self._stop.wait(wait):
+            try:
+                self.refresh()
+                wait = self._seconds_until_refresh()
+            except Exception as e:
+                log_print(
+                    error=e,
+                    module_="token_manager.py",
+                    func="_run",
+                    sleep=f"{self.retry_every} seconds before retrying",
+                )
+                wait = self.retry_every
+
+    def _seconds_until_refresh(self):
+        return max(1, self.expires_at - self.refresh_margin - time.time())
+
+    def _apply(self, query):
+        """
+        Point a query's OAuth session at the current token
+        """
+        oauth = query.oauth
+        for key in ("access_token", "refresh_token", "token_type", "token_time"):
+            if key in self.token:
+                setattr(oauth, key, self.token[key])
+        oauth.session.access_token = oauth.access_token
+
+    def _apply_all(self):
+        for query in list(self._queries):
+            self._apply(query)
+
+    def _read(self):
+        try:
+            with open(self.token_file) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, token):
+        fd, tmp = tempfile.mkstemp(dir=self.token_file.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(token, file)
+        os.replace(tmp, self.token_file)
+
+    def _file_lock(self):
+        return _FileLock(self.lock_file)
+
+
+class _FileLock(object):
+    """
+    Exclusive lock on a file shared by every process, a no-op without fcntl
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, "a")
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
@@ -0,0 +1,105 @@
+import queue
+import threading
+import time
+
+# from scripts.output_txt import log_print
+# from scripts.run_stats import STATS
+# from scripts.utils import data_upload
+
+from output_txt import log_print
+from run_stats import STATS
+from utils import data_upload
+
+
+class UploadWriter(object):
+    """
+    One thread writing every upload of a run, in the order they were submitted
+
+    The threads fetching and transforming responses hand their frames over
+    through a bounded queue and go back to Yahoo, so each COPY into postgres
+    runs while the next requests are still waiting on the network.
+    A full queue blocks them until the writer catches up,
+    keeping at most maxsize uploads in memory
+    """
+
+    def __init__(self, maxsize=8):
+        """
+        maxsize = submitted jobs waiting to be written before submit blocks
+        """
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        # tables of the uploads that were not written
+        self.failed = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="upload_writer", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, uploads, on_written=None):
+        """
+        Queue uploads to be written one after the other
+
+        uploads = list of data_upload keyword arguments
+        on_written = called on the writer thread with True once every
+        upload was written, e.g. to store the response hash
+        """
+        start = time.perf_counter()
+        self._queue.put((uploads, on_written))
+        STATS.add("upload_wait_seconds", time.perf_counter() - start)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+
+                uploads, on_written = job
+                start = time.perf_counter()
+                written = [data_upload(**upload) for upload in uploads]
+                self.failed.extend(
+                    upload["table_name"]
+                    for upload, ok in zip(uploads, written)
+                    if not ok
+                )
+                STATS.add("uploads", len(uploads))
+                STATS.add("upload_seconds", time.perf_counter() - start)
+                if on_written is not None:
+                    on_written(all(written))
+
+            except Exception as e:
+                self.failed.extend(upload["table_name"] for upload in uploads)
+                log_print(
+                    error=e,
+                    module_="upload_writer.py",
+                    func="_run",
+                    tables=[upload["table_name"] for upload in uploads],
+                )
+
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """
+        Wait until everything submitted so far is written
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Write what is left and stop the writer thread
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
@@ -8,10 +8,12 @@ from datetime import datetime as dt
 # from scripts.db_psql_model import DatabaseCursor
 # from scripts.tournament import Tournament
 # from scripts.output_txt import log_print, log_print_tourney
+# from scripts.table_schema import STAGING, schema_for
 
 from db_psql_model import DatabaseCursor
 from tournament import Tournament
 from output_txt import log_print, log_print_tourney
+from table_schema import STAGING, schema_for
 
 
 PATH = list(Path().cwd().parent.glob("**/private.yaml"))[0]
@@ -102,21 +104,29 @@ def game_keys_pull(first="yes"):
         # print(f"\n----ERROR utils.py: game_keys_pull\n----{e}\n")
 
 
-def data_upload(df: pd.DataFrame, first_time, table_name, path, option_schema, query):
+def data_upload(
+    df: pd.DataFrame, first_time, table_name, path, option_schema, partition=None
+):
+    """
+    Write a dataframe to postgres, typed by the table's TableSchema
+
+    first_time = "YES" drops and recreates the table
+    partition = {column: value} rows of the table df replaces in one
+    transaction, leaving other seasons and weeks untouched,
+    None only appends
+    Returns True once the rows are written
+    """
 
     try:
-        if str(first_time).upper() == "YES":
-            DatabaseCursor(
-                path, option_schema=option_schema
-            ).copy_table_to_postgres_new(df, table_name, first_time="YES")
-
-        elif str(first_time).upper() == "NO":
-            psql = DatabaseCursor(path).copy_data_from_postgres(query)
-            df = pd.concat([psql, df])
-            df.drop_duplicates(ignore_index=True, inplace=True)
-            DatabaseCursor(
-                path, option_schema=option_schema
-            ).copy_table_to_postgres_new(df, table_name, first_time="NO")
+        schema = schema_for(table_name, df.columns)
+        return DatabaseCursor(path, option_schema=option_schema).replace_rows(
+            df,
+            table_name,
+            partition,
+            types=schema.types(df.columns),
+            key=schema.key,
+            first_time=first_time,
+        )
 
     except Exception as e:
         log_print(
@@ -125,13 +135,43 @@ def data_upload(df: pd.DataFrame, first_time, table_name, path, option_schema, q
             func="data_upload",
             first_time=first_time,
             table_name=table_name,
-            query=query,
             path=path,
             option_schema=option_schema,
+            partition=partition,
         )
         # print(f"\n----ERROR utils.py: data_upload\n----{table_name}\n----{e}\n")
 
 
+def data_swap(table_name, path, option_schema, partition, first_time="no"):
+    """
+    Move a partition gathered in the table's staging table into the table,
+    replacing its rows in one transaction
+
+    partition = {column: value} rows of the table replaced, e.g. a season
+    Returns True once the rows are swapped in
+    """
+
+    try:
+        return DatabaseCursor(path, option_schema=option_schema).replace_from(
+            table_name + STAGING,
+            table_name,
+            partition,
+            key=schema_for(table_name, []).key,
+            first_time=first_time,
+        )
+
+    except Exception as e:
+        log_print(
+            error=e,
+            module_="utils.py",
+            func="data_swap",
+            first_time=first_time,
+            table_name=table_name,
+            option_schema=option_schema,
+            partition=partition,
+        )
+
+
 def reg_season(game_id, nfl_week):
     """
     Fucntion to calculate regular season rankings, scores, wins/losses, and matchups
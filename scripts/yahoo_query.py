@@ -6,17 +6,39 @@ import time
 import yaml
 from psycopg2 import sql
 from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from yfpy import YahooFantasySportsQuery
+from yfpy.models import League
 from yfpy.utils import complex_json_handler, unpack_data
 from yfpy import get_logger
 
 # from scripts.db_psql_model import DatabaseCursor
-# from scripts.utils import data_upload
+# from scripts.utils import data_swap, data_upload
 # from scripts.output_txt import log_print
+# from scripts.rate_limiter import RateLimiter
+# from scripts.record_accumulator import RecordAccumulator
+# from scripts.response_cache import ResponseCache
+# from scripts.retry_policy import RetryPolicy
+# from scripts.token_manager import TokenManager
+# from scripts.session_pool import SESSION_POOL
+# from scripts.run_stats import STATS
+# from scripts.table_schema import SCHEMAS, STAGING
+# from scripts.response_hashes import ResponseHashes
+# import scripts.raw_decode as raw_decode
 
 from db_psql_model import DatabaseCursor
-from utils import data_upload
+from utils import data_swap, data_upload
 from output_txt import log_print
+from rate_limiter import RateLimiter
+from record_accumulator import RecordAccumulator
+from response_cache import ResponseCache
+from retry_policy import RetryPolicy
+from token_manager import TokenManager
+from session_pool import SESSION_POOL
+from run_stats import STATS
+from table_schema import SCHEMAS, STAGING
+from response_hashes import ResponseHashes
+import raw_decode
 
 PATH = list(Path().cwd().parent.glob("**/private.yaml"))[0]
 TEAMS_FILE = list(Path().cwd().parent.glob("**/teams.yaml"))[0]
@@ -26,6 +48,45 @@ class league_season_data(object):
 
     LOGGET = get_logger(__name__)
     LOG_OUTPUT = False
+    PLAYER_BATCH = 25
+    SCOREBOARD_BATCH = 17
+    GAME_BATCH = 25
+    TRANSACTION_PAGE = 25
+    # raw_decode struct fields behind the matchup and roster columns
+    RAW_MATCHUP_COLUMNS = {
+        "is_consolation": "is_consolation",
+        "is_playoffs": "is_playoffs",
+        "is_tied": "is_tied",
+        "team_a_grade": "team_a.grade",
+        "team_a_points": "team_a.points",
+        "team_a_projected_points": "team_a.projected_points",
+        "team_a_team_key": "team_a.team_key",
+        "team_b_grade": "team_b.grade",
+        "team_b_points": "team_b.points",
+        "team_b_projected_points": "team_b.projected_points",
+        "team_b_team_key": "team_b.team_key",
+        "week": "week",
+        "week_start": "week_start",
+        "week_end": "week_end",
+        "winner_team_key": "winner_team_key",
+    }
+    RAW_ROSTER_COLUMNS = {
+        "team_id": "team_id",
+        "week": "week",
+        "selected_position.position": "selected_position",
+        "player_id": "player_id",
+        "player_key": "player_key",
+        "display_position": "display_position",
+        "eligible_positions": "eligible_positions",
+        "position_type": "position_type",
+    }
+    # league;out= sub-resource: (method that builds its tables, League attribute)
+    SEASON_OUT = {
+        "settings": ("set_roster_pos_stat_cat", "settings"),
+        "standings": ("teams_and_standings", "standings"),
+        "draftresults": ("draft_results", "draft_results"),
+        "scoreboard": ("matchups_by_week", "scoreboard"),
+    }
     logging.getLogger("yfpy.query").setLevel(level=logging.INFO)
 
     def __init__(
@@ -39,7 +100,25 @@ class league_season_data(object):
         consumer_key=None,
         consumer_secret=None,
         browser_callback=True,
+        max_workers=4,
+        rate_limiter=None,
+        response_cache=None,
+        fixtures=None,
+        retry_policy=None,
+        token_manager=None,
+        session_pool=None,
+        raw_decode=True,
+        response_hashes=None,
+        upload_writer=None,
     ):
+        """
+        raw_decode = build matchups, rosters and team points straight from
+        the raw JSON instead of through the yfpy models
+        response_hashes = ResponseHashes, responses unchanged since the
+        last successful write are skipped, every response is written when None
+        upload_writer = UploadWriter taking the writes off the calling thread,
+        every frame is written before its method returns when None
+        """
         self._auth_dir = auth_dir
         self._consumer_key = str(consumer_key)
         self._consumer_secret = str(consumer_secret)
@@ -51,396 +130,423 @@ class league_season_data(object):
 
         self.offline = offline
         self.all_output_as_json = all_output_as_json
-
+        self.max_workers = max_workers
+        self.raw_decode = raw_decode
+        self.response_hashes = response_hashes
+        self.upload_writer = upload_writer
+        # methods that logged an error instead of pulling, in the order they failed
+        self.failures = []
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.response_cache = response_cache
+        self.fixtures = fixtures
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.session_pool = session_pool if session_pool is not None else SESSION_POOL
+        replaying = self.fixtures is not None and self.fixtures.replaying
+
+        # reuse the OAuth session (and its open connections) of an earlier instance
+        pooled = None
+        if not (self.offline or replaying):
+            pooled = self.session_pool.get(self._consumer_key, self._consumer_secret)
+
+        start = time.perf_counter()
         self.yahoo_query = YahooFantasySportsQuery(
             auth_dir=self._auth_dir,
             league_id=self.league_id,
             game_id=self.game_id,
             game_code=self.game_code,
-            offline=self.offline,
+            offline=self.offline or replaying or pooled is not None,
             all_output_as_json=self.all_output_as_json,
             consumer_key=self._consumer_key,
             consumer_secret=self._consumer_secret,
             browser_callback=self._browser_callback,
         )
+        if pooled is not None:
+            self.yahoo_query.oauth = pooled
+            self.yahoo_query.offline = False
+        elif not (self.offline or replaying):
+            STATS.add("oauth_setups")
+            STATS.add("oauth_setup_seconds", time.perf_counter() - start)
+            self.session_pool.add(
+                self._consumer_key, self._consumer_secret, self.yahoo_query.oauth
+            )
+        if replaying:
+            # recorded responses stand in for Yahoo, so skip auth but still run queries
+            self.yahoo_query.offline = False
+        if game_id is not None:
+            # yfpy looks the league key up with an extra request on every call unless it is set
+            self.yahoo_query.league_key = f"{self.game_id}.l.{self.league_id}"
+
+        self.token_manager = None
+        if getattr(self.yahoo_query, "oauth", None) is not None:
+            # keep the token fresh in the background instead of waiting for token_expired
+            self.token_manager = (
+                token_manager
+                if token_manager is not None
+                else TokenManager.shared(self.yahoo_query._auth_dir)
+            )
+            self.token_manager.attach(self.yahoo_query)
 
-    def metadata(self, first_time="no"):
+        # route every request yfpy makes through the fixtures, cache and rate limiter
+        self._get_response = self.yahoo_query.get_response
+        self.yahoo_query.get_response = self._yahoo_response
+
+    def _yahoo_response(self, url, retries=3, backoff=0):
         """
-        Pull League Metadata
+        Serve a request from the recorded fixtures or the response cache
+        when possible, otherwise fetch it from Yahoo and store it
+        """
+        if self.fixtures is not None and self.fixtures.replaying:
+            return self.fixtures.replay(url)
+
+        if self.response_cache is None:
+            response = self._limited_response(url, retries, backoff)
+
+        else:
+            response = self.response_cache.get(url)
+            if response is None:
+                response = self._limited_response(url, retries, backoff)
+                self.response_cache.put(url, response)
+
+        if self.fixtures is not None:
+            self.fixtures.record(url, response)
+
+        return response
+
+    def _limited_response(self, url, retries=3, backoff=0):
+        """
+        Wait for the rate limiter before each Yahoo request,
+        retrying failed requests through the retry policy only
+
+        retries, backoff = yfpy's retry arguments, left to the retry policy
+        """
+
+        def request():
+            if self.token_manager is not None:
+                self.token_manager.ensure_fresh()
+            self.rate_limiter.acquire()
+            # yfpy's own retries would re-enter this wrapper, the policy retries
+            response = self._get_response(url, 0, 0)
+            self.rate_limiter.success()
+            return response
+
+        key = ResponseCache.key(url)
+        return self.retry_policy.call(
+            f"{key['game_id']}/{key['endpoint']}",
+            request,
+            on_auth=self._reauthenticate,
+            on_throttle=self.rate_limiter.throttled,
+            game_id=self.game_id,
+            url=url,
+        )
+
+    def _reauthenticate(self):
+        """
+        Replace a token Yahoo rejected, through the shared token manager when there is one
+        """
+        if self.token_manager is not None:
+            self.token_manager.refresh(force=True)
+        else:
+            self.yahoo_query._authenticate()
+
+    def _fetch(self, fetch, skip=()):
+        """
+        Run a yfpy query, None when Yahoo has no data for it (e.g. an invalid week)
+
+        skip = other error messages that mean there is no data
         """
         try:
-            try:
-                response = complex_json_handler(self.yahoo_query.get_league_metadata())
-            except Exception as e:
-                if "Invalid week" in str(e):
-                    return
-                elif "token_expired" in str(e):
-                    self.yahoo_query._authenticate()
-                elif "Network is unreachable" in str(e):
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="metadata",
-                            game_id=self.game_id,
-                            first_time=first_time,
-                            sleep="15 min before retrying",
-                        )
-                        time.sleep(900)
-                else:
-                    log_print(
-                        error=e,
-                        module_="yahoo_query.py",
-                        func="metadata",
-                        game_id=self.game_id,
-                        first_time=first_time,
-                        sleep="1 hour before retrying",
-                    )
-                    time.sleep(3600)
-                    try:
-                        self.yahoo_query._authenticate()
-                    except Exception as e:
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="metadata",
-                            game_id=self.game_id,
-                            first_time=first_time,
-                            sleep="30 min before 2nd retry",
-                        )
-                        time.sleep(1800)
-                        self.yahoo_query._authenticate()
-
-                response = complex_json_handler(self.yahoo_query.get_league_metadata())
-
-            league_metadata = pd.json_normalize(response)
-            league_metadata["game_id"] = self.game_id
-            league_metadata.drop_duplicates(ignore_index=True, inplace=True)
-            league_metadata = league_metadata[
-                [
-                    "game_id",
-                    "league_id",
-                    "name",
-                    "num_teams",
-                    "season",
-                    "start_date",
-                    "start_week",
-                    "end_date",
-                    "end_week",
-                ]
-            ]
+            return fetch()
 
-            # league_metadata["game_id"] = league_metadata["game_id"].astype(int)
-            # league_metadata["league_id"] = league_metadata["league_id"].astype(int)
-            # league_metadata["name"] = league_metadata["name"].astype(str)
-            # league_metadata["num_teams"] = league_metadata["num_teams"].astype(int)
-            # league_metadata["season"] = league_metadata["season"].astype(int)
-            league_metadata["start_date"] = league_metadata["start_date"].astype(
-                "datetime64[D]"
-            )
-            # league_metadata["start_week"] = league_metadata["start_week"].astype(int)
-            league_metadata["end_date"] = league_metadata["end_date"].astype(
-                "datetime64[D]"
-            )
-            # league_metadata["end_week"] = league_metadata["end_week"].astype(int)
-
-            query = (
-                'SELECT DISTINCT "game_id"'
-                ', "league_id"'
-                ', "name"'
-                ', "num_teams"'
-                ', "season"'
-                ', "start_date"'
-                ', "start_week"'
-                ', "end_date"'
-                ', "end_week" '
-                "FROM raw.league_metadata "
-                "WHERE game_id <> '" +self.game_id+ "' "
-                'ORDER BY "game_id"'
-                ', "league_id" '
-            )
+        except Exception as e:
+            error_class = self.retry_policy.classify(e)
+            if error_class == "invalid" or (
+                error_class == "other" and any(s in str(e) for s in skip)
+            ):
+                return None
+            raise
+
+    def _raw(self, url, skip=()):
+        """
+        The raw fantasy_content of a request, skipping the yfpy models,
+        None when Yahoo has no data for it
+        """
+        return self._fetch(
+            lambda: self.yahoo_query.get_response(url).json()["fantasy_content"],
+            skip=skip,
+        )
 
-            data_upload(
-                df=league_metadata,
+    @staticmethod
+    def _read(query):
+        """
+        Read from postgres, raising instead of returning None on a failed read
+        """
+        df = DatabaseCursor(PATH, option_schema="raw").copy_data_from_postgres(query)
+        if df is None:
+            raise Exception(f"Could not read from postgres: {query}")
+
+        return df
+
+    def _table_exists(self, table, schema="raw"):
+        """
+        Whether a table has been created, a failed lookup raises
+        rather than passing for a missing table
+        """
+        tables = self._read(
+            "SELECT COUNT(*) AS tables FROM information_schema.tables "
+            f"WHERE table_schema = '{schema}' AND table_name = '{table}'"
+        )
+
+        return int(tables["tables"].iloc[0]) > 0
+
+    def _unchanged(self, resource, response, first_time="no"):
+        """
+        Hash a response and compare it with the hash stored for the resource
+        by the last successful write, skipped responses are counted in STATS
+
+        resource = table and the part of it the response fills
+        Returns (whether the response can be skipped, its hash or None)
+        """
+        if self.response_hashes is None:
+            return False, None
+
+        digest = ResponseHashes.digest(response)
+        # a table being recreated is written either way, its old hashes dropped
+        if str(first_time).upper() == "YES":
+            self.response_hashes.forget(resource.split("/", 1)[0])
+        elif self.response_hashes.unchanged(resource, digest):
+            STATS.add("unchanged_responses")
+            return True, digest
+
+        return False, digest
+
+    def _written(self, resource, digest, written):
+        """
+        Store a response's hash once everything built from it was written
+        """
+        if digest is not None and written:
+            self.response_hashes.store(resource, digest)
+
+    def _upload(self, frames, first_time, partition, resource=None, digest=None):
+        """
+        Write frames into raw, through the upload_writer when there is one,
+        then store the hash of the response they were built from
+
+        frames = {table: frame} written in order, e.g. settings and positions
+        partition = rows of each table the frames replace
+        """
+        uploads = [
+            dict(
+                df=df,
                 first_time=first_time,
-                table_name="league_metadata",
-                query=query,
+                table_name=table,
                 path=PATH,
                 option_schema="raw",
+                partition=partition,
             )
+            for table, df in frames.items()
+        ]
+        if self.upload_writer is not None:
+            self.upload_writer.submit(
+                uploads, lambda written: self._written(resource, digest, written)
+            )
+        else:
+            written = [data_upload(**upload) for upload in uploads]
+            # named like the UploadWriter's, so a job fails either way
+            self.failures.extend(
+                f"write/{upload['table_name']}"
+                for upload, ok in zip(uploads, written)
+                if not ok
+            )
+            self._written(resource, digest, all(written))
 
-            return league_metadata
+    def season_resources(
+        self,
+        first_time="no",
+        out=("settings", "standings", "draftresults"),
+        metadata=True,
+    ):
+        """
+        Pull the league's out sub-resources in one league;out=... request,
+        then build each table from its part
+
+        out = keys of SEASON_OUT to pull, "scoreboard" adds the current
+        week's matchups
+        metadata = also build raw.league_metadata from the league itself
+        Returns {method: what the method returned}
+        """
+        try:
+            if not out and not metadata:
+                return {}
+
+            league_key = self.yahoo_query.get_league_key()
+            url = f"https://fantasysports.yahooapis.com/fantasy/v2/league/{league_key}"
+            if out:
+                url += f";out={','.join(out)}"
+            response = self._fetch(
+                lambda: self.yahoo_query.query(url, ["league"], League)
+            )
+            if response is None:
+                return
+
+            results = {}
+            if metadata:
+                results["metadata"] = self.metadata(first_time, response=response)
+            for resource in out:
+                method, attribute = self.SEASON_OUT[resource]
+                part = getattr(response, attribute)
+                if resource == "scoreboard":
+                    if part.matchups:
+                        results[method] = self.matchups_by_week(
+                            first_time, nfl_week=part.week, response=part.matchups
+                        )
+                else:
+                    # a part missing from the response is pulled on its own
+                    results[method] = getattr(self, method)(
+                        first_time, response=part or None
+                    )
+
+            return results
 
         except Exception as e:
+            self.failures.append("season_resources")
             log_print(
                 error=e,
                 module_="yahoo_query.py",
-                func="metadata",
+                func="season_resources",
                 game_id=self.game_id,
+                out=out,
                 first_time=first_time,
             )
 
-    def set_roster_pos_stat_cat(self, first_time="no"):
+    def metadata(self, first_time="no", response=None, upload=True):
         """
-        Get Roster Positions, Stat Categories, and League Settigns
+        Pull League Metadata
+
+        response = yfpy League already pulled (e.g. by a LeagueBatch),
+        fetched from Yahoo when None
+        upload = False returns the frame without writing it
         """
         try:
-            try:
-                response = complex_json_handler(self.yahoo_query.get_league_settings())
-            except Exception as e:
-                if "Invalid week" in str(e):
-                    return
-                elif "token_expired" in str(e):
-                    self.yahoo_query._authenticate()
-                elif "Network is unreachable" in str(e):
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="set_roster_pos_stat_cat",
-                            game_id=self.game_id,
-                            first_time=first_time,
-                            sleep="15 min before retrying",
-                        )
-                        time.sleep(900)
-                else:
-                    log_print(
-                        error=e,
-                        module_="yahoo_query.py",
-                        func="set_roster_pos_stat_cat",
-                        game_id=self.game_id,
-                        first_time=first_time,
-                        sleep="1 hour before retrying",
-                    )
-                    time.sleep(3600)
-                    try:
-                        self.yahoo_query._authenticate()
-                    except Exception as e:
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="set_roster_pos_stat_cat",
-                            game_id=self.game_id,
-                            first_time=first_time,
-                            sleep="30 min before 2nd retry",
-                        )
-                        time.sleep(1800)
-                        self.yahoo_query._authenticate()
-
-                response = complex_json_handler(self.yahoo_query.get_league_settings())
+            if response is None:
+                response = self._fetch(lambda: self.yahoo_query.get_league_metadata())
+            if response is None:
+                return
+            resource = f"league_metadata/{self.game_id}"
+            unchanged, digest = (
+                self._unchanged(resource, response, first_time)
+                if upload
+                else (False, None)
+            )
+            if unchanged:
+                return
 
-            league_settings = pd.json_normalize(response)
-            league_settings.drop(
-                ["roster_positions", "stat_categories.stats", "stat_modifiers.stats"],
-                axis=1,
-                inplace=True,
+            # a League pulled with sub-resources also carries them, keep the metadata
+            league_metadata = SCHEMAS["league_metadata"].frame(
+                RecordAccumulator([complex_json_handler(response)]).frame(),
+                game_id=self.game_id,
             )
 
-            league_settings["game_id"] = self.game_id
-            league_settings["league_id"] = self.league_id
-            league_settings["has_playoff_consolation_games"].fillna(0, inplace=True)
-            league_settings["has_multiweek_championship"].fillna(0, inplace=True)
-            league_settings.drop_duplicates(ignore_index=True, inplace=True)
-            league_settings = league_settings[
-                [
-                    "game_id",
-                    "league_id",
-                    "has_multiweek_championship",
-                    "max_teams",
-                    "num_playoff_teams",
-                    "has_playoff_consolation_games",
-                    "num_playoff_consolation_teams",
-                    "playoff_start_week",
-                    "trade_end_date",
-                ]
-            ]
+            if upload:
+                self._upload(
+                    {"league_metadata": league_metadata},
+                    first_time,
+                    {"game_id": self.game_id},
+                    resource,
+                    digest,
+                )
 
-            # league_settings["game_id"] = league_settings["game_id"].astype(int)
-            # league_settings["league_id"] = league_settings["league_id"].astype(int)
-            # league_settings["has_multiweek_championship"] = league_settings[
-            #     "has_multiweek_championship"
-            # ].astype(int)
-            # league_settings["max_teams"] = league_settings["max_teams"].astype(int)
-            # league_settings["num_playoff_teams"] = league_settings[
-            #     "num_playoff_teams"
-            # ].astype(int)
-            # league_settings["has_playoff_consolation_games"] = league_settings[
-            #     "has_playoff_consolation_games"
-            # ].astype(int)
-            # league_settings["num_playoff_consolation_teams"] = league_settings[
-            #     "num_playoff_consolation_teams"
-            # ].astype(int)
-            # league_settings["playoff_start_week"] = league_settings[
-            #     "playoff_start_week"
-            # ].astype(int)
-            league_settings["trade_end_date"] = league_settings[
-                "trade_end_date"
-            ].astype("datetime64[D]")
-
-            query_1 = (
-                'SELECT DISTINCT "game_id" '
-                ', "league_id" '
-                ', "has_multiweek_championship" '
-                ', "max_teams"'
-                ', "num_playoff_teams" '
-                ', "has_playoff_consolation_games" '
-                ', "num_playoff_consolation_teams" '
-                ', "playoff_start_week" '
-                ', "trade_end_date" '
-                "FROM raw.league_settings "
-                "WHERE game_id <> '" +self.game_id+ "' "
-                'ORDER BY "game_id" '
-                ', "league_id" '
-            )
+            return league_metadata
 
-            data_upload(
-                df=league_settings,
+        except Exception as e:
+            self.failures.append("metadata")
+            log_print(
+                error=e,
+                module_="yahoo_query.py",
+                func="metadata",
+                game_id=self.game_id,
                 first_time=first_time,
-                table_name="league_settings",
-                query=query_1,
-                path=PATH,
-                option_schema="raw",
             )
 
-            roster_positions = pd.DataFrame()
-            for r in response["roster_positions"]:
-                row = pd.json_normalize(complex_json_handler(r["roster_position"]))
-                roster_positions = pd.concat([roster_positions, row])
-
-            roster_positions["game_id"] = self.game_id
-            roster_positions["league_id"] = self.league_id
-            roster_positions.drop_duplicates(ignore_index=True, inplace=True)
-            roster_positions = roster_positions[
-                ["game_id", "league_id", "position_type", "position", "count"]
-            ]
+    def set_roster_pos_stat_cat(self, first_time="no", response=None, upload=True):
+        """
+        Get Roster Positions, Stat Categories, and League Settigns
 
-            # roster_positions["game_id"] = roster_positions["game_id"].astype(int)
-            # roster_positions["league_id"] = roster_positions["league_id"].astype(int)
-            # roster_positions["position_type"] = roster_positions[
-            #     "position_type"
-            # ].astype(str)
-            # roster_positions["position"] = roster_positions["position"].astype(str)
-            # roster_positions["count"] = roster_positions["count"].astype(int)
-
-            query_2 = (
-                'SELECT DISTINCT "game_id"'
-                ', "league_id" '
-                ', "position_type" '
-                ', "position" '
-                ', "count" '
-                "FROM raw.roster_positions "
-                "WHERE game_id <> '" +self.game_id+ "' "
-                'ORDER BY "game_id"'
-                ', "league_id"'
+        response = yfpy Settings already pulled (e.g. by a LeagueBatch),
+        fetched from Yahoo when None
+        upload = False returns the frames without writing them
+        """
+        try:
+            if response is None:
+                response = self._fetch(lambda: self.yahoo_query.get_league_settings())
+            if response is None:
+                return
+            resource = f"league_settings/{self.game_id}"
+            unchanged, digest = (
+                self._unchanged(resource, response, first_time)
+                if upload
+                else (False, None)
             )
+            if unchanged:
+                return
+            response = complex_json_handler(response)
 
-            data_upload(
-                df=roster_positions,
-                first_time=first_time,
-                table_name="roster_positions",
-                query=query_2,
-                path=PATH,
-                option_schema="raw",
+            league_settings = SCHEMAS["league_settings"].frame(
+                RecordAccumulator([response]).frame(),
+                game_id=self.game_id,
+                league_id=self.league_id,
             )
 
-            stat_categories = pd.DataFrame()
-            for r in response["stat_categories"]["stats"]:
-                row = pd.json_normalize(complex_json_handler(r["stat"]))
-                try:
-                    row["position_type"] = complex_json_handler(
-                        complex_json_handler(r["stat"])["stat_position_types"][
-                            "stat_position_type"
-                        ]
-                    )["position_type"]
-                except:
-                    pass
-
-                try:
-                    row["is_only_display_stat"] = complex_json_handler(
-                        complex_json_handler(r["stat"])["stat_position_types"][
-                            "stat_position_type"
-                        ]
-                    )["is_only_display_stat"]
-                except:
-                    row["is_only_display_stat"] = 0
-
-                try:
-                    row.drop(
-                        "stat_position_types.stat_position_type", axis=1, inplace=True
-                    )
-                except:
-                    pass
-
-                stat_categories = pd.concat([stat_categories, row])
-
-            stat_categories["game_id"] = self.game_id
-            stat_categories["league_id"] = self.league_id
-
-            stat_modifiers = pd.DataFrame()
-            for r in response["stat_modifiers"]["stats"]:
-                row = pd.json_normalize(complex_json_handler(r["stat"]))
-                stat_modifiers = pd.concat([stat_modifiers, row])
-
-            stat_modifiers.rename(columns={"value": "stat_modifier"}, inplace=True)
-
-            stat_categories = stat_categories.merge(
-                stat_modifiers, how="outer", on="stat_id"
+            roster_positions = SCHEMAS["roster_positions"].frame(
+                RecordAccumulator(
+                    complex_json_handler(r["roster_position"])
+                    for r in response["roster_positions"]
+                ).frame(),
+                game_id=self.game_id,
+                league_id=self.league_id,
             )
-            stat_categories = stat_categories[
-                [
-                    "game_id",
-                    "league_id",
-                    "stat_id",
-                    "name",
-                    "display_name",
-                    "is_only_display_stat",
-                    "position_type",
-                    "stat_modifier",
-                ]
-            ]
 
-            # stat_categories["game_id"] = stat_categories["game_id"].astype(int)
-            # stat_categories["league_id"] = stat_categories["league_id"].astype(int)
-            # stat_categories["stat_id"] = stat_categories["stat_id"].astype(int)
-            # stat_categories["name"] = stat_categories["name"].astype(str)
-            # stat_categories["display_name"] = stat_categories["display_name"].astype(
-            #     str
-            # )
-            # stat_categories["is_only_display_stat"] = stat_categories[
-            #     "is_only_display_stat"
-            # ].astype(int)
-            # stat_categories["position_type"] = stat_categories["position_type"].astype(
-            #     str
-            # )
-            stat_categories["stat_modifier"] = (
-                stat_categories["stat_modifier"].astype(float).round(decimals=2)
-            )
+            stat_modifiers = {
+                stat.stat_id: stat.value
+                for stat in (r["stat"] for r in response["stat_modifiers"]["stats"])
+            }
+            stat_categories = RecordAccumulator()
+            for r in response["stat_categories"]["stats"]:
+                stat = complex_json_handler(r["stat"])
+                position_type = (stat.pop("stat_position_types", None) or {}).get(
+                    "stat_position_type"
+                )
+                # stats of several position types keep their own position_type
+                if position_type is not None and not isinstance(position_type, list):
+                    stat["stat_position_types"] = {
+                        "stat_position_type": complex_json_handler(position_type)
+                    }
+                stat_categories.append(
+                    stat, stat_modifier=stat_modifiers.get(stat["stat_id"])
+                )
 
-            query_3 = (
-                'SELECT DISTINCT "game_id" '
-                ', "league_id"'
-                ', "stat_id"'
-                ', "name"'
-                ', "display_name"'
-                ', "is_only_display_stat"'
-                ', "position_type"'
-                ', "stat_modifier"'
-                "FROM raw.stat_categories "
-                "WHERE game_id <> '" +self.game_id+ "' "
-                'ORDER BY "game_id"'
-                ', "league_id"'
+            stat_categories = SCHEMAS["stat_categories"].frame(
+                stat_categories.frame(),
+                game_id=self.game_id,
+                league_id=self.league_id,
             )
 
-            data_upload(
-                df=stat_categories,
-                first_time=first_time,
-                table_name="stat_categories",
-                query=query_3,
-                path=PATH,
-                option_schema="raw",
-            )
+            if upload:
+                self._upload(
+                    {
+                        "league_settings": league_settings,
+                        "roster_positions": roster_positions,
+                        "stat_categories": stat_categories,
+                    },
+                    first_time,
+                    {"game_id": self.game_id},
+                    resource,
+                    digest,
+                )
 
             return league_settings, roster_positions, stat_categories
 
         except Exception as e:
+            self.failures.append("set_roster_pos_stat_cat")
             log_print(
                 error=e,
                 module_="yahoo_query.py",
@@ -451,341 +557,401 @@ class league_season_data(object):
             # print(f"\n----ERROR yahoo_query.py: set_roster_pos_stat_cat\n----{self.game_id}--{self.league_id}\n----{e}\n")
 
     def players_list(self, first_time="no"):
-        """ """
+        """
+        Pull the league's player pool PLAYER_BATCH players a page,
+        with up to max_workers pages in flight, copying each page into
+        raw.player_list_staging as it arrives
+
+        Once the short last page is in, the season's staged rows replace
+        its rows in raw.player_list in one transaction. A page missing or
+        failing drops what was staged and leaves the stored pool as it was
+        Returns the number of players written
+        """
+        staging = "player_list" + STAGING
+        written = 0
         try:
-            players = pd.DataFrame()
-            try:
-                response = self.yahoo_query.get_league_players()
-            except Exception as e:
-                if "token_expired" in str(e):
-                    self.yahoo_query._authenticate()
-                elif "Network is unreachable" in str(e):
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="players_list",
-                            game_id=self.game_id,
-                            first_time=first_time,
-                            sleep="15 min before retrying",
-                        )
-                        time.sleep(900)
-                else:
-                    log_print(
-                        error=e,
-                        module_="yahoo_query.py",
-                        func="players_list",
-                        game_id=self.game_id,
-                        first_time=first_time,
-                        sleep="1 hour before retrying",
-                    )
-                    time.sleep(3600)
-                    try:
-                        self.yahoo_query._authenticate()
-                    except Exception as e:
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="players_list",
-                            game_id=self.game_id,
-                            first_time=first_time,
-                            sleep="30 min before 2nd retry",
-                        )
-                        time.sleep(1800)
-                        self.yahoo_query._authenticate()
+            full_pages = {}
+            start = 0
+            last_page = False
+            pending = {}
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while True:
+                    # keep max_workers pages in flight until a short page comes back
+                    while not last_page and len(pending) < self.max_workers:
+                        future = executor.submit(self._players_page, start, first_time)
+                        pending[future] = start
+                        start += self.PLAYER_BATCH
+                    if not pending:
+                        break
+
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        page = pending.pop(future)
+                        players, full_pages[page] = future.result()
+                        last_page = last_page or not full_pages[page]
+                        if players is None or players.empty:
+                            continue
+
+                        # the first page staged clears what a failed run left
+                        partition = {"game_id": self.game_id}
+                        if written:
+                            partition["player_key"] = list(players["player_key"])
+                        if not data_upload(
+                            df=players,
+                            first_time=first_time if not written else "no",
+                            table_name=staging,
+                            path=PATH,
+                            option_schema="raw",
+                            partition=partition,
+                        ):
+                            raise Exception(f"Could not stage player page at {page}")
+                        written += len(players)
+
+            # the pool ends at the first short page, a full page after it
+            # means one in between came back empty
+            end = min(page for page, full in full_pages.items() if not full)
+            missing = sorted(p for p, full in full_pages.items() if full and p > end)
+            if missing:
+                raise Exception(
+                    f"Player page at {end} came back empty, "
+                    f"before the full pages at {missing}"
+                )
 
-                response = self.yahoo_query.get_league_players()
+            if written and not data_swap(
+                "player_list",
+                path=PATH,
+                option_schema="raw",
+                partition={"game_id": self.game_id},
+                first_time=first_time,
+            ):
+                raise Exception("Could not swap the staged pool into raw.player_list")
 
-            for r in response:
-                player = pd.json_normalize(complex_json_handler(r["player"]))
-                try:
-                    draft_analysis = pd.json_normalize(
-                        complex_json_handler(
-                            self.yahoo_query.get_player_draft_analysis(
-                                player["player_key"][0]
-                            )
-                        )
-                    )
+            log_print(
+                success="Pulled player pool",
+                module_="yahoo_query.py",
+                func="players_list",
+                game_id=self.game_id,
+                players=written,
+                pages=start // self.PLAYER_BATCH,
+            )
 
-                except Exception as e:
-                    if "token_expired" in str(e):
-                        self.yahoo_query._authenticate()
-                    else:
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="draft_results --> player draft analysis",
-                            game_id=self.game_id,
-                            first_time=first_time,
-                            sleep="1 hour before retrying",
-                        )
-                        time.sleep(3600)
-                        try:
-                            self.yahoo_query._authenticate()
-                        except Exception as e:
-                            log_print(
-                                error=e,
-                                module_="yahoo_query.py",
-                                func="draft_results --> player draft analysis",
-                                game_id=self.game_id,
-                                first_time=first_time,
-                                sleep="30 min before 2nd retry",
-                            )
-                            time.sleep(1800)
-                            self.yahoo_query._authenticate()
-
-                    draft_analysis = pd.json_normalize(
-                        complex_json_handler(
-                            self.yahoo_query.get_player_draft_analysis(
-                                player["player_key"][0]
-                            )
-                        )
-                    )
+            return written
 
-                draft_analysis = draft_analysis[
-                    [
-                        "draft_analysis.average_pick",
-                        "draft_analysis.average_round",
-                        "draft_analysis.average_cost",
-                        "draft_analysis.percent_drafted",
-                    ]
-                ]
-                player = pd.concat([player, draft_analysis], axis=1)
-                if "status" not in player.columns:
-                    player["status"] = np.nan
+        except Exception as e:
+            self.failures.append("players_list")
+            log_print(
+                error=e,
+                module_="yahoo_query.py",
+                func="players_list",
+                game_id=self.game_id,
+                first_time=first_time,
+            )
+            # the stored pool is left as it was, what was staged is dropped
+            if written:
+                data_upload(
+                    df=pd.DataFrame(columns=["game_id"]),
+                    first_time="no",
+                    table_name=staging,
+                    path=PATH,
+                    option_schema="raw",
+                    partition={"game_id": self.game_id},
+                )
+            # print(f"\n----ERROR yahoo_query.py: players_list.\n----{self.game_id}--{self.league_id}\n----{e}\n")
 
-                players = pd.concat([players, player], ignore_index=True)
-                time.sleep(2.5)
+    def _players_page(self, start, first_time="no"):
+        """
+        One page of the player pool with its draft analysis
 
-            players["eligible_positions"] = [
-                ", ".join(map(str, l)) for l in players["eligible_positions"]
-            ]
-            players["game_id"] = self.game_id
-            players["league_id"] = self.league_id
-            players.drop_duplicates(
-                subset=[
-                    "display_position",
-                    "editorial_player_key",
-                    "editorial_team_key",
-                    "player_id",
-                    "player_key",
-                ],
-                ignore_index=True,
-                inplace=True,
+        start = index of the page's first player
+        Returns (players frame or None, whether the page was full)
+        """
+        url = (
+            "https://fantasysports.yahooapis.com/fantasy/v2/league/"
+            f"{self.yahoo_query.get_league_key()}/players;"
+            f"start={start};count={self.PLAYER_BATCH}"
+        )
+        response = self._fetch(
+            lambda: self.yahoo_query.query(url, ["league", "players"])
+        )
+        if not response:
+            return None, False
+        # a single player comes back as a dict instead of a list
+        if not isinstance(response, list):
+            response = [response]
+
+        players = RecordAccumulator(
+            complex_json_handler(r["player"]) for r in response
+        ).frame()
+
+        draft_analysis = self._draft_analysis(
+            list(players["player_key"]), first_time
+        )
+        # players are still written when their draft analysis is missing
+        if draft_analysis is not None:
+            draft_analysis.drop_duplicates(
+                subset=["player_key"], ignore_index=True, inplace=True
             )
+            players = players.merge(draft_analysis, how="left", on="player_key")
+
+        players = SCHEMAS["player_list"].frame(
+            players, game_id=self.game_id, league_id=self.league_id
+        )
 
-            players = players[
-                [
-                    "game_id",
-                    "league_id",
-                    "player_id",
-                    "player_key",
-                    "position_type",
-                    "display_position",
-                    "eligible_positions",
-                    "name.ascii_first",
-                    "name.ascii_last",
-                    "name.first",
-                    "name.last",
-                    "name.full",
-                    "uniform_number",
-                    "bye_weeks.week",
-                    "draft_analysis.average_round",
-                    "draft_analysis.average_pick",
-                    "draft_analysis.average_cost",
-                    "draft_analysis.percent_drafted",
-                    "editorial_team_key",
-                    "editorial_team_full_name",
-                    "editorial_team_abbr",
-                ]
+        return players, len(response) == self.PLAYER_BATCH
+
+    def _draft_analysis(self, player_keys, first_time="no"):
+        """
+        Pull draft analysis for up to PLAYER_BATCH players in one request
+        through the league players collection
+        """
+        url = (
+            "https://fantasysports.yahooapis.com/fantasy/v2/league/"
+            f"{self.yahoo_query.get_league_key()}/players;"
+            f"player_keys={','.join(player_keys)}/draft_analysis"
+        )
+        response = self._fetch(
+            lambda: self.yahoo_query.query(url, ["league", "players"])
+        )
+        if response is None:
+            return
+
+        # a single player comes back as a dict instead of a list
+        if not isinstance(response, list):
+            response = [response]
+
+        draft_analysis = RecordAccumulator(
+            complex_json_handler(r["player"]) for r in response
+        ).frame(
+            columns=[
+                "player_key",
+                "draft_analysis.average_pick",
+                "draft_analysis.average_round",
+                "draft_analysis.average_cost",
+                "draft_analysis.percent_drafted",
             ]
+        )
 
-            # players["game_id"] = players["game_id"].astype(int)
-            # players["league_id"] = players["league_id"].astype(int)
-            # players["player_id"] = players["player_id"].astype(int)
-            # players["player_key"] = players["player_key"].astype(str)
-            # players["position_type"] = players["position_type"].astype(str)
-            # players["display_position"] = players["display_position"].astype(str)
-            # players["eligible_positions"] = players["eligible_positions"].astype(str)
-            # players["name.ascii_first"] = players["name.ascii_first"].astype(str)
-            # players["name.ascii_last"] = players["name.ascii_last"].astype(str)
-            # players["name.first"] = players["name.first"].astype(str)
-            # players["name.last"] = players["name.last"].astype(str)
-            # players["name.full"] = players["name.full"].astype(str)
-            # players["uniform_number"] = players["uniform_number"].astype(int)
-            # players["bye_weeks.week"] = players["bye_weeks.week"].astype(int)
-            players["draft_analysis.average_round"] = (
-                players["draft_analysis.average_round"].astype(float).round(decimals=2)
-            )
-            players["draft_analysis.average_pick"] = (
-                players["draft_analysis.average_pick"].astype(float).round(decimals=2)
-            )
-            players["draft_analysis.average_cost"] = (
-                players["draft_analysis.average_cost"].astype(float).round(decimals=2)
-            )
-            players["draft_analysis.percent_drafted"] = (
-                players["draft_analysis.percent_drafted"]
-                .astype(float)
-                .round(decimals=4)
-            )
-            # players["editorial_team_key"] = players["editorial_team_key"].astype(str)
-            # players["editorial_team_full_name"] = players[
-            #     "editorial_team_full_name"
-            # ].astype(str)
-            # players["editorial_team_abbr"] = players["editorial_team_abbr"].astype(str)
-
-            query = (
-                'SELECT DISTINCT "game_id"'
-                ',"league_id"'
-                ',"player_id"'
-                ',"player_key"'
-                ',"position_type"'
-                ',"display_position"'
-                ',"eligible_positions"'
-                ',"name.ascii_first"'
-                ',"name.ascii_last"'
-                ',"name.first"'
-                ',"name.last"'
-                ',"name.full"'
-                ',"uniform_number"'
-                ',"bye_weeks.week"'
-                ',"draft_analysis.average_round"'
-                ',"draft_analysis.average_pick"'
-                ',"draft_analysis.average_cost"'
-                ',"draft_analysis.percent_drafted"'
-                ',"editorial_team_key"'
-                ',"editorial_team_full_name"'
-                ',"editorial_team_abbr" '
-                "FROM raw.player_list "
-                "WHERE game_id <> '" +self.game_id+ "' "
-                'ORDER BY "game_id"'
-                ', "league_id"'
-                ', "player_id"'
-                ', "editorial_team_key"'
+        return draft_analysis
+
+    def draft_results(
+        self, first_time="no", response=None, upload=True, players=False
+    ):
+        """
+        response = yfpy draft results already pulled (e.g. by a LeagueBatch),
+        fetched from Yahoo when None
+        upload = False returns the frame without writing it
+        players = True pulls draftresults/players, so each pick is stored
+        with its player's details instead of only the player_key
+        """
+        try:
+            if response is None and players:
+                response = self._fetch(
+                    lambda: self.yahoo_query.query(
+                        "https://fantasysports.yahooapis.com/fantasy/v2/league/"
+                        f"{self.yahoo_query.league_key}/draftresults/players",
+                        ["league", "draft_results"],
+                    )
+                )
+            elif response is None:
+                response = self._fetch(
+                    lambda: self.yahoo_query.get_league_draft_results()
+                )
+            if response is None:
+                return
+            resource = f"draft_results/{self.game_id}"
+            unchanged, digest = (
+                self._unchanged(resource, response, first_time)
+                if upload
+                else (False, None)
             )
+            if unchanged:
+                return
 
-            data_upload(
-                df=players,
-                first_time=first_time,
-                table_name="player_list",
-                query=query,
-                path=PATH,
-                option_schema="raw",
+            draft_results = RecordAccumulator()
+            for r in response:
+                pick = complex_json_handler(r["draft_result"])
+                pick.pop("players", None)
+                draft_results.append(pick, **self._draft_player(r["draft_result"]))
+            draft_results = SCHEMAS["draft_results"].frame(
+                draft_results.frame(), game_id=self.game_id, league_id=self.league_id
             )
 
-            return players
+            if upload:
+                self._upload(
+                    {"draft_results": draft_results},
+                    first_time,
+                    {"game_id": self.game_id},
+                    resource,
+                    digest,
+                )
+
+            return draft_results
 
         except Exception as e:
+            self.failures.append("draft_results")
             log_print(
                 error=e,
                 module_="yahoo_query.py",
-                func="players_list",
+                func="draft_results",
                 game_id=self.game_id,
                 first_time=first_time,
             )
-            # print(f"\n----ERROR yahoo_query.py: players_list.\n----{self.game_id}--{self.league_id}\n----{e}\n")
+            # print(f"\n----ERROR yahoo_query.py: draft_results.\n----{self.game_id}--{self.league_id}\n----{e}\n")
 
-    def draft_results(self, first_time="no"):
-        """ """
+    @classmethod
+    def _draft_player(cls, draft_result):
+        """
+        The raw.draft_results columns of a pick's player,
+        empty when the draft results were pulled without players
+        """
+        player = draft_result.extracted_data.get("players")
+        if isinstance(player, list):
+            player = player[0] if player else None
+        if isinstance(player, dict):
+            player = player.get("player")
+        if not player:
+            return {}
+
+        player = RecordAccumulator.flatten(complex_json_handler(player))
+        sources = SCHEMAS["draft_results"].sources
+        return {c: v for c, v in player.items() if c in sources}
+
+    def transactions(self, first_time="no", count=TRANSACTION_PAGE):
+        """
+        Page through the league's transactions, newest first, and stop at
+        the season's cursor in raw.transaction_cursors
+
+        Each page is written as soon as it is pulled, one row per player moved.
+        The cursor only moves once the pages reached it (or the last page),
+        so a run stopped part way is pulled from the old cursor again
+        count = transactions per request
+        Returns the number of transactions written
+        """
         try:
-            try:
-                response = self.yahoo_query.get_league_draft_results()
-            except Exception as e:
-                if "Invalid week" in str(e):
-                    return
-                elif "token_expired" in str(e):
-                    self.yahoo_query._authenticate()
-                elif "Network is unreachable" in str(e):
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="draft_results",
-                            game_id=self.game_id,
-                            first_time=first_time,
-                            sleep="15 min before retrying",
+            newest = None
+            if str(first_time).upper() != "YES":
+                # no table yet, the first page creates it
+                if not self._table_exists("transactions"):
+                    first_time = "yes"
+                # no cursor yet, every page is pulled
+                elif self._table_exists("transaction_cursors"):
+                    held = self._read(
+                        "SELECT newest FROM raw.transaction_cursors "
+                        "WHERE game_id = '" + self.game_id + "'"
+                    )
+                    if not held.empty and not pd.isna(held["newest"].iloc[0]):
+                        newest = int(held["newest"].iloc[0])
+
+            league_key = self.yahoo_query.get_league_key()
+            written = 0
+            start = 0
+            cursor = newest
+            while True:
+                response = self._fetch(
+                    lambda: self.yahoo_query.query(
+                        "https://fantasysports.yahooapis.com/fantasy/v2/league/"
+                        f"{league_key}/transactions;start={start};count={count}",
+                        ["league", "transactions"],
+                    )
+                )
+                if not response:
+                    break
+                if isinstance(response, dict):
+                    response = [response]
+
+                transactions = RecordAccumulator()
+                keys = []
+                caught_up = False
+                for r in response:
+                    transaction = complex_json_handler(r["transaction"])
+                    players = transaction.pop("players", None) or [{}]
+                    cursor = max(cursor or 0, int(transaction["timestamp"]))
+                    # the transaction at the stored timestamp is written again
+                    if newest is not None and int(transaction["timestamp"]) <= newest:
+                        caught_up = True
+                        if int(transaction["timestamp"]) < newest:
+                            continue
+
+                    keys.append(transaction["transaction_key"])
+                    for player in (
+                        players if isinstance(players, list) else [players]
+                    ):
+                        player = complex_json_handler(player.get("player", {}))
+                        # a player moved twice in one transaction keeps the first
+                        if isinstance(player.get("transaction_data"), list):
+                            player["transaction_data"] = player["transaction_data"][0]
+                        transactions.append(
+                            dict(transaction, **RecordAccumulator.flatten(player))
                         )
-                        time.sleep(900)
-                else:
-                    log_print(
-                        error=e,
-                        module_="yahoo_query.py",
-                        func="draft_results",
+
+                if keys:
+                    page = SCHEMAS["transactions"].frame(
+                        transactions.frame(),
                         game_id=self.game_id,
-                        first_time=first_time,
-                        sleep="1 hour before retrying",
+                        league_id=self.league_id,
                     )
-                    time.sleep(3600)
-                    try:
-                        self.yahoo_query._authenticate()
-                    except Exception as e:
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="draft_results",
-                            game_id=self.game_id,
-                            first_time=first_time,
-                            sleep="30 min before 2nd retry",
+                    if not data_upload(
+                        df=page,
+                        first_time=first_time,
+                        table_name="transactions",
+                        path=PATH,
+                        option_schema="raw",
+                        partition={"game_id": self.game_id, "transaction_key": keys},
+                    ):
+                        raise Exception(
+                            f"Could not write raw.transactions page at {start}"
                         )
-                        time.sleep(1800)
-                        self.yahoo_query._authenticate()
-
-                response = self.yahoo_query.get_league_draft_results()
+                    first_time = "no"
+                    written += len(keys)
+
+                if caught_up or len(response) < count:
+                    break
+                start += count
+
+            if cursor is not None and cursor != newest:
+                if not data_upload(
+                    df=pd.DataFrame(
+                        {
+                            "game_id": [self.game_id],
+                            "newest": [cursor],
+                            "stored": [pd.Timestamp.now()],
+                        }
+                    ),
+                    first_time="no",
+                    table_name="transaction_cursors",
+                    path=PATH,
+                    option_schema="raw",
+                    partition={"game_id": self.game_id},
+                ):
+                    raise Exception("Could not write raw.transaction_cursors")
 
-            draft_results = pd.DataFrame()
-            for r in response:
-                row = pd.json_normalize(complex_json_handler(r["draft_result"]))
-                draft_results = pd.concat([draft_results, row])
-
-            draft_results["game_id"] = self.game_id
-            draft_results["league_id"] = self.league_id
-            draft_results.drop_duplicates(ignore_index=True, inplace=True)
-            draft_results = draft_results[
-                ["game_id", "league_id", "round", "pick", "player_key", "team_key"]
-            ]
-
-            # draft_results["game_id"] = draft_results["game_id"].astype(int)
-            # draft_results["league_id"] = draft_results["league_id"].astype(int)
-            # draft_results["round"] = draft_results["round"].astype(int)
-            # draft_results["pick"] = draft_results["pick"].astype(int)
-            # draft_results["player_key"] = draft_results["player_key"].astype(str)
-            # draft_results["team_key"] = draft_results["team_key"].astype(str)
-
-            query = (
-                'SELECT DISTINCT "game_id"'
-                ', "league_id"'
-                ', "round"'
-                ', "pick"'
-                ', "player_key"'
-                ', "team_key" '
-                "FROM raw.draft_results "
-                "WHERE game_id <> '" +self.game_id+ "' "
-                'ORDER BY "game_id"'
-                ', "league_id"'
-                ', "pick"'
-            )
-
-            data_upload(
-                df=draft_results,
-                first_time=first_time,
-                table_name="draft_results",
-                query=query,
-                path=PATH,
-                option_schema="raw",
+            log_print(
+                success="Pulled transactions",
+                module_="yahoo_query.py",
+                func="transactions",
+                game_id=self.game_id,
+                newest=cursor,
+                transactions=written,
+                pages=start // count + 1,
             )
 
-            return draft_results
+            return written
 
         except Exception as e:
+            self.failures.append("transactions")
             log_print(
                 error=e,
                 module_="yahoo_query.py",
-                func="draft_results",
+                func="transactions",
                 game_id=self.game_id,
                 first_time=first_time,
             )
-            # print(f"\n----ERROR yahoo_query.py: draft_results.\n----{self.game_id}--{self.league_id}\n----{e}\n")
 
-    def matchups_by_week(self, first_time="no", nfl_week=None):
-        """ """
+    def matchups_by_week(self, first_time="no", nfl_week=None, response=None):
+        """
+        response = the week's matchups already pulled (e.g. with the
+        league's scoreboard), fetched from Yahoo when None
+        """
         try:
             if nfl_week == None:
                 print(
@@ -793,386 +959,235 @@ class league_season_data(object):
                 )
 
             else:
-                m = []
-                team_a = pd.DataFrame()
-                team_b = pd.DataFrame()
-
-                try:
-                    response = self.yahoo_query.get_league_matchups_by_week(nfl_week)
-                except Exception as e:
-                    if "Invalid week" in str(e):
-                        return
-                    elif "scoreboard" in str(e):
-                        return
-                    elif "token_expired" in str(e):
-                        self.yahoo_query._authenticate()
-                    elif "Network is unreachable" in str(e):
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="matchups_by_week",
-                            game_id=self.game_id,
-                            nfl_week=nfl_week,
-                            first_time=first_time,
-                            sleep="15 min before retrying",
-                        )
-                        time.sleep(900)
-                    else:
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="matchups_by_week",
-                            game_id=self.game_id,
-                            nfl_week=nfl_week,
-                            first_time=first_time,
-                            sleep="1 hour before retrying",
-                        )
-                        time.sleep(3600)
-                        try:
-                            self.yahoo_query._authenticate()
-                        except Exception as e:
-                            log_print(
-                                error=e,
-                                module_="yahoo_query.py",
-                                func="matchups_by_week",
-                                game_id=self.game_id,
-                                nfl_week=nfl_week,
-                                first_time=first_time,
-                                sleep="30 min before 2nd retry",
-                            )
-                            time.sleep(1800)
-                            self.yahoo_query._authenticate()
-
-                    response = self.yahoo_query.get_league_matchups_by_week(nfl_week)
-
-                for data in response:
-                    m.append(complex_json_handler(data["matchup"]))
-
-                matchups = pd.DataFrame()
-                for r in m:
-                    matchup = pd.json_normalize(r)
-                    matchup = matchup[
-                        [
-                            "is_consolation",
-                            "is_matchup_recap_available",
-                            "is_playoffs",
-                            "is_tied",
-                            "matchup_recap_title",
-                            "matchup_recap_url",
-                            "status",
-                            "week",
-                            "week_end",
-                            "week_start",
-                            "winner_team_key",
-                        ]
-                    ]
-                    try:
-                        team_a = pd.json_normalize(
-                            complex_json_handler(
-                                r["matchup_grades"][0]["matchup_grade"]
-                            )
-                        )
-                        team_a["points"] = complex_json_handler(r["teams"][0]["team"])[
-                            "team_points"
-                        ]["total"]
-                        team_a["projected_points"] = complex_json_handler(
-                            r["teams"][0]["team"]
-                        )["team_projected_points"]["total"]
-
-                    except:
-                        team_a = pd.json_normalize(
-                            complex_json_handler(r["teams"][0]["team"])
-                        )
-                        team_a = team_a[
-                            [
-                                "team_key",
-                                "team_points.total",
-                                "team_projected_points.total",
-                            ]
-                        ]
-                        team_a["grade"] = ""
-                        team_a.rename(
-                            columns={
-                                "team_points.total": "points",
-                                "team_projected_points.total": "projected_points",
-                            },
-                            inplace=True,
-                        )
+                raw = response is None and self.raw_decode
+                if raw:
+                    response = self._raw_scoreboard(nfl_week)
+                elif response is None:
+                    response = self._fetch(
+                        lambda: self.yahoo_query.get_league_matchups_by_week(nfl_week),
+                        skip=("scoreboard",),
+                    )
+                if response is None:
+                    return
+                resource = f"weekly_matchups/{self.game_id}/{nfl_week}"
+                unchanged, digest = self._unchanged(resource, response, first_time)
+                if unchanged:
+                    return
 
-                    team_a = team_a.add_prefix("team_a_")
+                matchups = (
+                    self._raw_matchups(response)
+                    if raw
+                    else self._matchup_frame(response)
+                )
+                if matchups is None:
+                    return
 
-                    try:
-                        team_b = pd.json_normalize(
-                            complex_json_handler(
-                                r["matchup_grades"][1]["matchup_grade"]
-                            )
-                        )
-                        team_b["points"] = complex_json_handler(r["teams"][1]["team"])[
-                            "team_points"
-                        ]["total"]
-                        team_b["projected_points"] = complex_json_handler(
-                            r["teams"][1]["team"]
-                        )["team_projected_points"]["total"]
-
-                    except:
-                        team_b = pd.json_normalize(
-                            complex_json_handler(r["teams"][1]["team"])
-                        )
-                        team_b = team_b[
-                            [
-                                "team_key",
-                                "team_points.total",
-                                "team_projected_points.total",
-                            ]
-                        ]
-                        team_b["grade"] = ""
-                        team_b.rename(
-                            columns={
-                                "team_points.total": "points",
-                                "team_projected_points.total": "projected_points",
-                            },
-                            inplace=True,
-                        )
+            self._upload(
+                {"weekly_matchups": matchups},
+                first_time,
+                {"game_id": self.game_id, "week": nfl_week},
+                resource,
+                digest,
+            )
 
-                    team_b = team_b.add_prefix("team_b_")
-
-                    matchup = pd.concat([matchup, team_a, team_b], axis=1)
-
-                    matchups = pd.concat([matchups, matchup])
-
-                try:
-                    matchups.drop(["teams", "matchup_grades"], axis=1, inplace=True)
-
-                except:
-                    pass
-
-                matchups["game_id"] = self.game_id
-                matchups["league_id"] = self.league_id
-                matchups["is_playoffs"].fillna(0, inplace=True)
-                matchups["is_consolation"].fillna(0, inplace=True)
-                matchups["is_tied"].fillna(0, inplace=True)
-
-            matchups = matchups[
-                [
-                    "game_id",
-                    "is_consolation",
-                    "is_playoffs",
-                    "is_tied",
-                    "league_id",
-                    "team_a_grade",
-                    "team_a_points",
-                    "team_a_projected_points",
-                    "team_a_team_key",
-                    "team_b_grade",
-                    "team_b_points",
-                    "team_b_projected_points",
-                    "team_b_team_key",
-                    "week",
-                    "week_start",
-                    "week_end",
-                    "winner_team_key",
-                ]
-            ]
+            # print(self.game_id, nfl_week)
 
-            # matchups["game_id"] = matchups["game_id"].astype(int)
-            # matchups["league_id"] = matchups["league_id"].astype(int)
-            # matchups["week"] = matchups["week"].astype(int)
-            # matchups["week_start"] = matchups["week_start"].astype("datetime64[D]")
-            # matchups["week_end"] = matchups["week_end"].astype("datetime64[D]")
-            # matchups["is_playoffs"] = matchups["is_playoffs"].astype(int)
-            # matchups["is_consolation"] = matchups["is_consolation"].astype(int)
-            # matchups["is_tied"] = matchups["is_tied"].astype(int)
-            # matchups["team_a_team_key"] = matchups["team_a_team_key"].astype(str)
-            matchups["team_a_points"] = (
-                matchups["team_a_points"].astype(float).round(decimals=2)
-            )
-            matchups["team_a_projected_points"] = (
-                matchups["team_a_projected_points"].astype(float).round(decimals=2)
-            )
-            # matchups["team_b_team_key"] = matchups["team_b_team_key"].astype(str)
-            matchups["team_b_points"] = (
-                matchups["team_b_points"].astype(float).round(decimals=2)
-            )
-            matchups["team_b_projected_points"] = (
-                matchups["team_b_projected_points"].astype(float).round(decimals=2)
-            )
-            # matchups["winner_team_key"] = matchups["winner_team_key"].astype(str)
-            # matchups["team_a_grade"] = matchups["team_a_grade"].astype(str)
-            # matchups["team_b_grade"] = matchups["team_b_grade"].astype(str)
-
-            query = (
-                'SELECT DISTINCT "game_id"'
-                ', "league_id"'
-                ', "week"'
-                ', "week_start"'
-                ', "week_end"'
-                ', "is_playoffs"'
-                ', "is_consolation"'
-                ', "is_tied"'
-                ', "team_a_team_key"'
-                ', "team_a_points"'
-                ', "team_a_projected_points"'
-                ', "team_b_team_key"'
-                ', "team_b_points"'
-                ', "team_b_projected_points"'
-                ', "winner_team_key"'
-                ', "team_a_grade"'
-                ', "team_b_grade"'
-                "FROM raw.weekly_matchups "
-                "WHERE game_id <> '"
-                + str(self.game_id)
-                + "' AND week <> '"
-                + str(nfl_week)
-                + "' "
-                'ORDER BY "game_id"'
-                ', "league_id"'
-                ', "week"'
-                ', "team_a_team_key"'
-            )
+            return matchups
 
-            data_upload(
-                df=matchups,
-                first_time=first_time,
-                table_name=f"weekly_matchups",
-                query=query,
-                path=PATH,
-                option_schema="raw",
+        except Exception as e:
+            self.failures.append("matchups_by_week")
+            log_print(
+                error=e,
+                module_="yahoo_query.py",
+                func="matchups_by_week",
+                game_id=self.game_id,
+                nfl_week=nfl_week,
+                first_time=first_time,
             )
+            # print(f"\n----ERROR yahoo_query.py: matchups_by_week.\n----{nfl_week}--{self.game_id}--{self.league_id}\n----{e}\n")
 
-            # print(self.game_id, nfl_week)
+    def matchups_by_weeks(self, first_time="no", weeks=None):
+        """
+        Pull the matchups of many weeks with one scoreboard request per
+        SCOREBOARD_BATCH weeks and write them in one upload
+
+        weeks = nfl weeks to pull, e.g. a whole regular season and playoffs
+        """
+        try:
+            weeks = sorted(set(int(week) for week in weeks))
+            response = []
+            for i in range(0, len(weeks), self.SCOREBOARD_BATCH):
+                batch = ",".join(map(str, weeks[i : i + self.SCOREBOARD_BATCH]))
+                if self.raw_decode:
+                    content = self._raw_scoreboard(batch)
+                    if content is not None:
+                        response.append(content)
+                    continue
+                league_key = self.yahoo_query.get_league_key()
+                matchups = self._fetch(
+                    lambda: self.yahoo_query.query(
+                        f"https://fantasysports.yahooapis.com/fantasy/v2/league/{league_key}/scoreboard;week={batch}",
+                        ["league", "scoreboard", "0", "matchups"],
+                    ),
+                    skip=("scoreboard",),
+                )
+                if matchups is not None:
+                    response.extend(
+                        matchups if isinstance(matchups, list) else [matchups]
+                    )
+            if not response:
+                return
+            resource = f"weekly_matchups/{self.game_id}/{','.join(map(str, weeks))}"
+            unchanged, digest = self._unchanged(resource, response, first_time)
+            if unchanged:
+                return
+
+            if self.raw_decode:
+                response = [self._raw_matchups(content) for content in response]
+                response = [matchups for matchups in response if matchups is not None]
+                if not response:
+                    return
+                matchups = pd.concat(response, ignore_index=True)
+            else:
+                matchups = self._matchup_frame(response)
+
+            self._upload(
+                {"weekly_matchups": matchups},
+                first_time,
+                {
+                    "game_id": self.game_id,
+                    "week": sorted(set(matchups["week"].astype(int))),
+                },
+                resource,
+                digest,
+            )
 
             return matchups
 
         except Exception as e:
+            self.failures.append("matchups_by_weeks")
             log_print(
                 error=e,
                 module_="yahoo_query.py",
-                func="matchups_by_week",
+                func="matchups_by_weeks",
                 game_id=self.game_id,
-                nfl_week=nfl_week,
+                weeks=weeks,
                 first_time=first_time,
             )
-            # print(f"\n----ERROR yahoo_query.py: matchups_by_week.\n----{nfl_week}--{self.game_id}--{self.league_id}\n----{e}\n")
 
-    def teams_and_standings(self, first_time="no"):
-        """ """
+    def _matchup_frame(self, response):
+        """
+        Format a scoreboard's matchups, one row per matchup
+
+        response = list of {"matchup": Matchup} from a scoreboard request
+        """
+        m = []
+
+        for data in response:
+            m.append(complex_json_handler(data["matchup"]))
+
+        matchups = RecordAccumulator()
+        for r in m:
+            teams = [
+                RecordAccumulator.flatten(complex_json_handler(team["team"]))
+                for team in r.pop("teams")
+            ]
+            # matchups without grades (e.g. not played yet) keep an empty grade
+            grades = {
+                grade["team_key"]: grade["grade"]
+                for grade in (
+                    complex_json_handler(g["matchup_grade"])
+                    for g in r.pop("matchup_grades", None) or []
+                )
+            }
+            matchup = RecordAccumulator.flatten(r)
+            for team, prefix in zip(teams, ["team_a_", "team_b_"]):
+                matchup.update(
+                    {
+                        prefix + "team_key": team["team_key"],
+                        prefix + "grade": grades.get(team["team_key"], ""),
+                        prefix + "points": team["team_points.total"],
+                        prefix + "projected_points": team[
+                            "team_projected_points.total"
+                        ],
+                    }
+                )
+
+            matchups.append(matchup)
+
+        return self._format_matchups(matchups.frame())
+
+    def _raw_scoreboard(self, weeks):
+        """
+        The raw JSON of a league scoreboard request
+
+        weeks = week or comma separated weeks, e.g. "1,2"
+        """
+        return self._raw(
+            "https://fantasysports.yahooapis.com/fantasy/v2/league/"
+            f"{self.yahoo_query.get_league_key()}/scoreboard;week={weeks}",
+            skip=("scoreboard",),
+        )
+
+    def _raw_matchups(self, content):
+        """
+        Matchups of a raw league scoreboard response
+        """
+        matchups = raw_decode.decode_matchups(content) if content else None
+        if not matchups:
+            return
+
+        return self._format_matchups(
+            pd.DataFrame(raw_decode.columns(matchups, self.RAW_MATCHUP_COLUMNS))
+        )
+
+    def _format_matchups(self, matchups):
+        """
+        Shared tail of both matchup decoders, one row per matchup
+        """
+        return SCHEMAS["weekly_matchups"].frame(
+            matchups, game_id=self.game_id, league_id=self.league_id
+        )
+
+    def teams_and_standings(self, first_time="no", response=None, upload=True):
+        """
+        response = yfpy Standings already pulled (e.g. by a LeagueBatch),
+        fetched from Yahoo when None
+        upload = False returns the frame without writing it
+        """
         try:
-            try:
-                response = self.yahoo_query.get_league_standings()
-            except Exception as e:
-                if "Invalid week" in str(e):
-                    return
-                elif "token_expired" in str(e):
-                    self.yahoo_query._authenticate()
-                elif "Network is unreachable" in str(e):
-                    log_print(
-                        error=e,
-                        module_="yahoo_query.py",
-                        func="team_and_standings",
-                        game_id=self.game_id,
-                        first_time=first_time,
-                        sleep="15 min before retrying",
-                        )
-                    time.sleep(900)
-                else:
-                    log_print(
-                        error=e,
-                        module_="yahoo_query.py",
-                        func="teams_and_standigns",
-                        game_id=self.game_id,
-                        first_time=first_time,
-                        sleep="1 hour before retrying",
-                    )
-                    time.sleep(3600)
-                    try:
-                        self.yahoo_query._authenticate()
-                    except Exception as e:
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="teams_and_standings",
-                            game_id=self.game_id,
-                            first_time=first_time,
-                            sleep="30 min before 2nd retry",
-                        )
-                        time.sleep(1800)
-                        self.yahoo_query._authenticate()
-                response = self.yahoo_query.get_league_standings()
+            if response is None:
+                response = self._fetch(lambda: self.yahoo_query.get_league_standings())
+            if response is None:
+                return
+            resource = f"league_teams/{self.game_id}"
+            unchanged, digest = (
+                self._unchanged(resource, response, first_time)
+                if upload
+                else (False, None)
+            )
+            if unchanged:
+                return
 
             teams = complex_json_handler(response)
-            teams_standings = pd.DataFrame()
+            teams_standings = RecordAccumulator()
             for t in teams["teams"]:
-                row = pd.json_normalize(complex_json_handler(t["team"]))
-                if "managers.manager" not in row.columns:
-                    manager = pd.json_normalize(
-                        complex_json_handler(row["managers"][0][0]["manager"])
-                    )
+                row = RecordAccumulator.flatten(complex_json_handler(t["team"]))
+                if "managers.manager" not in row:
+                    manager = complex_json_handler(row["managers"][0]["manager"])
                 else:
-                    manager = pd.json_normalize(
-                        complex_json_handler(row["managers.manager"][0])
-                    )
-                row = pd.concat([row, manager], axis=1)
-                teams_standings = pd.concat([teams_standings, row])
-            try:
-                teams_standings.drop(columns=["managers"], inplace=True)
-            except:
-                pass
-            try:
-                teams_standings.drop(columns=["managers.manager"], inplace=True)
-            except:
-                pass
-            try:
-                teams_standings.drop(columns=["image_url"], inplace=True)
-            except:
-                pass
-            try:
-                teams_standings.drop(columns=["draft_recap_url"], inplace=True)
-            except:
-                pass
-            try:
-                teams_standings.drop(columns=["league_scoring_type"], inplace=True)
-            except:
-                pass
-            try:
-                teams_standings.drop(columns=["team_points.season"], inplace=True)
-            except:
-                pass
-            try:
-                teams_standings.drop(columns=["team_points.total"], inplace=True)
-            except:
-                pass
-            teams_standings.drop(
-                columns=[
-                    "url",
-                    "team_logos.team_logo",
-                    "guid",
-                    "roster_adds.coverage_type",
-                    "team_points.coverage_type",
-                ],
-                inplace=True,
-            )
+                    manager = complex_json_handler(row["managers.manager"])
+                row.update(RecordAccumulator.flatten(manager))
+                teams_standings.append(row)
+            teams_standings = teams_standings.frame()
             teams_standings["name"] = teams_standings["name"].str.decode("utf-8")
-            if "draft_position" in teams_standings.columns:
-                teams_standings.drop(columns="draft_position", inplace=True)
-
-            if "draft_grade" not in teams_standings.columns:
-                teams_standings["draft_grade"] = "Z"
-
-            if "faab_balance" not in teams_standings.columns:
-                teams_standings["faab_balance"] = 0
-
             teams_standings["game_id"] = self.game_id
             teams_standings["league_id"] = self.league_id
-            teams_standings["clinched_playoffs"].fillna(0, inplace=True)
 
             with open(TEAMS_FILE, "r") as file:
                 c_teams = yaml.load(file, Loader=yaml.SafeLoader)
 
-            corrected_teams = pd.DataFrame()
-
-            for team in c_teams["name"]:
-                team = pd.DataFrame(team)
-                corrected_teams = pd.concat([corrected_teams, team])
+            corrected_teams = pd.concat([pd.DataFrame(team) for team in c_teams["name"]])
 
             correct_teams = pd.melt(
                 corrected_teams, var_name="nickname", value_name="name"
@@ -1196,101 +1211,24 @@ class league_season_data(object):
                 teams_standings["nickname"],
             )
 
-            teams_standings = teams_standings[
-                teams_standings.columns.drop(
-                    list(teams_standings.filter(regex="_drop"))
-                )
-            ]
-
             teams_standings.dropna(
                 subset=["game_id", "league_id", "manager_id", "team_key"], inplace=True
             )
-
-            teams_standings = teams_standings[
-                [
-                    "game_id",
-                    "league_id",
-                    "team_id",
-                    "team_key",
-                    "manager_id",
-                    "clinched_playoffs",
-                    "draft_grade",
-                    "faab_balance",
-                    "name",
-                    "nickname",
-                    "number_of_moves",
-                    "number_of_trades",
-                    "team_standings.playoff_seed",
-                    "team_standings.rank",
-                    "team_standings.outcome_totals.wins",
-                    "team_standings.outcome_totals.losses",
-                    "team_standings.outcome_totals.ties",
-                    "team_standings.outcome_totals.percentage",
-                    "team_standings.points_for",
-                    "team_standings.points_against",
-                ]
-            ]
-
-            # teams_standings["game_id"] = teams_standings["game_id"].astype(int)
-            # teams_standings["league_id"] = teams_standings["league_id"].astype(int)
-            # teams_standings["team_id"] = teams_standings["team_id"].astype(int)
-            # teams_standings["team_key"] = teams_standings["team_key"].astype(str)
-            # teams_standings["manager_id"] = teams_standings["manager_id"].astype(int)
-            # teams_standings["clinched_playoffs"] = teams_standings["clinched_playoffs"].astype(str)
-            # teams_standings["draft_grade"] = teams_standings["draft_grade"].astype(str)
-            # teams_standings["faab_balance"] = teams_standings["faab_balance"].astype(int)
-            # teams_standings["name"] = teams_standings["name"].astype(str)
-            # teams_standings["number_of_moves"] = teams_standings["number_of_moves"].astype(int)
-            # teams_standings["number_of_trades"] = teams_standings["number_of_trades"].astype(int)
-            # teams_standings["team_standings.playoff_seed"] = teams_standings["team_standings.playoff_seed"].astype(int)
-            # teams_standings["team_standings.rank"] = teams_standings["team_standings.rank"].astype(int)
-            # teams_standings["team_standings.outcome_totals.wins"] = teams_standings["team_standings.outcome_totals.wins"].astype(int)
-            # teams_standings["team_standings.outcome_totals.losses"] = teams_standings["team_standings.outcome_totals.losses"].astype(int)
-            # teams_standings["team_standings.outcome_totals.ties"] = teams_standings["team_standings.outcome_totals.ties"].astype(int)
-            teams_standings["team_standings.outcome_totals.percentage"] = (teams_standings["team_standings.outcome_totals.percentage"].astype(float).round(decimals=4))
-            teams_standings["team_standings.points_for"] = (teams_standings["team_standings.points_for"].astype(float).round(decimals=2))
-            teams_standings["team_standings.points_against"] = (teams_standings["team_standings.points_against"].astype(float).round(decimals=2))
-
-            query = (
-                'SELECT DISTINCT "game_id"'
-                ',"league_id"'
-                ',"team_id"'
-                ',"team_key"'
-                ',"manager_id"'
-                ',"clinched_playoffs"'
-                ',"draft_grade"'
-                ',"faab_balance"'
-                ',"name"'
-                ',"nickname"'
-                ',"number_of_moves"'
-                ',"number_of_trades"'
-                ',"team_standings.playoff_seed"'
-                ',"team_standings.rank"'
-                ',"team_standings.outcome_totals.wins"'
-                ',"team_standings.outcome_totals.losses"'
-                ',"team_standings.outcome_totals.ties"'
-                ',"team_standings.outcome_totals.percentage"'
-                ',"team_standings.points_for"'
-                ',"team_standings.points_against" '
-                "FROM raw.league_teams "
-                "WHERE game_id <> '" +self.game_id+ "' "
-                'ORDER BY "game_id"'
-                ', "league_id"'
-                ', "team_id"'
-            )
-
-            data_upload(
-                df=teams_standings,
-                first_time=first_time,
-                table_name="league_teams",
-                query=query,
-                path=PATH,
-                option_schema="raw",
-            )
+            teams_standings = SCHEMAS["league_teams"].frame(teams_standings)
+
+            if upload:
+                self._upload(
+                    {"league_teams": teams_standings},
+                    first_time,
+                    {"game_id": self.game_id},
+                    resource,
+                    digest,
+                )
 
             return teams_standings
 
         except Exception as e:
+            self.failures.append("teams_and_standings")
             log_print(
                 error=e,
                 module_="yahoo_query.py",
@@ -1300,152 +1238,71 @@ class league_season_data(object):
             )
             # print(f"\n----ERROR yahoo_query.py: teams_and_standings\n----{self.game_id}--{self.league_id}\n----{e}\n")
 
-    def team_roster_by_week(self, first_time="no", nfl_week=None):
-        """ """
+    def team_roster_by_week(
+        self, first_time="no", nfl_week=None, teams=None, collection=True
+    ):
+        """
+        teams = list of team_ids to pull, every team in the league when None
+        collection = pull every roster in one league teams request,
+        False makes one request per team
+        """
         try:
-            sql_query = f"SELECT max_teams FROM raw.league_settings WHERE game_id = '{self.game_id}'"
-            teams = DatabaseCursor(PATH, option_schema="raw").copy_data_from_postgres(
-                sql_query
-            )
-            teams = teams["max_teams"].values[0]
-
-            team_week_rosters = pd.DataFrame()
-
-            for team in range(1, teams + 1):
-                try:
-                    response = complex_json_handler(
-                        self.yahoo_query.get_team_roster_by_week(str(team), nfl_week)
-                    )
-
-                except Exception as e:
-                    if "Invalid week" in str(e):
-                        return
-                    elif "token_expired" in str(e):
-                        self.yahoo_query._authenticate()
-                    elif "Network is unreachable" in str(e):
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="team_roster_by_week",
-                            game_id=self.game_id,
-                            nfl_week=nfl_week,
-                            first_time=first_time,
-                            sleep="15 min before retrying",
-                        )
-                        time.sleep(900)
-                    else:
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="team_roster_by_week",
-                            game_id=self.game_id,
-                            nfl_week=nfl_week,
-                            first_time=first_time,
-                            sleep="1 hour before retrying",
-                        )
-                        time.sleep(3600)
-                        try:
-                            self.yahoo_query._authenticate()
-                        except Exception as e:
-                            log_print(
-                                error=e,
-                                module_="yahoo_query.py",
-                                func="team_roster_by_week",
-                                game_id=self.game_id,
-                                nfl_week=nfl_week,
-                                first_time=first_time,
-                                sleep="30 min before 2nd retry",
-                            )
-                            time.sleep(1800)
-                            self.yahoo_query._authenticate()
-
-                    response = complex_json_handler(
-                        self.yahoo_query.get_team_roster_by_week(str(team), nfl_week)
-                    )
-                team_roster = pd.DataFrame()
-                time.sleep(2)
-
-                for r in response["players"]:
-                    row = pd.json_normalize(complex_json_handler(r["player"]))
-                    team_roster = pd.concat([team_roster, row])
-                    team_roster["team_id"] = team
-                    team_roster["week"] = nfl_week
-
-                team_week_rosters = pd.concat([team_week_rosters, team_roster])
+            partition = {"game_id": self.game_id, "week": nfl_week}
+            resource = f"weekly_team_roster/{self.game_id}/{nfl_week}"
+            if teams is not None:
+                partition["team_id"] = list(teams)
+                resource += f"/{','.join(map(str, teams))}"
+
+            raw = collection and self.raw_decode
+            if raw:
+                response = self._raw_teams(f"roster;week={nfl_week}")
+            elif collection:
+                response = self._league_teams(f"roster;week={nfl_week}", teams)
+            else:
+                response = self._fetch_teams(
+                    lambda team: self._team_roster(team, nfl_week, first_time),
+                    teams if teams is not None else self._all_teams(),
+                )
+            if not response:
+                return
+            unchanged, digest = self._unchanged(resource, response, first_time)
+            if unchanged:
+                return
+
+            if raw:
+                team_week_rosters = self._raw_league_teams(
+                    response,
+                    lambda content: raw_decode.decode_rosters(content, nfl_week, teams),
+                    self.RAW_ROSTER_COLUMNS,
+                )
+                if team_week_rosters is None:
+                    return
 
-            team_week_rosters["game_id"] = self.game_id
-            team_week_rosters["league_id"] = self.league_id
-            team_week_rosters["eligible_positions"] = [
-                ", ".join(map(str, l)) for l in team_week_rosters["eligible_positions"]
-            ]
+            else:
+                team_rosters = (
+                    [
+                        self._roster_records(team.roster, int(team.team_id), nfl_week)
+                        for team in response
+                    ]
+                    if collection
+                    else response
+                )
 
-            team_week_rosters = team_week_rosters[
-                [
-                    "game_id",
-                    "league_id",
-                    "week",
-                    "team_id",
-                    "selected_position.position",
-                    "player_id",
-                    "player_key",
-                    "display_position",
-                    "eligible_positions",
-                    "position_type",
-                ]
-            ]
+                team_week_rosters = RecordAccumulator()
+                for team_roster in team_rosters:
+                    team_week_rosters.extend(team_roster)
+                team_week_rosters = team_week_rosters.frame()
 
-            # team_week_rosters["game_id"] = team_week_rosters["game_id"].astype(int)
-            # team_week_rosters["league_id"] = team_week_rosters["league_id"].astype(int)
-            # team_week_rosters["week"] = team_week_rosters["week"].astype(int)
-            # team_week_rosters["team_id"] = team_week_rosters["team_id"].astype(int)
-            # team_week_rosters["selected_position.position"] = team_week_rosters[
-            #     "selected_position.position"
-            # ].astype(str)
-            # team_week_rosters["player_id"] = team_week_rosters["player_id"].astype(int)
-            # team_week_rosters["player_key"] = team_week_rosters["player_key"].astype(
-            #     str
-            # )
-            # team_week_rosters["display_position"] = team_week_rosters[
-            #     "display_position"
-            # ].astype(str)
-            # team_week_rosters["eligible_positions"] = team_week_rosters[
-            #     "eligible_positions"
-            # ].astype(str)
-            # team_week_rosters["position_type"] = team_week_rosters[
-            #     "position_type"
-            # ].astype(str)
-
-            query = (
-                'SELECT DISTINCT "game_id"'
-                ',"league_id"'
-                ',"week"'
-                ',"team_id"'
-                ',"selected_position.position"'
-                ',"player_id"'
-                ',"player_key"'
-                ',"display_position"'
-                ',"eligible_positions"'
-                ',"position_type" '
-                "FROM raw.weekly_team_roster "
-                "WHERE game_id <> '"
-                + str(self.game_id)
-                + "' AND week <> '"
-                + str(nfl_week)
-                + "' "
-                'ORDER BY "game_id"'
-                ', "league_id"'
-                ', "week"'
-                ', "team_id"'
-                ', "selected_position.position"'
+            team_week_rosters = SCHEMAS["weekly_team_roster"].frame(
+                team_week_rosters, game_id=self.game_id, league_id=self.league_id
             )
 
-            data_upload(
-                df=team_week_rosters,
-                first_time=first_time,
-                table_name="weekly_team_roster",
-                query=query,
-                path=PATH,
-                option_schema="raw",
+            self._upload(
+                {"weekly_team_roster": team_week_rosters},
+                first_time,
+                partition,
+                resource,
+                digest,
             )
 
             # print(self.game_id, nfl_week)
@@ -1453,6 +1310,7 @@ class league_season_data(object):
             return team_week_rosters
 
         except Exception as e:
+            self.failures.append("team_roster_by_week")
             log_print(
                 error=e,
                 module_="yahoo_query.py",
@@ -1463,97 +1321,64 @@ class league_season_data(object):
             )
             # print(f"\n----ERROR yahoo_query.py: team_roster_by_week\n----{nfl_week}--{self.game_id}--{self.league_id}\n----{e}\n")
 
-    def team_points_by_week(self, first_time="no", nfl_week=None):
-        """ """
+    def team_points_by_week(
+        self, first_time="no", nfl_week=None, teams=None, collection=True
+    ):
+        """
+        teams = list of team_ids to pull, every team in the league when None
+        collection = pull every team's points in one league teams request,
+        False makes one request per team
+        """
         try:
-            sql_query = f"SELECT max_teams FROM raw.league_settings WHERE game_id = '{self.game_id}'"
-            teams = DatabaseCursor(PATH, option_schema="raw").copy_data_from_postgres(
-                sql_query
-            )
-            teams = teams["max_teams"].values[0]
-
-            team_points_weekly = pd.DataFrame()
-            for team in range(1, teams + 1):
-                try:
-                    response = self.yahoo_query.get_team_stats_by_week(
-                        str(team), nfl_week
-                    )
+            partition = {"game_id": self.game_id, "week": nfl_week}
+            resource = f"weekly_team_pts/{self.game_id}/{nfl_week}"
+            if teams is not None:
+                partition["team_id"] = list(teams)
+                resource += f"/{','.join(map(str, teams))}"
+
+            raw = collection and self.raw_decode
+            if raw:
+                response = self._raw_teams(f"stats;type=week;week={nfl_week}")
+            elif collection:
+                response = self._league_teams(
+                    f"stats;type=week;week={nfl_week}", teams
+                )
+            else:
+                response = self._fetch_teams(
+                    lambda team: self._team_points(team, nfl_week, first_time),
+                    teams if teams is not None else self._all_teams(),
+                )
+            if not response:
+                return
+            unchanged, digest = self._unchanged(resource, response, first_time)
+            if unchanged:
+                return
+
+            if raw:
+                team_points_weekly = self._raw_league_teams(
+                    response,
+                    lambda content: raw_decode.decode_team_points(content, teams),
+                )
+                if team_points_weekly is None:
+                    return
 
-                except Exception as e:
-                    if "Invalid week" in str(e):
-                        return
-                    elif "token_expired" in str(e):
-                        self.yahoo_query._authenticate()
-                    elif "Network is unreachable" in str(e):
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="team_points_by_week",
-                            game_id=self.game_id,
-                            nfl_week=nfl_week,
-                            first_time=first_time,
-                            sleep="15 min before retrying",
-                        )
-                        time.sleep(900)
-                    else:
-                        log_print(
-                            error=e,
-                            module_="yahoo_query.py",
-                            func="team_points_by_week",
-                            game_id=self.game_id,
-                            nfl_week=nfl_week,
-                            first_time=first_time,
-                            sleep="1 hour before retrying",
-                        )
-                        time.sleep(3600)
-                        try:
-                            self.yahoo_query._authenticate()
-                        except Exception as e:
-                            log_print(
-                                error=e,
-                                module_="yahoo_query.py",
-                                func="team_points_by_week",
-                                game_id=self.game_id,
-                                nfl_week=nfl_week,
-                                first_time=first_time,
-                                sleep="30 min before 2nd retry",
-                            )
-                            time.sleep(1800)
-                            self.yahoo_query._authenticate()
-                    try:
-                        response = complex_json_handler(
-                            self.yahoo_query.get_team_stats_by_week(str(team), nfl_week)
-                        )
-                    except:
-                        response = self.yahoo_query.get_team_stats_by_week(
-                            str(team), nfl_week
+            else:
+                team_points = (
+                    [
+                        self._points_record(
+                            {
+                                "team_points": team.team_points,
+                                "team_projected_points": team.team_projected_points,
+                            },
+                            int(team.team_id),
                         )
+                        for team in response
+                    ]
+                    if collection
+                    else response
+                )
 
-                time.sleep(1)
-
-                team_pts = pd.DataFrame()
-                try:
-                    ttl_pts = pd.json_normalize(
-                        complex_json_handler(response["team_points"])
-                    )
-                except:
-                    ttl_pts = pd.json_normalize(response["team_points"])
-                ttl_pts = ttl_pts[["total", "week"]]
-                ttl_pts.rename(columns={"total": "final_points"}, inplace=True)
-
-                try:
-                    pro_pts = pd.json_normalize(
-                        complex_json_handler(response["team_projected_points"])
-                    )
-                except:
-                    pro_pts = pd.json_normalize(response["team_projected_points"])
-
-                pro_pts = pro_pts[["total"]]
-                pro_pts.rename(columns={"total": "projected_points"}, inplace=True)
-                team_pts = pd.concat([ttl_pts, pro_pts], axis=1)
-                team_pts["team_id"] = team
-
-                team_points_weekly = pd.concat([team_points_weekly, team_pts])
+                team_points_weekly = RecordAccumulator(team_points).frame()
 
             team_points_weekly["game_id"] = self.game_id
             team_points_weekly["league_id"] = self.league_id
@@ -1565,59 +1390,14 @@ class league_season_data(object):
                 + team_points_weekly["team_id"].astype(str)
             )
 
-            team_points_weekly = team_points_weekly[
-                [
-                    "game_id",
-                    "league_id",
-                    "team_id",
-                    "team_key",
-                    "week",
-                    "final_points",
-                    "projected_points",
-                ]
-            ]
-
-            # team_points_weekly["game_id"] = team_points_weekly["game_id"].astype(int)
-            # team_points_weekly["league_id"] = team_points_weekly["league_id"].astype(
-            #     int
-            # )
-            # team_points_weekly["team_id"] = team_points_weekly["team_id"].astype(int)
-            # team_points_weekly["team_key"] = team_points_weekly["team_key"].astype(str)
-            # team_points_weekly["week"] = team_points_weekly["week"].astype(int)
-            team_points_weekly["final_points"] = (
-                team_points_weekly["final_points"].astype(float).round(decimals=2)
-            )
-            team_points_weekly["projected_points"] = (
-                team_points_weekly["projected_points"].astype(float).round(decimals=2)
-            )
-
-            query = (
-                'SELECT DISTINCT "game_id"'
-                ',"league_id"'
-                ',"team_id"'
-                ',"team_key"'
-                ',"week"'
-                ',"final_points"'
-                ',"projected_points" '
-                "FROM raw.weekly_team_pts "
-                "WHERE game_id <> '"
-                + str(self.game_id)
-                + "' AND week <> '"
-                + str(nfl_week)
-                + "' "
-                'ORDER BY "game_id"'
-                ', "league_id"'
-                ', "week"'
-                ', "team_id"'
-            )
+            team_points_weekly = SCHEMAS["weekly_team_pts"].frame(team_points_weekly)
 
-            data_upload(
-                df=team_points_weekly,
-                first_time=first_time,
-                table_name="weekly_team_pts",
-                query=query,
-                path=PATH,
-                option_schema="raw",
+            self._upload(
+                {"weekly_team_pts": team_points_weekly},
+                first_time,
+                partition,
+                resource,
+                digest,
             )
 
             # print(self.game_id, nfl_week)
@@ -1625,6 +1405,7 @@ class league_season_data(object):
             return team_points_weekly
 
         except Exception as e:
+            self.failures.append("team_points_by_week")
             log_print(
                 error=e,
                 module_="yahoo_query.py",
@@ -1635,6 +1416,286 @@ class league_season_data(object):
             )
             # print(f"\n----ERROR yahoo_query.py: team_points_by_week\n----{nfl_week}--{self.game_id}--{self.league_id}\n----{e}\n")
 
+    def _all_teams(self):
+        """
+        team_ids of every team in the league, from raw.league_settings
+        """
+        sql_query = f"SELECT max_teams FROM raw.league_settings WHERE game_id = '{self.game_id}'"
+        max_teams = DatabaseCursor(
+            PATH, option_schema="raw"
+        ).copy_data_from_postgres(sql_query)
+        return range(1, int(max_teams["max_teams"].values[0]) + 1)
+
+    def _league_teams(self, resource, teams=None):
+        """
+        Pull a team resource for the whole league in one request
+
+        resource = team sub-resource and its options, e.g. "roster;week=1"
+        teams = team_ids to keep, every team when None
+        Returns yfpy Team objects in team order, None if the week has no data
+        """
+        league_key = self.yahoo_query.get_league_key()
+        response = self._fetch(
+            lambda: self.yahoo_query.query(
+                f"https://fantasysports.yahooapis.com/fantasy/v2/league/{league_key}/teams/{resource}",
+                ["league", "teams"],
+            )
+        )
+        if response is None:
+            return
+        if isinstance(response, dict):
+            response = [response]
+
+        league_teams = sorted(
+            (r["team"] for r in response), key=lambda team: int(team.team_id)
+        )
+        if teams is not None:
+            keep = set(map(int, teams))
+            league_teams = [team for team in league_teams if int(team.team_id) in keep]
+
+        return league_teams
+
+    def _raw_teams(self, resource):
+        """
+        The raw JSON of a team resource for the whole league in one request
+
+        resource = team sub-resource and its options, e.g. "roster;week=1"
+        """
+        return self._raw(
+            "https://fantasysports.yahooapis.com/fantasy/v2/league/"
+            f"{self.yahoo_query.get_league_key()}/teams/{resource}"
+        )
+
+    def _raw_league_teams(self, content, decode, names=None):
+        """
+        Decode a raw league teams response into a frame
+
+        decode = raw_decode function turning the response into structs
+        names = {column: struct field}, every field under its own name when None
+        Returns None if the week has no data
+        """
+        structs = decode(content) if content else None
+        if not structs:
+            return
+
+        return pd.DataFrame(raw_decode.columns(structs, names))
+
+    def _fetch_teams(self, fetch_team, teams):
+        """
+        Fetch every team in the league through a thread pool,
+        with at most max_workers requests in flight at once
+
+        fetch_team = function taking a team_id, returns None if the week has no data
+        teams = team_ids to fetch
+        Results are returned in team order, or None if any team returned None
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(fetch_team, teams))
+
+        if any(result is None for result in results):
+            return None
+
+        return results
+
+    def _team_roster(self, team, nfl_week, first_time="no"):
+        """
+        Pull one team's roster for the week
+        """
+        response = self._fetch(
+            lambda: self.yahoo_query.get_team_roster_by_week(str(team), nfl_week)
+        )
+        if response is None:
+            return
+        return self._roster_records(response, team, nfl_week)
+
+    @staticmethod
+    def _roster_records(roster, team, nfl_week):
+        """
+        One record per player on a team's weekly roster
+        """
+        roster = complex_json_handler(roster)
+        return [
+            dict(
+                RecordAccumulator.flatten(complex_json_handler(r["player"])),
+                team_id=team,
+                week=nfl_week,
+            )
+            for r in roster["players"]
+        ]
+
+    def _team_points(self, team, nfl_week, first_time="no"):
+        """
+        Pull one team's final and projected points for the week
+        """
+        response = self._fetch(
+            lambda: self.yahoo_query.get_team_stats_by_week(str(team), nfl_week)
+        )
+        if response is None:
+            return
+        return self._points_record(response, team)
+
+    @staticmethod
+    def _points_record(response, team):
+        """
+        A team's final and projected points from its weekly stats
+        """
+        # yfpy models from a team's stats, plain dicts from a league teams request
+        ttl_pts, pro_pts = (
+            points if isinstance(points, dict) else complex_json_handler(points)
+            for points in (
+                response["team_points"],
+                response["team_projected_points"],
+            )
+        )
+
+        return {
+            "final_points": ttl_pts["total"],
+            "week": ttl_pts["week"],
+            "projected_points": pro_pts["total"],
+            "team_id": team,
+        }
+
+    def player_stats_by_weeks(self, first_time="no", weeks=None):
+        """
+        Pull the weekly stats of every player on raw.weekly_team_roster,
+        PLAYER_BATCH players per request, into raw.weekly_player_stats
+
+        weeks = nfl weeks to pull, the roster weeks missing from
+        raw.weekly_player_stats when None
+        Returns {week: number of players written}
+        """
+        try:
+            # no rosters yet, no players to pull
+            if not self._table_exists("weekly_team_roster"):
+                return
+            rosters = self._read(
+                'SELECT DISTINCT "week", "player_key" '
+                "FROM raw.weekly_team_roster "
+                "WHERE game_id = '" + self.game_id + "'"
+            )
+            if rosters.empty:
+                return
+            rosters["week"] = rosters["week"].astype(int)
+
+            held = set()
+            if str(first_time).upper() != "YES":
+                # no table yet, the first week creates it
+                if not self._table_exists("weekly_player_stats"):
+                    first_time = "yes"
+                else:
+                    stored = self._read(
+                        'SELECT DISTINCT "week" FROM raw.weekly_player_stats '
+                        "WHERE game_id = '" + self.game_id + "'"
+                    )
+                    held = set(stored["week"].astype(int))
+            if weeks is None:
+                weeks = set(rosters["week"]) - held
+
+            written = {}
+            for week in sorted(set(int(week) for week in weeks)):
+                player_keys = sorted(rosters.loc[rosters["week"] == week, "player_key"])
+                if not player_keys:
+                    continue
+
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    batches = list(
+                        executor.map(
+                            lambda keys: self._player_stats(keys, week),
+                            [
+                                player_keys[i : i + self.PLAYER_BATCH]
+                                for i in range(
+                                    0, len(player_keys), self.PLAYER_BATCH
+                                )
+                            ],
+                        )
+                    )
+                resource = f"weekly_player_stats/{self.game_id}/{week}"
+                unchanged, digest = self._unchanged(resource, batches, first_time)
+                if unchanged:
+                    continue
+
+                player_stats = RecordAccumulator()
+                for batch in batches:
+                    player_stats.extend(batch or [])
+                if not len(player_stats):
+                    continue
+                # stat columns follow the league's stat categories
+                player_stats = SCHEMAS["weekly_player_stats"].frame(
+                    player_stats.frame(),
+                    game_id=self.game_id,
+                    league_id=self.league_id,
+                    week=week,
+                )
+
+                self._upload(
+                    {"weekly_player_stats": player_stats},
+                    first_time,
+                    {"game_id": self.game_id, "week": week},
+                    resource,
+                    digest,
+                )
+                first_time = "no"
+                written[week] = len(player_stats)
+
+            log_print(
+                success="Pulled weekly player stats",
+                module_="yahoo_query.py",
+                func="player_stats_by_weeks",
+                game_id=self.game_id,
+                weeks=sorted(written),
+                players=sum(written.values()),
+            )
+
+            return written
+
+        except Exception as e:
+            self.failures.append("player_stats_by_weeks")
+            log_print(
+                error=e,
+                module_="yahoo_query.py",
+                func="player_stats_by_weeks",
+                game_id=self.game_id,
+                weeks=weeks,
+                first_time=first_time,
+            )
+
+    def _player_stats(self, player_keys, nfl_week):
+        """
+        One record per player with the week's points and stats,
+        for up to PLAYER_BATCH players in one request
+        """
+        url = (
+            "https://fantasysports.yahooapis.com/fantasy/v2/league/"
+            f"{self.yahoo_query.get_league_key()}/players;"
+            f"player_keys={','.join(player_keys)}/stats;type=week;week={nfl_week}"
+        )
+        response = self._fetch(
+            lambda: self.yahoo_query.query(url, ["league", "players"])
+        )
+        if response is None:
+            return
+
+        # a single player comes back as a dict instead of a list
+        if not isinstance(response, list):
+            response = [response]
+
+        sources = SCHEMAS["weekly_player_stats"].sources
+        records = []
+        for r in response:
+            player = complex_json_handler(r["player"])
+            stats = player.pop("player_stats", None) or {}
+            record = {
+                column: value
+                for column, value in RecordAccumulator.flatten(player).items()
+                if column in sources
+            }
+            for stat in stats.get("stats", []):
+                stat = stat["stat"]
+                record[f"stat.{stat.stat_id}"] = stat.value
+            records.append(record)
+
+        return records
+
     def all_game_keys(self):
         """ """
         try:
@@ -1644,12 +1705,9 @@ class league_season_data(object):
             except:
                 league_keys = pd.DataFrame({"game_id": np.nan, "season": np.nan})
 
-            game_keys = pd.DataFrame()
-            for r in response:
-                row = pd.DataFrame(complex_json_handler(r["game"]), index=[0])
-                game_keys = pd.concat([game_keys, row])
-
-            game_keys.reset_index(drop=True, inplace=True)
+            game_keys = RecordAccumulator(
+                complex_json_handler(r["game"]) for r in response
+            ).frame()
             game_keys = game_keys[game_keys["season"] >= 2012]
             game_keys = game_keys.merge(
                 league_keys,
@@ -1657,10 +1715,7 @@ class league_season_data(object):
                 left_on=["game_id", "season"],
                 right_on=["game_id", "season"],
             )
-            game_keys = game_keys[
-                ["game_id", "league_id", "season", "is_game_over", "is_offseason"]
-            ]
-            game_keys.drop_duplicates(ignore_index=True, inplace=True)
+            game_keys = SCHEMAS["game_keys"].frame(game_keys)
 
             data_upload(
                 df=game_keys,
@@ -1668,12 +1723,12 @@ class league_season_data(object):
                 table_name="game_keys",
                 path=PATH,
                 option_schema="dev",
-                query=None,
             )
 
             return game_keys
 
         except Exception as e:
+            self.failures.append("all_game_keys")
             log_print(
                 error=e,
                 module_="yahoo_query.py",
@@ -1683,28 +1738,42 @@ class league_season_data(object):
             # print(f"\n----ERROR yahoo_query.py: all_game_keys\n----{self.game_id}--{self.league_id}\n----{e}")
 
     def all_nfl_weeks(self):
-        """ 
-        
+        """
+        Pull the weeks of every game in dev.game_keys, with one games
+        request per GAME_BATCH games
         """
         try:
             game_keys = DatabaseCursor(
                 PATH, option_schema="dev"
             ).copy_data_from_postgres("SELECT game_id FROM dev.game_keys")
             game_id = list(game_keys["game_id"])
-            weeks = pd.DataFrame()
+
+            game_weeks = {}
+            for i in range(0, len(game_id), self.GAME_BATCH):
+                game_weeks.update(
+                    self._game_weeks(list(map(str, game_id[i : i + self.GAME_BATCH])))
+                )
+
+            # games left out of a batch response are pulled one by one
+            missing = [str(g) for g in game_id if str(g) not in game_weeks]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                game_weeks.update(
+                    zip(
+                        missing,
+                        executor.map(
+                            self.yahoo_query.get_game_weeks_by_game_id, missing
+                        ),
+                    )
+                )
+
+            weeks = RecordAccumulator()
             for g in game_id:
-                response = self.yahoo_query.get_game_weeks_by_game_id(str(g))
-                for r in response:
-                    row = pd.json_normalize(complex_json_handler(r["game_week"]))
-                    row["game_id"] = g
-                    weeks = pd.concat([weeks, row])
+                weeks.extend(
+                    (complex_json_handler(r["game_week"]) for r in game_weeks[str(g)]),
+                    game_id=g,
+                )
 
-            weeks.rename(columns={"display_name": "week"}, inplace=True)
-            weeks = weeks[["week", "start", "end", "game_id"]]
-            weeks = weeks.iloc[:, 1:]
-            weeks["start"] = weeks["start"].astype("datetime64[D]")
-            weeks["end"] = weeks["end"].astype("datetime64[D]")
-            weeks.drop_duplicates(ignore_index=True, inplace=True)
+            weeks = SCHEMAS["nfl_weeks"].frame(weeks.frame())
 
             data_upload(
                 df=weeks,
@@ -1712,12 +1781,12 @@ class league_season_data(object):
                 table_name="nfl_weeks",
                 path=PATH,
                 option_schema="dev",
-                query=None,
             )
 
             return weeks
 
         except Exception as e:
+            self.failures.append("all_nfl_weeks")
             log_print(
                 error=e,
                 module_="yahoo_query.py",
@@ -1725,3 +1794,35 @@ class league_season_data(object):
                 game_id=self.game_id,
             )
             # print(f"\n----ERROR yahoo_query.py: all_nfl_weeks\n----{self.game_id}--{self.league_id}\n----{e}")
+
+    def _game_weeks(self, game_ids):
+        """
+        Pull the weeks of many games in one games;game_keys=... request
+
+        Returns {game_id: list of {"game_week": GameWeek}},
+        empty if the request failed
+        """
+        url = (
+            "https://fantasysports.yahooapis.com/fantasy/v2/"
+            f"games;game_keys={','.join(game_ids)}/game_weeks"
+        )
+        try:
+            response = self._fetch(lambda: self.yahoo_query.query(url, ["games"]))
+        except Exception as e:
+            log_print(
+                error=e,
+                module_="yahoo_query.py",
+                func="_game_weeks",
+                url=url,
+            )
+            return {}
+        if response is None:
+            return {}
+        if isinstance(response, dict):
+            response = [response]
+
+        return {
+            str(r["game"].game_id): r["game"].game_weeks
+            for r in response
+            if r["game"].game_weeks
+        }
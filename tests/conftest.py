@@ -0,0 +1,103 @@
+import os
+import shutil
+import sys
+import tempfile
+import pandas as pd
+import pytest
+from pathlib import Path
+
+# scripts/ finds private.yaml, teams.yaml and the logs under the parent of the cwd
+ROOT = Path(tempfile.mkdtemp())
+for name in ("private.yaml", "logg.txt", "tournament_results.txt"):
+    (ROOT / name).write_text("{}\n" if name.endswith(".yaml") else "")
+shutil.copy(Path(__file__).resolve().parent.parent / "teams.yaml", ROOT)
+(ROOT / "run").mkdir()
+os.chdir(ROOT / "run")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+# imported once scripts/ is on the path and its files can be found
+import yahoo_query
+from yahoo_query import league_season_data
+
+
+@pytest.fixture
+def make_league():
+    """
+    league_season_data that makes no requests, kwargs override its arguments
+    """
+
+    def make(**kwargs):
+        league = league_season_data(
+            **dict(
+                auth_dir=".",
+                league_id="1",
+                game_id="406",
+                offline=True,
+                consumer_key="k",
+                consumer_secret="s",
+                **kwargs,
+            )
+        )
+        league.yahoo_query.get_league_key = lambda: "406.l.1"
+        return league
+
+    return make
+
+
+@pytest.fixture
+def league(make_league):
+    return make_league()
+
+
+class Uploads(list):
+    """
+    data_upload calls, each returning written, and data_swap calls in swaps
+    """
+
+    written = True
+
+    def __init__(self):
+        super().__init__()
+        self.swaps = []
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    uploads = Uploads()
+    monkeypatch.setattr(
+        yahoo_query,
+        "data_upload",
+        lambda **kwargs: uploads.append(kwargs) or uploads.written,
+    )
+    monkeypatch.setattr(
+        yahoo_query,
+        "data_swap",
+        lambda table_name, **kwargs: uploads.swaps.append(
+            dict(kwargs, table_name=table_name)
+        )
+        or uploads.written,
+    )
+    return uploads
+
+
+@pytest.fixture
+def tables(monkeypatch):
+    """
+    Answer yahoo_query's postgres reads from {query substring: frame},
+    any other read fails the way copy_data_from_postgres does, with None
+    """
+    held = {}
+
+    class Cursor(object):
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def copy_data_from_postgres(self, query):
+            for part, frame in held.items():
+                if part in query:
+                    return pd.DataFrame(frame)
+            return None
+
+    monkeypatch.setattr(yahoo_query, "DatabaseCursor", Cursor)
+    return held
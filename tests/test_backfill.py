@@ -0,0 +1,15 @@
+import pandas as pd
+
+import backfill
+
+
+def test_failed_steps_are_returned(monkeypatch):
+    monkeypatch.setattr(
+        backfill, "execute_plan", lambda plan, **kwargs: ["406/team_roster_by_week"]
+    )
+    plan = pd.DataFrame({"method": ["team_roster_by_week"], "calls": [1]})
+
+    assert backfill.backfill_season(2021, plan) == (
+        2021,
+        ["406/team_roster_by_week"],
+    )
@@ -0,0 +1,59 @@
+import pandas as pd
+
+import game_day_scheduler
+from game_day_scheduler import GameDayScheduler
+
+
+class League(object):
+    """
+    league_season_data whose standings pull logs an error
+    """
+
+    def __init__(self, **kwargs):
+        self.failures = []
+
+    def teams_and_standings(self, first_time="no"):
+        self.failures.append("teams_and_standings")
+
+
+def scheduler(monkeypatch, recorded):
+    weeks = pd.DataFrame(
+        {
+            "game_id": "406",
+            "week": range(1, 19),
+            "start": pd.date_range("2021-09-09", periods=18, freq="7D"),
+        }
+    )
+    weeks["end"] = weeks["start"] + pd.Timedelta(days=4)
+    game_keys = pd.DataFrame({"season": [2021], "game_id": ["406"], "league_id": ["1"]})
+
+    monkeypatch.setattr(game_day_scheduler, "nfl_weeks_pull", lambda: weeks.copy())
+    monkeypatch.setattr(
+        game_day_scheduler, "game_keys_pull", lambda first="no": game_keys.copy()
+    )
+    monkeypatch.setattr(game_day_scheduler, "league_season_data", League)
+    monkeypatch.setattr(
+        game_day_scheduler,
+        "data_upload",
+        lambda df, **kwargs: recorded.extend(df["job"]) or True,
+    )
+    return GameDayScheduler()
+
+
+def test_last_week_is_pulled_again_once_final(monkeypatch):
+    jobs = scheduler(monkeypatch, []).jobs(pd.Timestamp("2022-01-01"))
+
+    settle = jobs[jobs["kind"] == "week_settle"].iloc[0]
+    assert settle["week"] == 18
+    # week 18 ends Jan 10, final recheck_days later
+    assert settle["due"] == pd.Timestamp("2022-01-13 06:00")
+
+
+def test_failed_job_is_not_recorded(monkeypatch):
+    recorded = []
+    now = pd.Timestamp("2022-01-10")
+    s = scheduler(monkeypatch, recorded)
+    season_end = next(s.jobs(now).query("kind == 'season_end'").itertuples())
+
+    s._run([season_end], now)
+    assert recorded == []
@@ -0,0 +1,31 @@
+import pandas as pd
+
+import league_batch
+from league_batch import LeagueBatch
+
+
+def test_failed_pulls_and_writes_are_collected(monkeypatch):
+    monkeypatch.setattr(league_batch, "data_upload", lambda **kwargs: False)
+    batch = LeagueBatch(
+        pd.DataFrame(
+            {"season": [2020, 2021], "game_id": ["399", "406"], "league_id": "1"}
+        ),
+        auth_dir=".",
+        offline=True,
+        consumer_key="k",
+        consumer_secret="s",
+    )
+    batch._leagues = lambda leagues, resource: {}
+    pulled, failing = batch.leagues
+
+    def pulled_metadata(response=None, upload=True):
+        return pd.DataFrame({"game_id": [pulled.game_id]})
+
+    def failing_metadata(response=None, upload=True):
+        failing.failures.append("metadata")
+
+    pulled.metadata = pulled_metadata
+    failing.metadata = failing_metadata
+
+    batch.pull("metadata")
+    assert batch.failures == ["399/metadata", "write/league_metadata"]
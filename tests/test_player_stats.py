@@ -0,0 +1,11 @@
+def test_failed_read_does_not_recreate_the_table(league, uploads, tables):
+    # both tables exist, reading raw.weekly_player_stats fails
+    tables["information_schema"] = {"tables": [1]}
+    tables["weekly_team_roster"] = {"week": [1], "player_key": ["406.p.1"]}
+    league._player_stats = lambda keys, week: [
+        {"player_key": key, "week": week, "total_points": 1.0} for key in keys
+    ]
+
+    assert league.player_stats_by_weeks() is None
+    assert uploads == []
+    assert league.failures == ["player_stats_by_weeks"]
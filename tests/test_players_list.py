@@ -0,0 +1,60 @@
+import pandas as pd
+
+from yahoo_query import league_season_data
+
+SIZE = league_season_data.PLAYER_BATCH
+
+
+def pool(league, empty=()):
+    """
+    Answer the player pages with three full pages and a short one,
+    the pages starting at empty coming back without players
+    """
+
+    def page(start, first_time="no"):
+        count = {0: SIZE, SIZE: SIZE, 2 * SIZE: SIZE, 3 * SIZE: 3}.get(start, 0)
+        if start in empty or not count:
+            return None, False
+        keys = [f"406.p.{start + i}" for i in range(count)]
+        return pd.DataFrame({"player_key": keys}), count == SIZE
+
+    league._players_page = page
+
+
+def test_pages_are_staged_as_they_arrive(league, uploads):
+    pool(league)
+
+    assert league.players_list() == 3 * SIZE + 3
+    # one write per page into staging, then one swap of the season
+    assert [u["table_name"] for u in uploads] == ["player_list_staging"] * 4
+    assert uploads[0]["partition"] == {"game_id": "406"}
+    assert sum(len(u["df"]) for u in uploads) == 3 * SIZE + 3
+    assert uploads.swaps == [
+        {
+            "table_name": "player_list",
+            "path": uploads.swaps[0]["path"],
+            "option_schema": "raw",
+            "partition": {"game_id": "406"},
+            "first_time": "no",
+        }
+    ]
+
+
+def test_missing_page_leaves_the_pool_alone(league, uploads):
+    pool(league, empty=(SIZE,))
+
+    assert league.players_list() is None
+    assert uploads.swaps == []
+    # what was staged is dropped
+    assert uploads[-1]["df"].empty
+    assert uploads[-1]["partition"] == {"game_id": "406"}
+    assert league.failures == ["players_list"]
+
+
+def test_failed_page_write_leaves_the_pool_alone(league, uploads):
+    pool(league)
+    uploads.written = False
+
+    assert league.players_list() is None
+    assert uploads.swaps == []
+    assert league.failures == ["players_list"]
@@ -0,0 +1,31 @@
+from response_hashes import ResponseHashes
+
+
+def content(time):
+    return {
+        "xml:lang": "en-US",
+        "yahoo:uri": "/fantasy/v2/league/406.l.1/scoreboard;week=3",
+        "league": [{"league_key": "406.l.1"}, {"scoreboard": {"week": "3"}}],
+        "time": time,
+        "copyright": "Data provided by Yahoo! and STATS, LLC",
+        "refresh_rate": "60",
+    }
+
+
+def test_request_time_does_not_change_the_hash(make_league):
+    hashes = ResponseHashes(path=None)
+    # stored hashes are read from postgres once, start from none
+    hashes._hashes = {}
+    league = make_league(response_hashes=hashes)
+    resource = "weekly_matchups/406/3"
+
+    unchanged, digest = league._unchanged(resource, content("51.2ms"))
+    assert not unchanged
+    hashes._hashes[resource] = digest
+
+    unchanged, _ = league._unchanged(resource, content("38.9ms"))
+    assert unchanged
+
+    changed = content("38.9ms")
+    changed["league"][1]["scoreboard"]["week"] = "4"
+    assert not league._unchanged(resource, changed)[0]
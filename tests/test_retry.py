@@ -0,0 +1,45 @@
+from requests.exceptions import HTTPError
+
+from retry_policy import RetryPolicy
+
+
+class ServerError(object):
+    status_code = 500
+    url = "https://fantasysports.yahooapis.com"
+
+    def json(self):
+        return {}
+
+    def raise_for_status(self):
+        raise HTTPError("500 Server Error: Internal Server Error")
+
+
+class Session(object):
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None):
+        self.calls += 1
+        return ServerError()
+
+
+def test_retry_policy_is_the_only_retry_layer(make_league):
+    policy = RetryPolicy(policies={"server": {"retries": 2, "base": 0, "cap": 0}})
+    lg = make_league(retry_policy=policy)
+    session = Session()
+    lg.yahoo_query.oauth = type("OAuth", (), {"session": session})()
+    lg.yahoo_query.offline = False
+    url = "https://fantasysports.yahooapis.com/fantasy/v2/league/406.l.1/settings"
+
+    for request in range(1, 3):
+        try:
+            lg.yahoo_query.get_response(url)
+        except HTTPError:
+            pass
+        else:
+            raise AssertionError("a persistent 500 should raise")
+        # one call plus the policy's two retries, yfpy's own retries unused
+        assert session.calls == 3 * request
+
+    # two failed requests stay below the circuit's failure threshold
+    assert not policy._opened
@@ -0,0 +1,20 @@
+from yfpy.models import League, Standings
+
+
+def test_only_requested_tables_are_built(league):
+    urls, built = [], []
+    standings = Standings({"teams": [{"team": {}}]})
+    league.yahoo_query.query = lambda url, keys, model=None: urls.append(url) or League(
+        {"league_key": "406.l.1", "standings": standings}
+    )
+    league.metadata = lambda *args, **kwargs: built.append("metadata")
+    league.teams_and_standings = lambda *args, **kwargs: built.append("standings")
+
+    league.season_resources(out=["standings"], metadata=False)
+    assert urls == [
+        "https://fantasysports.yahooapis.com/fantasy/v2/league/406.l.1;out=standings"
+    ]
+    assert built == ["standings"]
+
+    assert league.season_resources(out=[], metadata=False) == {}
+    assert len(urls) == 1
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from table_schema import SCHEMAS
+
+
+def test_nfl_weeks_week_is_read_from_week():
+    weeks = pd.DataFrame(
+        {
+            "week": ["1", "2"],
+            "display_name": ["Week 1", "Week 2"],
+            "start": ["2021-09-09", "2021-09-16"],
+            "end": ["2021-09-13", "2021-09-20"],
+            "game_id": "406",
+        }
+    )
+
+    weeks = SCHEMAS["nfl_weeks"].frame(weeks)
+    assert list(weeks["week"]) == [1, 2]
+    assert pd.api.types.is_integer_dtype(weeks["week"])
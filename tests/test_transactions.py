@@ -0,0 +1,83 @@
+from yfpy.models import Player, Transaction
+
+
+def pages(league, *pages):
+    """
+    Answer the transactions requests in order, each page a list of
+    timestamps or an exception to raise
+    """
+    answers = iter(pages)
+
+    def fetch(fetch, skip=()):
+        page = next(answers, [])
+        if isinstance(page, Exception):
+            raise page
+        return [
+            {
+                "transaction": Transaction(
+                    {
+                        "transaction_key": f"406.l.1.tr.{timestamp}",
+                        "transaction_id": str(timestamp),
+                        "type": "add",
+                        "status": "successful",
+                        "timestamp": str(timestamp),
+                        "players": [{"player": Player({"player_key": "406.p.1"})}],
+                    }
+                )
+            }
+            for timestamp in page
+        ]
+
+    league._fetch = fetch
+
+
+def held(tables, newest):
+    tables["information_schema"] = {"tables": [1]}
+    tables["transaction_cursors"] = {"newest": [newest]}
+
+
+def cursors(uploads):
+    return [
+        upload["df"]["newest"].iloc[0]
+        for upload in uploads
+        if upload["table_name"] == "transaction_cursors"
+    ]
+
+
+def test_failed_read_does_not_recreate_the_table(league, uploads, tables):
+    pages(league, [1631000000])
+
+    assert league.transactions() is None
+    # nothing written, raw.transactions is not dropped for a read that failed
+    assert uploads == []
+    assert league.failures == ["transactions"]
+
+
+def test_failed_write_is_not_counted(league, uploads, tables):
+    pages(league, [1631000000])
+    held(tables, None)
+    uploads.written = False
+
+    assert league.transactions() is None
+    assert len(uploads) == 1
+    assert league.failures == ["transactions"]
+
+
+def test_cursor_moves_once_the_old_one_is_reached(league, uploads, tables):
+    pages(league, [40, 30], [20, 10])
+    held(tables, 20)
+
+    assert league.transactions(count=2) == 3
+    # the transaction at the cursor is written again
+    assert cursors(uploads) == [40]
+
+
+def test_stopped_run_keeps_the_cursor(league, uploads, tables):
+    pages(league, [40, 30], ConnectionError("Connection aborted"))
+    held(tables, 20)
+
+    assert league.transactions(count=2) is None
+    # page one is written, the next run pulls from 20 again
+    assert len(uploads) == 1
+    assert cursors(uploads) == []
+    assert league.failures == ["transactions"]
@@ -0,0 +1,13 @@
+from yfpy.models import League
+
+
+def test_failed_write_is_a_failure(league, uploads):
+    uploads.written = False
+
+    metadata = league.metadata(
+        response=League({"league_key": "406.l.1", "league_id": "1", "name": "x"})
+    )
+    # pulled and built, but not written
+    assert metadata is not None
+    assert len(uploads) == 1
+    assert league.failures == ["write/league_metadata"]